@@ -5,6 +5,7 @@ class ApplicationContext:
     app_interface = None
     error_manager = None
     telemetry = None
+    perf_monitor = None
 
     @staticmethod
     def initialize(args):
@@ -15,16 +16,47 @@ class ApplicationContext:
         ):
             raise Exception("ApplicationContext already initialized")
         
-        from interface.error_manager import ErrorManager
-        from interface.app import AppInterface
-        from com.mcu_com import MCUCom
-        from interface.telemetry import Telemetry
+        from util.startup import StartupProfiler
 
+        with StartupProfiler.phase("import modules"):
+            from interface.error_manager import ErrorManager
+            from interface.app import AppInterface
+            from com.mcu_com import MCUCom
+            from interface.telemetry import Telemetry
+            from util.perf import PerfMonitor
 
-        ApplicationContext.mcu_com = MCUCom(args.port, args.baudrate)
+        ApplicationContext.perf_monitor = PerfMonitor()
+        with StartupProfiler.phase("open serial"):
+            ApplicationContext.mcu_com = MCUCom(args.port, args.baudrate)
         ApplicationContext.telemetry = Telemetry()
         ApplicationContext.error_manager = ErrorManager()
-        ApplicationContext.app_interface = AppInterface()
+        with StartupProfiler.phase("interface"):
+            ApplicationContext.app_interface = AppInterface()
+
+        perf_monitor = ApplicationContext.perf_monitor
+        mcu_com = ApplicationContext.mcu_com
+        perf_monitor.attach_channel(mcu_com.channel)
+        perf_monitor.add_gauge("pending_acks", mcu_com.get_pending_acks)
+        perf_monitor.add_gauge("command_buffer_depth", lambda: len(mcu_com.command_buffer.get_buffer()))
+        perf_monitor.add_gauge("message_history_depth", lambda: len(mcu_com.get_message_history()))
+        perf_monitor.add_gauge("serial_history_chunks", lambda: len(mcu_com.channel.history))
+        perf_monitor.add_gauge("frames_captured", lambda: mcu_com.frame_index.frame_count() if mcu_com.frame_index is not None else 0)
+        perf_monitor.add_gauge("errors_stored", lambda: len(ApplicationContext.error_manager.errors))
+        perf_monitor.add_gauge("comms_missed_deadlines", lambda: mcu_com.timer_group.missed_deadlines)
+        perf_monitor.add_gauge("dock_redraws_pending", lambda: len(ApplicationContext.app_interface.main_win.dock_scheduler.pending))
+
+    @staticmethod
+    def run() -> int:
+        """Run the application's event loop until the main window is closed."""
+        if (
+            ApplicationContext.mcu_com is None
+            or ApplicationContext.app_interface is None
+        ):
+            raise Exception("ApplicationContext not initialized")
+        try:
+            return ApplicationContext.app_interface.run()
+        finally:
+            ApplicationContext.mcu_com.close()
 
     @staticmethod
     def tick():
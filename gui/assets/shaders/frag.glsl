@@ -7,7 +7,14 @@ in vec3 v_fragPos;
 // Uniform color
 uniform vec3 u_color;
 uniform bool u_fade;
-uniform vec3 u_cameraPos;
+
+// Per frame camera data, shared by every program (std140, binding 0)
+layout(std140) uniform CameraData
+{
+    mat4 u_proj;
+    mat4 u_view;
+    vec3 u_cameraPos;
+};
 
 // Output fragment color.
 out vec4 FragColor;
@@ -3,11 +3,16 @@
 // Input attributes
 layout(location = 0) in vec3 a_position;
 layout(location = 1) in vec3 a_normal;
+// Per instance model matrix, takes locations 2 to 5
+layout(location = 2) in mat4 a_model;
 
-// Uniform transformation matrices
-uniform mat4 u_model;
-uniform mat4 u_view;
-uniform mat4 u_proj;
+// Per frame camera data, shared by every program (std140, binding 0)
+layout(std140) uniform CameraData
+{
+    mat4 u_proj;
+    mat4 u_view;
+    vec3 u_cameraPos;
+};
 
 // Outputs to the fragment shader
 out vec3 v_normal;
@@ -16,7 +21,7 @@ out vec3 v_fragPos;
 void main()
 {
     // Transform the vertex position into world space.
-    mat4 mvp = u_proj * u_view * u_model;
+    mat4 mvp = u_proj * u_view * a_model;
     vec4 pos = mvp * vec4(a_position, 1.0);
 
     // check that the vertex is in front of the camera
@@ -29,7 +34,7 @@ void main()
     gl_Position = pos;
 
     // Pass the normal to the fragment shader
-    vec4 normal = u_model * vec4(a_normal, 0.0);
+    vec4 normal = a_model * vec4(a_normal, 0.0);
     v_normal = normal.xyz;
-    v_fragPos = vec3(u_model * vec4(a_position, 1.0));
+    v_fragPos = vec3(a_model * vec4(a_position, 1.0));
 }
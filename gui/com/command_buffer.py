@@ -2,10 +2,15 @@ from rdscom.rdscom import CommunicationInterface, Message, MessageType, Communic
 from com.message_definitions import MessageDefinitions
 from interface.error_manager import ErrorManager, ErrorSeverity
 import threading
+import time
 from interface.docks.control import ControlModes
 from app_context import ApplicationContext
+from util.observable import ChangeSource
 
 class CommandBuffer:
+    # seconds to sleep between polls while waiting for a response, so the wait does not pin a core
+    WAIT_POLL_INTERVAL = 0.001
+
     def __init__(self):
         self.buffer : list[Message] = []
         self._successfully_sent = False
@@ -13,12 +18,17 @@ class CommandBuffer:
         self._is_sending_buffer = False
         self._is_zeroing = False
         self.callbacks_on_send = []
+        self.changes = ChangeSource("command_buffer")
 
     def add_command(self, message: Message):
         self.buffer.append(message)
+        self.changes.notify()
 
     def is_sending_buffer(self):
         return self._is_sending_buffer
+
+    def is_waiting(self):
+        return self._is_waiting
     
     def add_callback_on_send(self, callback):
         self.callbacks_on_send.append(callback)
@@ -29,6 +39,7 @@ class CommandBuffer:
     
     def load_buffer_from_file(self, file_path: str):
         self.buffer = []
+        self.changes.notify()
         print(f"Loading buffer from file: {file_path}")
         with open(file_path, "r") as file:
             lines = file.readlines()
@@ -38,7 +49,7 @@ class CommandBuffer:
                 # print(f"Angles: {angles}")
 
                 if len(angles) < 2:
-                    ApplicationContext.error_manager.report_error("Invalid line in buffer file", ErrorSeverity.WARNING)
+                    ApplicationContext.error_manager.report_error("Invalid line in buffer file", ErrorSeverity.WARNING, source="command_buffer")
                     break
 
                 angle_1 = float(angles[0])
@@ -53,7 +64,7 @@ class CommandBuffer:
 
     def clear_buffer(self, com : CommunicationInterface):
         if self._is_sending_buffer:
-            ApplicationContext.error_manager.report_error("Cannot clear buffer while sending buffer", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Cannot clear buffer while sending buffer", ErrorSeverity.WARNING, source="command_buffer")
             return
 
         # send a request to clear the buffer
@@ -68,17 +79,18 @@ class CommandBuffer:
 
     def _clear_buffer_on_success(self, request_message : Message, response_message : Message):        
         if response_message.data().type().identifier() != MessageDefinitions.clear_control_queue_id():
-            ApplicationContext.error_manager.report_error("Response message is not a clear buffer message", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Response message is not a clear buffer message", ErrorSeverity.WARNING, source="command_buffer")
             return
         
         self.buffer = []
+        self.changes.notify()
 
     def _clear_buffer_on_failure(self, request_message : Message):
-        ApplicationContext.error_manager.report_error("Failed to clear buffer message, no response", ErrorSeverity.WARNING)
+        ApplicationContext.error_manager.report_error("Failed to clear buffer message, no response", ErrorSeverity.WARNING, source="command_buffer")
 
     def execute_buffer(self, com: CommunicationInterface):
         if self._is_sending_buffer:
-            ApplicationContext.error_manager.report_error("Cannot execute buffer while sending buffer", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Cannot execute buffer while sending buffer", ErrorSeverity.WARNING, source="command_buffer")
             return
 
         random_value = 0
@@ -93,11 +105,12 @@ class CommandBuffer:
 
     def _execute_buffer_on_success(self, request_message : Message, response_message : Message):
         if response_message.data().type().identifier() != MessageDefinitions.control_go_id():
-            ApplicationContext.error_manager.report_error("Response message is not a control go message", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Response message is not a control go message", ErrorSeverity.WARNING, source="command_buffer")
             return
         
         print("Buffer executed successfully")
         self.buffer = []
+        self.changes.notify()
 
     def _execute_buffer_on_failure(self, request_message : Message):
         print("Failed to execute buffer message, no response")
@@ -118,10 +131,11 @@ class CommandBuffer:
             print("Begin waiting for response")
             while self._is_waiting:
                 com.tick()
+                time.sleep(CommandBuffer.WAIT_POLL_INTERVAL)
             print("End waiting for response")
 
             if not self._successfully_sent:
-                ApplicationContext.error_manager.report_error("Failed to send command message, no acknowledgement. Stopping send early.", ErrorSeverity.WARNING)
+                ApplicationContext.error_manager.report_error("Failed to send command message, no acknowledgement. Stopping send early.", ErrorSeverity.WARNING, source="command_buffer")
                 break
 
             for callback in self.callbacks_on_send:
@@ -132,7 +146,7 @@ class CommandBuffer:
 
         if not self._successfully_sent:
             # if the buffer was not successfully sent, then we need to keep the buffer
-            ApplicationContext.error_manager.report_error("Buffer was not successfully sent", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Buffer was not successfully sent", ErrorSeverity.WARNING, source="command_buffer")
             self.clear_buffer(com)
             return
         else:
@@ -143,7 +157,7 @@ class CommandBuffer:
 
     def send_command_buffer_async(self, com: CommunicationInterface):
         if self._is_sending_buffer:
-            ApplicationContext.error_manager.report_error("Cannot send buffer while sending buffer", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Cannot send buffer while sending buffer", ErrorSeverity.WARNING, source="command_buffer")
             return
         
         thread = threading.Thread(target=self.send_command_buffer, args=(com,))
@@ -157,7 +171,7 @@ class CommandBuffer:
             # check that the response message is a motor event message
             if response_message.data().type().identifier() != MessageDefinitions.motor_control_id():
                 self._successfully_sent = False
-                ApplicationContext.error_manager.report_error("Response message is not a motor event message", ErrorSeverity.WARNING)
+                ApplicationContext.error_manager.report_error("Response message is not a motor event message", ErrorSeverity.WARNING, source="command_buffer")
                 return
 
             if self._compare_motor_control_messages(request_message, response_message):
@@ -165,21 +179,21 @@ class CommandBuffer:
         elif request_message.data().type().identifier() == MessageDefinitions.sensor_datastream_id():
             # check that the response message is a sensor event message
             if response_message.data().type().identifier() != MessageDefinitions.sensor_datastream_id():
-                ApplicationContext.error_manager.report_error("Response message is not a sensor event message", ErrorSeverity.WARNING)
+                ApplicationContext.error_manager.report_error("Response message is not a sensor event message", ErrorSeverity.WARNING, source="command_buffer")
                 self._successfully_sent = False
                 return
 
             if self._compare_sensor_event_messages(request_message, response_message):
                 self._successfully_sent = True
         else:
-            ApplicationContext.error_manager.report_error("Unknown message type", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Unknown message type", ErrorSeverity.WARNING, source="command_buffer")
             self._successfully_sent = False
 
         self._is_waiting = False
 
 
     def _command_msg_on_failure(self, request_message : Message):
-        ApplicationContext.error_manager.report_error("Failed to send command message, no acknowledgement", ErrorSeverity.WARNING)
+        ApplicationContext.error_manager.report_error("Failed to send command message, no acknowledgement", ErrorSeverity.WARNING, source="command_buffer")
         self._successfully_sent = False
         self._is_waiting = False
 
@@ -188,14 +202,14 @@ class CommandBuffer:
         request_motor_id = request_message.get_field("motor_id").value()
         response_motor_id = motor_event_response.get_field("motor_id").value()
         if request_motor_id != response_motor_id:
-            ApplicationContext.error_manager.report_error(f"Motor ID mismatch: {request_motor_id} != {response_motor_id}", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error(f"Motor ID mismatch: {request_motor_id} != {response_motor_id}", ErrorSeverity.WARNING, source="command_buffer")
             return False
         
         # check that the control mode is the same
         request_control_mode = request_message.get_field("control_mode").value()
         response_control_mode = motor_event_response.get_field("control_mode").value()
         if request_control_mode != response_control_mode:
-            ApplicationContext.error_manager.report_error(f"Control mode mismatch: {request_control_mode} != {response_control_mode}", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error(f"Control mode mismatch: {request_control_mode} != {response_control_mode}", ErrorSeverity.WARNING, source="command_buffer")
             return False
         
         # check that the control value is the same
@@ -203,7 +217,7 @@ class CommandBuffer:
         response_control_value = motor_event_response.get_field("control_value").value()
 
         if request_control_value != response_control_value:
-            ApplicationContext.error_manager.report_error(f"Control value mismatch: {request_control_value} != {response_control_value}", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error(f"Control value mismatch: {request_control_value} != {response_control_value}", ErrorSeverity.WARNING, source="command_buffer")
             return False
         
     def _compare_sensor_event_messages(self, request: Message, response: Message):
@@ -211,14 +225,14 @@ class CommandBuffer:
         request_sensor_id = request.get_field("sensor_id").value()
         response_sensor_id = response.get_field("sensor_id").value()
         if request_sensor_id != response_sensor_id:
-            ApplicationContext.error_manager.report_error(f"Sensor ID mismatch: {request_sensor_id} != {response_sensor_id}", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error(f"Sensor ID mismatch: {request_sensor_id} != {response_sensor_id}", ErrorSeverity.WARNING, source="command_buffer")
             return False
         
         # check that the sensor value is the same
         request_sensor_value = request.get_field("sensor_value").value()
         response_sensor_value = response.get_field("sensor_value").value()
         if request_sensor_value != response_sensor_value:
-            ApplicationContext.error_manager.report_error(f"Sensor value mismatch: {request_sensor_value} != {response_sensor_value}", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error(f"Sensor value mismatch: {request_sensor_value} != {response_sensor_value}", ErrorSeverity.WARNING, source="command_buffer")
             return False
 
         return True
@@ -226,7 +240,7 @@ class CommandBuffer:
 
     def zero(self, com : CommunicationInterface):
         if self._is_sending_buffer:
-            ApplicationContext.error_manager.report_error("Cannot zero while sending buffer", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Cannot zero while sending buffer", ErrorSeverity.WARNING, source="command_buffer")
             return
 
         zero_message = MessageDefinitions.create_zero_command_message(MessageType.REQUEST, 0)
@@ -237,9 +251,10 @@ class CommandBuffer:
         com.send_message(zero_message, ack_required=True, on_failure=on_failure, on_success=on_success)
         while self._is_waiting:
             com.tick()
+            time.sleep(CommandBuffer.WAIT_POLL_INTERVAL)
 
         if not self._successfully_sent:
-            ApplicationContext.error_manager.report_error("Failed to send zero message", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Failed to send zero message", ErrorSeverity.WARNING, source="command_buffer")
             self._is_sending_buffer = False
             return
         
@@ -247,12 +262,13 @@ class CommandBuffer:
         # now we have to wait for the zero to complete
         while self._is_waiting:
             com.tick()
+            time.sleep(CommandBuffer.WAIT_POLL_INTERVAL)
         
         self._is_zeroing = False
 
     def zero_async(self, com : CommunicationInterface):
         if self._is_sending_buffer:
-            ApplicationContext.error_manager.report_error("Cannot zero while sending buffer", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Cannot zero while sending buffer", ErrorSeverity.WARNING, source="command_buffer")
             return
 
         thread = threading.Thread(target=self.zero, args=(com,))
@@ -264,32 +280,32 @@ class CommandBuffer:
         ApplicationContext.mcu_com.send_message(response)
 
         if response_message.data().type().identifier() != MessageDefinitions.zero_done_id():
-            ApplicationContext.error_manager.report_error("Response message is not a zero command message", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Response message is not a zero command message", ErrorSeverity.WARNING, source="command_buffer")
             return
         
         success = response_message.data().get_field("success").value()
         if success == 0:
-            ApplicationContext.error_manager.report_error("Zero failed", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Zero failed", ErrorSeverity.WARNING, source="command_buffer")
         else:
-            ApplicationContext.error_manager.report_error("Zero succeeded", ErrorSeverity.INFO)
+            ApplicationContext.error_manager.report_error("Zero succeeded", ErrorSeverity.INFO, source="command_buffer")
 
         self._is_waiting = False
 
     def _on_zero_success(self, response_message : Message):
         self._is_waiting = False
         if response_message.data().type().identifier() != MessageDefinitions.zero_command_id():
-            ApplicationContext.error_manager.report_error("Response message is not a zero command message", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Response message is not a zero command message", ErrorSeverity.WARNING, source="command_buffer")
             return
         
         success = response_message.data().get_field("success").value()
         if success == 0:
-            ApplicationContext.error_manager.report_error("Zero failed", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Zero failed", ErrorSeverity.WARNING, source="command_buffer")
             self._successfully_sent = False
         else:
-            ApplicationContext.error_manager.report_error("Zero succeeded", ErrorSeverity.INFO)
+            ApplicationContext.error_manager.report_error("Zero succeeded", ErrorSeverity.INFO, source="command_buffer")
             self._successfully_sent = True
 
     def _on_zero_failure(self):
         self._is_waiting = False
         self._successfully_sent = False
-        ApplicationContext.error_manager.report_error("Failed to send zero message", ErrorSeverity.WARNING)
+        ApplicationContext.error_manager.report_error("Failed to send zero message", ErrorSeverity.WARNING, source="command_buffer")
@@ -0,0 +1,279 @@
+from rdscom.rdscom import Message, MessageType
+from com.message_definitions import MessageDefinitions
+from com.serial_channel import SerialDirection
+from util.observable import ChangeSource
+
+import os
+import struct
+import threading
+import time
+
+
+class FrameRecord:
+    def __init__(self, number: int, direction: SerialDirection, timestamp: float, data: bytes):
+        self.number = number
+        self.direction = direction
+        self.timestamp = timestamp
+        self.data = data
+
+
+class FrameAssembler:
+    """
+    Splits the received byte stream back into protocol frames.
+
+    The port is read without blocking, so one read returns whatever has
+    arrived: part of a message, or several. Every prototype serializes to a
+    fixed size, so once a frame's header names its prototype its length is
+    known, and an incomplete tail is kept until the rest arrives.
+
+    Bytes that don't start a known frame are gathered into a frame of their
+    own, so nothing read is lost, and a tail still incomplete after
+    STALE_AFTER seconds is given up on and recorded as it is.
+    """
+
+    STALE_AFTER = 0.5  # seconds
+
+    def __init__(self, frame_sizes: dict):
+        """frame_sizes: Map: prototype id -> serialized size in bytes, see sizes_from_definitions"""
+        self.frame_sizes = frame_sizes
+        self._min_size = min(frame_sizes.values())
+        self._pending = bytearray()
+        self._pending_time = None  # when the first pending byte arrived
+        self._junk = bytearray()  # bytes skipped while looking for the next frame
+        self._junk_time = None
+
+    @staticmethod
+    def sizes_from_definitions() -> dict:
+        return {
+            proto.identifier(): len(Message.from_type_and_proto(MessageType.REQUEST, proto).serialize())
+            for proto in MessageDefinitions.all_protos()
+        }
+
+    def _frame_size(self):
+        """Size of the frame at the start of the pending bytes, 0 if they don't start one, None if it can't be told yet."""
+        try:
+            proto_id = Message.peek_prototype(bytes(self._pending))
+        except Exception:
+            proto_id = None
+        if proto_id is None or proto_id.is_error():
+            # too short for a header, or not a header
+            return None if len(self._pending) < self._min_size else 0
+        return self.frame_sizes.get(proto_id.value(), 0)
+
+    def _take_junk(self, frames: list):
+        if self._junk:
+            frames.append((bytes(self._junk), self._junk_time))
+            self._junk = bytearray()
+
+    def feed(self, data: bytes, timestamp: float) -> list:
+        """
+        Adds a read's bytes, returns the frames they completed as (bytes, timestamp) in order.
+        A frame's timestamp is when its first byte arrived.
+        """
+        frames = []
+        if self._pending and timestamp - self._pending_time > FrameAssembler.STALE_AFTER:
+            # the rest of that frame is not coming
+            frames.append((bytes(self._pending), self._pending_time))
+            self._pending = bytearray()
+        if not self._pending:
+            self._pending_time = timestamp
+        self._pending += data
+
+        while self._pending:
+            size = self._frame_size()
+            if size is None:
+                break
+            if size == 0:
+                # skip a byte and look for a frame after it
+                if not self._junk:
+                    self._junk_time = self._pending_time
+                self._junk.append(self._pending.pop(0))
+                continue
+            if len(self._pending) < size:
+                break
+            self._take_junk(frames)
+            frames.append((bytes(self._pending[:size]), self._pending_time))
+            del self._pending[:size]
+            # whatever follows came with this read
+            self._pending_time = timestamp
+
+        self._take_junk(frames)
+        return frames
+
+
+class FrameIndex:
+    """
+    An on-disk index of serial frames.
+
+    Frame bytes are appended to a data file, and a fixed-size record
+    (offset, length, direction, timestamp) per frame is appended to a
+    companion index file. Sent messages are one frame each, received bytes
+    are split into frames by a FrameAssembler first. Looking up frame N is a single seek into the
+    index, so the cost does not depend on how many frames were captured.
+    Nothing is decoded when a frame is recorded.
+    """
+
+    RECORD = struct.Struct("<QIBd")  # data offset, length, direction, timestamp
+
+    def __init__(self, base_path: str):
+        """
+        base_path: path without extension, `.frames` and `.index` are appended
+        """
+        self.data_path = base_path + ".frames"
+        self.index_path = base_path + ".index"
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        # each session starts a fresh capture
+        self._data_writer = open(self.data_path, "wb")
+        self._index_writer = open(self.index_path, "wb")
+        self._data_reader = open(self.data_path, "rb")
+        self._index_reader = open(self.index_path, "rb")
+        self._data_size = 0
+        self._frame_count = 0
+        self._needs_flush = False
+        self._assembler = FrameAssembler(FrameAssembler.sizes_from_definitions())
+        self.changes = ChangeSource("frame_index")
+
+    def attach(self, channel):
+        """Record every frame sent or received on a PySerialChannel."""
+        channel.add_receive_callback(self.receive)
+        channel.add_transmit_callback(lambda data: self.append(SerialDirection.TX, data))
+
+    def receive(self, data: bytes):
+        """Records the frames completed by a read from the port."""
+        frames = self._assembler.feed(data, time.time())
+        for frame, timestamp in frames:
+            self._append(SerialDirection.RX, frame, timestamp)
+        if frames:
+            self.changes.notify()
+
+    def append(self, direction: SerialDirection, data: bytes, timestamp: float = None):
+        """Records `data` as one frame."""
+        self._append(direction, data, timestamp if timestamp is not None else time.time())
+        self.changes.notify()
+
+    def _append(self, direction: SerialDirection, data: bytes, timestamp: float):
+        with self._lock:
+            record = FrameIndex.RECORD.pack(self._data_size, len(data), direction.value, timestamp)
+            self._data_writer.write(data)
+            self._index_writer.write(record)
+            self._data_size += len(data)
+            self._frame_count += 1
+            self._needs_flush = True
+
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    def _flush(self):
+        if self._needs_flush:
+            self._data_writer.flush()
+            self._index_writer.flush()
+            self._needs_flush = False
+
+    def get_frame(self, number: int) -> FrameRecord:
+        if number < 0 or number >= self._frame_count:
+            return None
+
+        with self._lock:
+            self._flush()
+            self._index_reader.seek(number * FrameIndex.RECORD.size)
+            offset, length, direction, timestamp = FrameIndex.RECORD.unpack(
+                self._index_reader.read(FrameIndex.RECORD.size)
+            )
+            self._data_reader.seek(offset)
+            data = self._data_reader.read(length)
+
+        return FrameRecord(number, SerialDirection(direction), timestamp, data)
+
+    def close(self):
+        with self._lock:
+            for handle in (self._data_writer, self._index_writer, self._data_reader, self._index_reader):
+                handle.close()
+
+
+class DecodedMessage:
+    def __init__(self, proto_name: str, type_name: str, message_number: int, fields: list, check_ok: bool):
+        self.proto_name = proto_name
+        self.type_name = type_name
+        self.message_number = message_number
+        self.fields = fields  # listof (field name, value)
+        self.check_ok = check_ok
+
+
+class DecodedFrame:
+    def __init__(self, messages: list[DecodedMessage], trailing_bytes: int, error: str = None):
+        self.messages = messages
+        self.trailing_bytes = trailing_bytes  # bytes left over that did not form a message
+        self.error = error
+
+    def summary(self) -> str:
+        if self.error is not None and not self.messages:
+            return self.error
+        return ", ".join(f"{m.proto_name} {m.type_name}" for m in self.messages)
+
+    def check_status(self) -> str:
+        if self.error is not None or not self.messages:
+            return "FAIL"
+        if self.trailing_bytes > 0:
+            return f"PARTIAL (+{self.trailing_bytes}B)"
+        if all(m.check_ok for m in self.messages):
+            return "OK"
+        return "MISMATCH"
+
+
+class FrameDecoder:
+    """
+    Decodes raw frames into messages on demand.
+
+    A frame may hold more than one message (a single read can pick up
+    several MCU writes), so messages are peeled off the front until the
+    bytes run out. Every decoded message is re-serialized and compared to
+    the bytes it came from; a mismatch means the frame did not survive the
+    round trip intact.
+    """
+
+    def __init__(self):
+        self.protos = {proto.identifier(): proto for proto in MessageDefinitions.all_protos()}
+
+    def _decode_one(self, buffer: bytes):
+        proto_id = Message.peek_prototype(buffer)
+        if proto_id.is_error() or proto_id.value() not in self.protos:
+            return None, 0
+
+        result = Message.from_buffer(buffer, self.protos[proto_id.value()])
+        if result.is_error():
+            return None, 0
+
+        message = result.value()
+        serialized = message.serialize()
+        consumed = len(serialized)
+        fields = [
+            (field_name, message.data().get_field(field_name).value())
+            for field_name in message.data().type().field_names()
+        ]
+        decoded = DecodedMessage(
+            MessageDefinitions.get_human_name(proto_id.value()),
+            MessageType.to_string(message.type()),
+            message.message_number(),
+            fields,
+            bytes(serialized) == bytes(buffer[:consumed]),
+        )
+        return decoded, consumed
+
+    def decode(self, data: bytes) -> DecodedFrame:
+        messages = []
+        remaining = bytes(data)
+        try:
+            while remaining:
+                decoded, consumed = self._decode_one(remaining)
+                if decoded is None or consumed == 0:
+                    break
+                messages.append(decoded)
+                remaining = remaining[consumed:]
+        except Exception as e:
+            return DecodedFrame(messages, len(remaining), f"Decode error: {e}")
+
+        if not messages:
+            return DecodedFrame(messages, len(remaining), "Unknown frame")
+        return DecodedFrame(messages, len(remaining))
@@ -13,8 +13,11 @@ from util.timer import TimerGroup, TimedTask
 from com.message_definitions import MessageDefinitions
 from com.serial_channel import PySerialChannel
 from com.command_buffer import CommandBuffer
+from com.frame_index import FrameIndex
 from interface.error_manager import ErrorSeverity
 from app_context import ApplicationContext
+from util.path import PathUtil
+from util.observable import ChangeSource
 import time
 import random
 import sys
@@ -22,6 +25,7 @@ import sys
 class MCUCom:
     def __init__(self, port: str, baudrate: int = 115200):
         self.channel = PySerialChannel(port, baudrate)
+        self.frame_index = None  # FrameIndex, while capture is on, see start_capture
         self.comm_options = CommunicationInterfaceOptions(
             max_retries=3,
             retry_timeout=1000,
@@ -34,7 +38,9 @@ class MCUCom:
         self.on_send_callbacks = []  # listof func(message)
         self.command_buffer = CommandBuffer()
         self.message_history = []
+        self.message_changes = ChangeSource("message_history")
         self.message_event_callbacks = []  # listof func(message)
+        self._pending_acks = 0
 
         # now add all of the prototypes
         for proto in MessageDefinitions.all_protos():
@@ -52,9 +58,21 @@ class MCUCom:
 
     def handle_message_event(self, message: Message):
         self.message_history.append(message)
+        self.message_changes.notify()
         for callback in self.message_event_callbacks:
             callback(message)
 
+    def start_capture(self) -> FrameIndex:
+        """Starts writing serial frames to a new capture in logs/, if not already, and returns its index."""
+        if self.frame_index is None:
+            self.frame_index = FrameIndex(PathUtil.file(f"logs/serial_{time.strftime('%Y%m%d_%H%M%S')}"))
+            self.frame_index.attach(self.channel)
+        return self.frame_index
+
+    def close(self):
+        if self.frame_index is not None:
+            self.frame_index.close()
+
     def get_message_history(self) -> list[Message]:
         return self.message_history
 
@@ -63,8 +81,30 @@ class MCUCom:
             callback(message)
 
         self.handle_message_event(message)
+        if ack_required:
+            on_failure, on_success = self._track_ack(on_failure, on_success)
         self.comm_interface.send_message(message, ack_required, on_failure, on_success)
 
+    def _track_ack(self, on_failure, on_success):
+        """Wraps the ack callbacks so the number of unanswered messages can be reported."""
+        self._pending_acks += 1
+
+        def tracked_failure(*args):
+            self._pending_acks -= 1
+            if on_failure is not None:
+                on_failure(*args)
+
+        def tracked_success(*args):
+            self._pending_acks -= 1
+            if on_success is not None:
+                on_success(*args)
+
+        return tracked_failure, tracked_success
+
+    def get_pending_acks(self) -> int:
+        """Acks MCUCom is waiting on, plus the one the command buffer waits on while it sends."""
+        return self._pending_acks + (1 if self.command_buffer.is_waiting() else 0)
+
     def send_buffer_message(self, message: Message):
         self.command_buffer.add_command(message)
 
@@ -91,24 +131,24 @@ class MCUCom:
         self.send_message(heartbeat, ack_required=True, on_failure=on_failure, on_success=on_success)
 
     def _on_heartbeat_failure(self, message: Message):
-        ApplicationContext.error_manager.report_error(f"Failed to send heartbeat message {message.message_number()}, no response", ErrorSeverity.WARNING)
+        ApplicationContext.error_manager.report_error(f"Failed to send heartbeat message {message.message_number()}, no response", ErrorSeverity.WARNING, source="heartbeat")
 
     def _heartbeat_msg_on_success(self, request_message : Message, response_message : Message):
         # check that the response is a heartbeat
         if response_message.data().type().identifier() != MessageDefinitions.heartbeat_id():
-            ApplicationContext.error_manager.report_error("Response message is not a heartbeat message", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Response message is not a heartbeat message", ErrorSeverity.WARNING, source="heartbeat")
             return
         
         # check that the message number is the same
         if response_message.message_number() != request_message.message_number():
-            ApplicationContext.error_manager.report_error("Response message has different message number", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Response message has different message number", ErrorSeverity.WARNING, source="heartbeat")
 
         # check that the random value is the same
         request_random_value = request_message.data().get_field("random_value").value()
         response_random_value = response_message.data().get_field("random_value").value()
 
         if request_random_value != response_random_value:
-            ApplicationContext.error_manager.report_error("Response message has different random value", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error("Response message has different random value", ErrorSeverity.WARNING, source="heartbeat")
 
 
     def tick(self):
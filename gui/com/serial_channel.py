@@ -5,34 +5,69 @@ from rdscom.rdscom import (
 
 import serial
 import threading
+import time
+import enum
+import itertools
+from collections import deque
+from util.observable import ChangeSource
+
+class SerialDirection(enum.Enum):
+    RX = 0
+    TX = 1
+
+class SerialChunk:
+    def __init__(self, sequence: int, direction: SerialDirection, timestamp: float, data: bytes):
+        """
+        sequence: monotonically increasing id of the chunk, never reused
+        direction: whether the chunk was received or sent
+        timestamp: time.time() at which the chunk was seen
+        data: the raw bytes
+        """
+        self.sequence = sequence
+        self.direction = direction
+        self.timestamp = timestamp
+        self.data = data
 
 class PySerialChannel(CommunicationChannel):
+    MAX_HISTORY_CHUNKS = 10000
+
     def __init__(self, port, baudrate=115200):
-        self.history = b""
+        self.history = deque(maxlen=PySerialChannel.MAX_HISTORY_CHUNKS)  # listof SerialChunk
+        self._next_sequence = 0
+        self.history_changes = ChangeSource("serial_history")
         self.rx_callbacks = []
         self.tx_callbacks = []
         self._write_lock = threading.Lock()
         self._read_lock = threading.Lock()
+        self._history_lock = threading.Lock()
         try:
-            self.ser = serial.Serial(port, baudrate, timeout=0.1)
+            # non-blocking, reads are driven by the event loop when data is waiting
+            self.ser = serial.Serial(port, baudrate, timeout=0)
             self.is_open = True
         except serial.SerialException:
             self.is_open = False
             print(f"Error: Could not open serial port '{port}' at baudrate {baudrate}.")
             return
 
+    def _record(self, direction: SerialDirection, data: bytes):
+        with self._history_lock:
+            self.history.append(SerialChunk(self._next_sequence, direction, time.time(), bytes(data)))
+            self._next_sequence += 1
+        self.history_changes.notify()
+
     def receive(self) -> bytearray:
         if not self.is_open:
             return bytearray()
             
         # Acquire and immediately release the lock using a context manager.
         with self._read_lock:
-            data = self.ser.read(self.ser.in_waiting or 1)
+            waiting = self.ser.in_waiting
+            data = self.ser.read(waiting) if waiting else b""
         
         # Now, outside of the lock, process the data.
         if data:
             # print(f"[received:{len(data)}] {data}")
-            self.history += data + b"\n"
+            self._record(SerialDirection.RX, data)
             for callback in self.rx_callbacks:
                 # Calling callbacks outside the lock prevents blocking other threads.
                 callback(data)
@@ -40,6 +75,18 @@ class PySerialChannel(CommunicationChannel):
         return bytearray(data)
 
 
+    def fileno(self):
+        """
+        The port's file descriptor, for waiting on incoming data,
+        or None where the platform does not provide one (Windows).
+        """
+        if not self.is_open:
+            return None
+        try:
+            return self.ser.fileno()
+        except (AttributeError, serial.SerialException):
+            return None
+
     def send(self, message: Message) -> None:
         if not self.is_open:
             print("Error: Serial port is not open.")
@@ -48,7 +95,7 @@ class PySerialChannel(CommunicationChannel):
         # Acquire the write lock using a context manager.
         with self._write_lock:
             serialized = message.serialize()
-            self.history += serialized + b"\n"
+            self._record(SerialDirection.TX, serialized)
             # print(f"[sent:{len(serialized)}] {serialized}")
             for callback in self.tx_callbacks:
                 callback(serialized)
@@ -57,17 +104,36 @@ class PySerialChannel(CommunicationChannel):
 
     def get_history(self):
         # decode the bytes to a string
+        with self._history_lock:
+            raw = b"".join(chunk.data + b"\n" for chunk in self.history)
         try:
-            return self.history.decode('utf8')
+            return raw.decode('utf8')
         except UnicodeDecodeError:
             # just do a normal decode
-            return self.history
+            return raw
+
+    def get_chunks_since(self, sequence: int):
+        """
+        Returns (chunks, next_sequence), where chunks are the retained chunks
+        with a sequence number >= `sequence`. Pass next_sequence back in on the
+        following call to only receive what was added in between.
+        """
+        with self._history_lock:
+            first_sequence = self._next_sequence - len(self.history)
+            start = max(sequence, first_sequence) - first_sequence
+            chunks = list(itertools.islice(self.history, start, None))
+            return chunks, self._next_sequence
+
+    def get_next_sequence(self) -> int:
+        return self._next_sequence
     
     def clear_history(self):
-        self.history = ""
+        with self._history_lock:
+            self.history.clear()
+        self.history_changes.notify()
 
     def add_receive_callback(self, callback):
         self.rx_callbacks.append(callback)
 
     def add_transmit_callback(self, callback):
-        self.tx_callbacks.append(callback)
\ No newline at end of file
+        self.tx_callbacks.append(callback)
@@ -5,6 +5,8 @@ A python gui to control N-tendon robotic finger
 Deals with the GUI and the communication with the teensy, leveraging the rdscom library
 """
 
+# imported first, so the startup timeline starts as early as possible
+from util.startup import StartupProfiler
 import argparse
 import sys
 from app_context import ApplicationContext
@@ -21,11 +23,16 @@ def main():
         "--baudrate", type=int, default=115200, help="The baudrate to use"
     )
 
+    parser.add_argument(
+        "--profile-startup", action="store_true", help="Print a timeline of startup phases once the window is up"
+    )
+
     args = parser.parse_args()
+    if args.profile_startup:
+        StartupProfiler.enable()
     ApplicationContext.initialize(args)
 
-    while True:
-        ApplicationContext.tick()
+    sys.exit(ApplicationContext.run())
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,15 @@
 import sys
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import QMainWindow, QDockWidget, QWidget, QVBoxLayout, QLabel
-from PyQt5.QtCore import Qt, QByteArray
+from PyQt5.QtCore import Qt, QByteArray, QTimer, QSocketNotifier
 import json
+import math
+import time
 from app_context import ApplicationContext
 from util.path import PathUtil
-from interface.dock import DockRegistry
-
-from qt_material import apply_stylesheet
+from interface.dock import DockRegistry, DockScheduler
+from interface.theme import ThemeCache
+from util.startup import StartupProfiler
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -17,24 +19,47 @@ class MainWindow(QMainWindow):
         self.setDockNestingEnabled(True)
         self.setDockOptions(QMainWindow.AllowNestedDocks | QMainWindow.AllowTabbedDocks)
         self.open_docks = {}  # key: dock instance name, value: dock instance
-        
-        self.setup_menus()
+        self.dock_scheduler = DockScheduler()
+        self.workspace = None  # the loaded workspace.json, until its docks are restored
+        self.workspace_restored = False
+
+        with StartupProfiler.phase("menus"):
+            self.setup_menus()
         # Load the workspace (docks + main window state)
-        self.load_workspace()
+        with StartupProfiler.phase("load workspace"):
+            self.load_workspace()
+
+    # dock budget per frame while a command buffer is being sent
+    TRAJECTORY_FRAME_BUDGET = 0.002
+
+    def time_until_next_timer(self):
+        """Milliseconds until a dock timer is due, or None if no dock has timers."""
+        waits = [dock.timer_group.time_until_next() for dock in self.open_docks.values()]
+        waits = [wait for wait in waits if wait is not None]
+        return min(waits) if waits else None
 
     def tick(self):
         for dock in self.open_docks.values():
-            dock.timer_group.tick()
+            for task in dock.timer_group.due_tasks():
+                self.dock_scheduler.request(dock, task.run, key=task, overdue=task.overdue())
+        ApplicationContext.perf_monitor.record_frame()
+
+        mcu_com = ApplicationContext.mcu_com
+        if mcu_com.command_buffer.is_sending_buffer():
+            # during a trajectory run, service comms between every redraw
+            self.dock_scheduler.run_frame(MainWindow.TRAJECTORY_FRAME_BUDGET, between=mcu_com.tick)
+        else:
+            self.dock_scheduler.run_frame()
 
     def setup_menus(self):
         menubar = self.menuBar()
         view_menu = menubar.addMenu("View")
 
-        DockRegistry.load_all_docks()
+        # only the names are needed for the menu, dock modules are imported when opened
+        DockRegistry.load_manifest()
         for dock in DockRegistry.get_dock_names():
-            docking_class = DockRegistry.get_dock(dock)
             action = view_menu.addAction(dock)
-            action.triggered.connect(lambda _, name=dock, cls=docking_class: self.add_new_frame(name, cls))
+            action.triggered.connect(lambda _, name=dock: self.add_new_frame(name, DockRegistry.get_dock(name)))
 
         behaviors = menubar.addMenu("Behaviors")
         # whenever you click the behaviors menu, it will open a file dialog
@@ -52,16 +77,28 @@ class MainWindow(QMainWindow):
             print(f"Selected file: {file_path}")
             ApplicationContext.mcu_com.load_command_buffer(file_path)
 
-    def add_new_frame(self, docking_name, docking_class):
+    def add_new_frame(self, docking_name, docking_class, instance_name=None):
         # Create a new dock widget and give it a unique object name
         instance = docking_class()
+        instance.scheduler = self.dock_scheduler
         instance.show_dock(self)
         instance.setWindowTitle(docking_name)
         # Ensure unique object names for state restoration
-        instance_name = f"{docking_name}_{len(self.open_docks)}"
+        if instance_name is None or instance_name in self.open_docks:
+            number = 0
+            while f"{docking_name}_{number}" in self.open_docks:
+                number += 1
+            instance_name = f"{docking_name}_{number}"
         instance.setObjectName(f"{instance_name}")
+        instance.perf_stats()  # pick up the instance name
+        instance.close_callbacks.append(self.remove_frame)
         self.open_docks[instance_name] = instance
 
+    def remove_frame(self, dock):
+        """Forgets a closed dock, so it is no longer ticked or saved with the workspace."""
+        if self.open_docks.get(dock.objectName()) is dock:
+            del self.open_docks[dock.objectName()]
+
     def is_open(self, dock_name):
         return dock_name in self.open_docks.keys()
 
@@ -69,10 +106,13 @@ class MainWindow(QMainWindow):
         """Save workspace on close."""
         self.save_workspace()
         super().closeEvent(event)
-        sys.exit(0)
+        QtWidgets.QApplication.instance().quit()
 
     def save_workspace(self):
         """Save main window state, geometry, and open dock widgets."""
+        if not self.workspace_restored:
+            # closed before the docks came back, saving now would forget them
+            return
         print("Saving workspace...")
         try:
             window_state = self.saveState().toBase64().data().decode()
@@ -90,7 +130,10 @@ class MainWindow(QMainWindow):
             print(f"Error saving workspace: {e}")
 
     def load_workspace(self):
-        """Load workspace and recreate docks before restoring window state."""
+        """
+        Load the workspace and restore the window geometry. The docks are recreated
+        once the event loop is running, so the window can show before their modules load.
+        """
         try:
             # check if the workspace file exists
             workspace_path = PathUtil.file("workspace.json") if PathUtil.file_exists("workspace.json") else PathUtil.asset_file_path("def_workspace.json")
@@ -100,43 +143,155 @@ class MainWindow(QMainWindow):
                 return
 
             with open(workspace_path, "r") as file:
-                data = json.load(file)
+                self.workspace = json.load(file)
 
+            geometry_state = self.workspace.get("geometry_state", "")
+            if geometry_state:
+                self.restoreGeometry(QByteArray.fromBase64(geometry_state.encode()))
+        except Exception as e:
+            print(f"Error loading workspace: {e}")
+            self.workspace = None
+
+        QTimer.singleShot(0, self.restore_workspace_docks)
+
+    def restore_workspace_docks(self):
+        """Recreate the workspace's docks, then restore the window state that places them."""
+        if self.workspace_restored:
+            return
+        self.workspace_restored = True
+        StartupProfiler.mark("event loop running")
+        if self.workspace is None:
+            return
+
+        try:
+            data = self.workspace
             # Recreate the open docks
             open_dock_names = data.get("open_docks", [])
-            for dock_name in open_dock_names:
+            for instance_name in open_dock_names:
                 # get rid of the _# suffix
                 # so anything before the last underscore is the dock name
                 # and anything after is the instance number
-                dock_name = dock_name.rsplit("_", 1)[0]               
-                docking_class = DockRegistry.get_dock(dock_name)
-                if docking_class:
-                    self.add_new_frame(dock_name, docking_class)
-                else:
-                    print(f"Warning: No dock class found for {dock_name}")
-
-            # Restore window state and geometry
+                dock_name = instance_name.rsplit("_", 1)[0]
+                with StartupProfiler.phase(f"restore dock {dock_name}"):
+                    docking_class = DockRegistry.get_dock(dock_name)
+                    if docking_class:
+                        # keep the saved name, the window state places docks by it
+                        self.add_new_frame(dock_name, docking_class, instance_name)
+                    else:
+                        print(f"Warning: No dock class found for {dock_name}")
+
+            # Restore window state
             window_state = data.get("window_state", "")
-            geometry_state = data.get("geometry_state", "")
             if window_state:
                 self.restoreState(QByteArray.fromBase64(window_state.encode()))
-            if geometry_state:
-                self.restoreGeometry(QByteArray.fromBase64(geometry_state.encode()))
             print("Workspace loaded.")
         except Exception as e:
             print(f"Error loading workspace: {e}")
+        self.workspace = None
+        StartupProfiler.mark("workspace restored")
 
 # The AppInterface ties everything together.
 class AppInterface:
+    # shortest time between two dock frames, in milliseconds
+    FRAME_INTERVAL = 16
+    # longest time comms go without a tick, so retries and timeouts are still handled, in milliseconds
+    COMMS_INTERVAL = 50
+    # how often the serial port is polled where it has no file descriptor to wait on, in milliseconds
+    SERIAL_POLL_INTERVAL = 5
+
+    THEME = "dark_teal.xml"
+
     def __init__(self):
-        self.app = QtWidgets.QApplication(sys.argv)
-        # (Optional) apply a global stylesheet
-        # from qt_material import apply_stylesheet
-        apply_stylesheet(self.app, theme='dark_teal.xml', invert_secondary=True)
-        self.main_win = MainWindow()
-        self.main_win.show()
+        with StartupProfiler.phase("QApplication"):
+            self.app = QtWidgets.QApplication(sys.argv)
+        with StartupProfiler.phase("theme"):
+            ThemeCache.apply(self.app, AppInterface.THEME, invert_secondary=True)
+        with StartupProfiler.phase("main window"):
+            self.main_win = MainWindow()
+        with StartupProfiler.phase("show main window"):
+            self.main_win.show()
 
     def tick(self):
         self.app.processEvents()
         self.main_win.tick()
 
+    def run(self) -> int:
+        """
+        Runs the Qt event loop until the main window is closed.
+        Comms are ticked when the serial port has data and when MCUCom's timers are due,
+        and dock frames only run when a dock has something to do.
+        """
+        self.serial_notifier = None
+        fd = ApplicationContext.mcu_com.channel.fileno()
+        if fd is not None:
+            self.serial_notifier = QSocketNotifier(fd, QSocketNotifier.Read)
+            self.serial_notifier.activated.connect(self.tick_comms)
+
+        self.comms_timer = QTimer()
+        self.comms_timer.setSingleShot(True)
+        # a coarse timer may fire a little early, before the task it was armed for is due
+        self.comms_timer.setTimerType(Qt.PreciseTimer)
+        self.comms_timer.timeout.connect(self.tick_comms)
+
+        self._frame_due = None  # time.monotonic() the frame timer is meant to fire at
+        self._last_frame = 0.0
+        self.frame_timer = QTimer()
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setTimerType(Qt.PreciseTimer)
+        self.frame_timer.timeout.connect(self.tick_frame)
+        self.main_win.dock_scheduler.request_callbacks.append(self.schedule_frame)
+
+        self.tick_comms()
+        self.tick_frame()
+        if StartupProfiler.enabled:
+            # runs after the workspace docks have been restored
+            QTimer.singleShot(0, self.print_startup_report)
+        return self.app.exec_()
+
+    def print_startup_report(self):
+        StartupProfiler.mark("startup report")
+        print(StartupProfiler.report())
+        print(DockRegistry.startup_report())
+
+    def tick_comms(self):
+        mcu_com = ApplicationContext.mcu_com
+        mcu_com.tick()
+        ApplicationContext.perf_monitor.record_comms_tick()
+
+        interval = AppInterface.COMMS_INTERVAL
+        if self.serial_notifier is None:
+            if mcu_com.channel.is_open:
+                interval = AppInterface.SERIAL_POLL_INTERVAL
+        else:
+            # the buffer thread reads the port itself while sending,
+            # so the notifier would keep firing for data the main thread must not consume
+            self.serial_notifier.setEnabled(not mcu_com.command_buffer.is_sending_buffer())
+
+        until_timer = mcu_com.timer_group.time_until_next()
+        if until_timer is not None:
+            interval = min(interval, until_timer)
+        self.comms_timer.start(math.ceil(interval))
+
+    def tick_frame(self):
+        if self._frame_due is not None:
+            ApplicationContext.perf_monitor.record_frame_jitter(time.monotonic() - self._frame_due)
+            self._frame_due = None
+        self._last_frame = time.monotonic()
+        self.main_win.tick()
+        self.schedule_frame()
+
+    def schedule_frame(self):
+        # dock timers keep their own deadlines
+        wait = self.main_win.time_until_next_timer()
+        if self.main_win.dock_scheduler.has_pending():
+            # deferred and change-driven redraws run at most once per FRAME_INTERVAL
+            since_last_frame = (time.monotonic() - self._last_frame) * 1000
+            pending_wait = max(AppInterface.FRAME_INTERVAL - since_last_frame, 0)
+            wait = pending_wait if wait is None else min(wait, pending_wait)
+        if wait is None:
+            return
+        if self.frame_timer.isActive() and self.frame_timer.remainingTime() <= wait:
+            return
+        self.frame_timer.start(math.ceil(wait))
+        self._frame_due = time.monotonic() + math.ceil(wait) / 1000
+
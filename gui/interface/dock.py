@@ -1,14 +1,102 @@
 
 from PyQt5.QtWidgets import QMainWindow, QDockWidget, QWidget, QVBoxLayout, QLabel, QGridLayout
-from PyQt5.QtCore import Qt, QObjectCleanupHandler, QByteArray
+from PyQt5.QtCore import Qt, QByteArray, QObject, QTimer, pyqtSignal
 
+import ast
+import os
+import sys
 import pkgutil
 import importlib
+import time
 import interface.docks
 from interface.imqt import LayoutUtility
 from util.timer import TimerGroup, TimedTask
+from util.observable import ChangeSource
+from util.perf import DockStats
+from app_context import ApplicationContext
+
+class DockSignals(QObject):
+    """
+    Carries change notifications onto the GUI thread. Sources may notify from
+    the command buffer thread, and the queued connection takes care of the hop.
+    """
+    sources_changed = pyqtSignal()
+
+class PendingRedraw:
+    def __init__(self, dock, task: callable, priority: float, overdue: float = 0.0):
+        self.dock = dock
+        self.task = task
+        self.priority = priority
+        self.requested_at = time.monotonic()
+        self.due_at = self.requested_at - overdue
+
+
+class DockScheduler:
+    """
+    Runs dock redraws within a per-frame time budget.
+
+    Pending redraws are ordered by the dock's priority plus how long they have
+    been waiting, so a deferred redraw keeps climbing until it gets its turn.
+    The most urgent redraw always runs, and the rest run until the budget is
+    spent; whatever is left waits for the next frame.
+    """
+
+    FRAME_BUDGET = 0.008  # seconds of dock work per frame
+    STALENESS_WEIGHT = 10.0  # priority gained per second spent waiting
+
+    def __init__(self):
+        self.pending = {}  # Map: key -> PendingRedraw
+        self.request_callbacks = []  # listof func(), called when work is queued
+
+    def request(self, dock, task: callable, key=None, overdue: float = 0.0):
+        """
+        Queue `task` for `dock`. Requests with the same key are merged until the first one runs.
+        overdue: seconds the work was already late when it was requested
+        """
+        key = key if key is not None else task
+        if key not in self.pending:
+            self.pending[key] = PendingRedraw(dock, task, dock.priority, overdue)
+            for callback in self.request_callbacks:
+                callback()
+
+    def has_pending(self) -> bool:
+        return len(self.pending) > 0
+
+    def cancel(self, dock):
+        self.pending = {key: redraw for key, redraw in self.pending.items() if redraw.dock is not dock}
+
+    def urgency(self, redraw: PendingRedraw, now: float) -> float:
+        return redraw.priority + (now - redraw.requested_at) * DockScheduler.STALENESS_WEIGHT
+
+    def run_frame(self, budget: float = None, between: callable = None):
+        """
+        Run pending redraws, most urgent first, until `budget` seconds have passed.
+        `between` runs after every redraw, so other work never waits behind more than one of them.
+        """
+        if not self.pending:
+            return
+
+        budget = budget if budget is not None else DockScheduler.FRAME_BUDGET
+        start = time.monotonic()
+        ordered = sorted(self.pending.items(), key=lambda item: self.urgency(item[1], start), reverse=True)
+        for count, (key, redraw) in enumerate(ordered):
+            if count > 0 and time.monotonic() - start >= budget:
+                break
+            del self.pending[key]
+            task_start = time.monotonic()
+            redraw.task()
+            task_end = time.monotonic()
+            redraw.dock.perf_stats().record_update(task_end - task_start, task_start - redraw.due_at)
+            if between is not None:
+                between()
+
 
 class BaseDockWidget(QDockWidget):
+    # Upper bound on how often on_sources_changed runs, in Hz
+    MAX_REFRESH_RATE = 30
+    # Higher priority redraws are run first when a frame is over budget
+    priority = 0
+
     def __init__(self, title, parent=None):
         super().__init__(title, parent)
         # Allow the dock widget to be moved, floated, and closed.
@@ -20,6 +108,85 @@ class BaseDockWidget(QDockWidget):
         )
 
         self.timer_group = TimerGroup()
+        self.scheduler = None  # DockScheduler, set by the main window
+        self.close_callbacks = []  # listof func(dock), called when the dock is closed
+        self._perf_stats = None  # DockStats, created on first use
+
+        self.refresh_rate = BaseDockWidget.MAX_REFRESH_RATE
+        self._watched_sources = []  # listof ChangeSource
+        self._change_pending = False
+        self._last_refresh = 0.0
+        self._dock_signals = DockSignals(self)
+        self._dock_signals.sources_changed.connect(self._schedule_refresh)
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self._refresh_from_sources)
+
+    def watch(self, source: ChangeSource):
+        """
+        Redraw whenever `source` changes. Bursts of changes are coalesced, so
+        on_sources_changed runs at most `refresh_rate` times per second, and
+        never while nothing changes.
+        """
+        source.add_callback(self._on_source_changed)
+        self._watched_sources.append(source)
+
+    def _on_source_changed(self):
+        # may run on any thread, only one notification needs to be in flight
+        if self._change_pending:
+            return
+        self._change_pending = True
+        self._dock_signals.sources_changed.emit()
+
+    def _schedule_refresh(self):
+        if self._refresh_timer.isActive():
+            return
+        elapsed = time.monotonic() - self._last_refresh
+        delay = max(0.0, 1.0 / self.refresh_rate - elapsed)
+        self._refresh_timer.start(int(delay * 1000))
+
+    def _refresh_from_sources(self):
+        self._change_pending = False
+        if self.scheduler is not None:
+            self.scheduler.request(self, self._run_source_refresh)
+        else:
+            self._run_source_refresh()
+
+    def _run_source_refresh(self):
+        self._last_refresh = time.monotonic()
+        self.on_sources_changed()
+
+    def perf_stats(self) -> DockStats:
+        """The counters this dock reports to the Performance dock, keyed by its instance name."""
+        if self._perf_stats is None:
+            self._perf_stats = DockStats(self.windowTitle())
+            if ApplicationContext.perf_monitor is not None:
+                ApplicationContext.perf_monitor.add_dock_stats(self._perf_stats)
+        # the instance name is only assigned after the dock is constructed
+        self._perf_stats.name = self.objectName() or self.windowTitle()
+        return self._perf_stats
+
+    def on_sources_changed(self):
+        """
+        Called after one or more watched sources changed.
+        Override this method in your dock subclasses to refresh their content.
+        """
+        pass
+
+    def closeEvent(self, event):
+        for source in self._watched_sources:
+            source.remove_callback(self._on_source_changed)
+        self._watched_sources = []
+        if self.scheduler is not None:
+            self.scheduler.cancel(self)
+        if self._perf_stats is not None and ApplicationContext.perf_monitor is not None:
+            ApplicationContext.perf_monitor.remove_dock_stats(self._perf_stats)
+        self._perf_stats = None
+        super().closeEvent(event)
+        # a closed dock is gone for good, the View menu opens a new one
+        for callback in self.close_callbacks:
+            callback(self)
+        self.deleteLater()
 
     def show_dock(self, main_window, area=Qt.RightDockWidgetArea):
         """
@@ -38,38 +205,47 @@ class ImmediateInspectorDock(BaseDockWidget):
         self.setWidget(self.main_widget)
         # Initially mark the inspector as dirty so it builds its UI.
         self.is_dirty = True
+        self._drawing = False
         # Create a persistent LayoutUtility instance for this dock.
         self.builder = LayoutUtility(self)
 
     def show(self):
         """
-        Rebuild the inspector UI if it is marked as dirty.
-        This simulates an immediate-mode GUI where the UI is regenerated when needed.
+        Redraw the inspector UI if it is marked as dirty.
+        This simulates an immediate-mode GUI: draw_inspector runs in full, and the
+        LayoutUtility reconciles the result against the widgets it already has.
         """
-        if not self.is_dirty:
+        if not self.is_dirty or self._drawing:
             # No update needed if not dirty.
             super().show()  # Still show the dock
             return
 
-        # print("Redrawing inspector")
-        temp = QWidget()
-        temp.setLayout(self.layout)
-        # Schedule the temporary widget for deletion. This will remove the old layout and its children.
-        temp.deleteLater()
-        cleanup_handler = QObjectCleanupHandler()
-        cleanup_handler.add(self.layout)
-
-        # Create a new layout for our main widget.
-        new_layout = QVBoxLayout(self.main_widget)
-        self.main_widget.setLayout(new_layout)
-        self.layout = new_layout
-
-        self.main_widget.update()
-        self.update()
-        self.draw_inspector()
+        # Clear the flag first, so anything that marks the dock dirty while drawing sticks.
         self.is_dirty = False
+        self._drawing = True
+        start = time.perf_counter()
+        created_before = self.builder.created_count
+        reused_before = self.builder.reused_count
+        try:
+            self.draw_inspector()
+            self.builder.finish()
+        finally:
+            self._drawing = False
+        self.perf_stats().record_draw(
+            time.perf_counter() - start,
+            self.builder.created_count - created_before,
+            self.builder.reused_count - reused_before,
+        )
         super().show()
 
+    def closeEvent(self, event):
+        self.builder.clear_pool()
+        super().closeEvent(event)
+
+    def on_sources_changed(self):
+        self.set_dirty()
+        self.show()
+
     def set_dirty(self):
         """
         Mark the inspector as dirty so that its UI will be rebuilt.
@@ -97,6 +273,9 @@ def dock(name):
 
 class DockRegistry:
     docks = {}  # Global to hold all dock widgets by name
+    manifest = {}  # Map: dock name -> module that defines it, found without importing anything
+    import_times = {}  # Map: module name -> seconds spent importing it
+    manifest_time = 0.0  # seconds spent building the manifest
 
     @staticmethod
     def add_dock(name, cls):
@@ -105,11 +284,68 @@ class DockRegistry:
 
     @staticmethod
     def get_dock(name):
+        """
+        Returns the dock class registered under `name`, importing its module first if needed.
+        """
+        if name not in DockRegistry.docks and name in DockRegistry.manifest:
+            DockRegistry.import_dock_module(DockRegistry.manifest[name])
         return DockRegistry.docks.get(name)
 
     @staticmethod
     def get_dock_names():
-        return DockRegistry.docks.keys()
+        names = list(DockRegistry.manifest.keys())
+        names += [name for name in DockRegistry.docks.keys() if name not in DockRegistry.manifest]
+        return names
+
+    @staticmethod
+    def scan_module(path):
+        """
+        Returns the names passed to @dock in a module's source, without importing it.
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            tree = ast.parse(file.read(), filename=path)
+
+        names = []
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for decorator in node.decorator_list:
+                if (
+                    isinstance(decorator, ast.Call)
+                    and isinstance(decorator.func, ast.Name)
+                    and decorator.func.id == "dock"
+                    and decorator.args
+                    and isinstance(decorator.args[0], ast.Constant)
+                    and isinstance(decorator.args[0].value, str)
+                ):
+                    names.append(decorator.args[0].value)
+        return names
+
+    @staticmethod
+    def load_manifest():
+        """
+        Finds every dock in the interface.docks package by reading the module sources.
+        Modules are only imported once one of their docks is asked for.
+        """
+        start = time.perf_counter()
+        package = interface.docks
+        for module_info in pkgutil.iter_modules(package.__path__):
+            full_module_name = f"{package.__name__}.{module_info.name}"
+            path = os.path.join(module_info.module_finder.path, f"{module_info.name}.py")
+            if module_info.ispkg or not os.path.exists(path):
+                continue
+            for name in DockRegistry.scan_module(path):
+                DockRegistry.manifest[name] = full_module_name
+        DockRegistry.manifest_time = time.perf_counter() - start
+
+    @staticmethod
+    def import_dock_module(full_module_name):
+        if full_module_name in sys.modules:
+            return sys.modules[full_module_name]
+        start = time.perf_counter()
+        module = importlib.import_module(full_module_name)
+        DockRegistry.import_times[full_module_name] = time.perf_counter() - start
+        return module
 
     @staticmethod
     def load_all_docks():
@@ -117,7 +353,18 @@ class DockRegistry:
         Dynamically imports all modules in the interface.docks package.
         This will cause each dock class (decorated with @dock) to register itself.
         """
-        package = interface.docks
-        for finder, module_name, is_pkg in pkgutil.iter_modules(package.__path__):
-            full_module_name = f"{package.__name__}.{module_name}"
-            importlib.import_module(full_module_name)
+        DockRegistry.load_manifest()
+        for full_module_name in set(DockRegistry.manifest.values()):
+            DockRegistry.import_dock_module(full_module_name)
+
+    @staticmethod
+    def startup_report():
+        """
+        A human readable summary of how long the manifest and each dock import took.
+        """
+        lines = [f"Dock manifest: {len(DockRegistry.manifest)} docks in {DockRegistry.manifest_time * 1000:.1f} ms"]
+        imports = sorted(DockRegistry.import_times.items(), key=lambda item: item[1], reverse=True)
+        for module_name, seconds in imports:
+            lines.append(f"  import {module_name}: {seconds * 1000:.1f} ms")
+        lines.append(f"Dock imports total: {sum(DockRegistry.import_times.values()) * 1000:.1f} ms")
+        return "\n".join(lines)
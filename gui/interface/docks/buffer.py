@@ -9,10 +9,11 @@ from interface.docks.control import ControlModes
 
 @dock("Command Buffer")
 class CommandBufferDock(ImmediateInspectorDock):
+    priority = 2
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        # ApplicationContext.mcu_com.add_message_event_callback(self.redraw)
-        self.timer_group.add_task(20, self.redraw)
+        self.watch(ApplicationContext.mcu_com.command_buffer.changes)
 
     def draw_label(self, label, value):
         self.builder.begin_horizontal()
@@ -68,8 +68,8 @@ class ConsoleDock(ImmediateInspectorDock):
             self.command_input_field.setPlaceholderText("Enter command here...")
             self.command_input_field.returnPressed.connect(self.process_command)
 
-        # Manually add the QLineEdit widget into the current layout.
-        self.builder._current_layout.addWidget(self.command_input_field)
+        # Place the persistent QLineEdit into the current layout.
+        self.builder.widget(self.command_input_field, "command input")
         self.builder.end_horizontal()
 
         # If the force flag is set, reassign focus to the input field.
@@ -1,55 +1,199 @@
-from interface.dock import dock, ImmediateInspectorDock
+import time
+
+from interface.dock import dock, BaseDockWidget
 from app_context import ApplicationContext
-from interface.imqt import FontStyle, LayoutAlignment
 from interface.error_manager import ErrorManager, ErrorSeverity, Error
-from app_context import ApplicationContext
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+    QComboBox,
+    QLabel,
+)
+
+
+def get_error_color(error_severity : ErrorSeverity):
+    match error_severity:
+        case ErrorSeverity.INFO:
+            return "blue"
+        case ErrorSeverity.WARNING:
+            return "yellow"
+        case ErrorSeverity.ERROR:
+            return "red"
+        case _:
+            return "black"
+
+
+class ErrorTableModel(QAbstractTableModel):
+    """
+    A table over the ErrorManager's coalesced errors, in the order they were first seen.
+    refresh() only touches rows whose error changed since the last refresh.
+    """
+
+    COLUMNS = ["Severity", "Count", "Message", "First", "Last"]
 
-@dock("Errors")
-class MessageHistoryDock(ImmediateInspectorDock):
     def __init__(self, parent=None):
         super().__init__(parent)
-        # ApplicationContext.mcu_com.add_message_event_callback(self.redraw)
-        self.timer_group.add_task(20, self.redraw)
-
-    def draw_label(self, label, value):
-        self.builder.begin_horizontal()
-        self.builder.label(label, font_style=FontStyle.BOLD)
-        value_str = str(value)
-        self.builder.label(value_str)
-        self.builder.end_horizontal()
-
-    def get_error_color(self, error_severity : ErrorSeverity):
-        match error_severity:
-            case ErrorSeverity.INFO:
-                return "blue"
-            case ErrorSeverity.WARNING:
-                return "yellow"
-            case ErrorSeverity.ERROR:
-                return "red"
-            case _:
-                return "black"
-
-    def draw_error(self, error : Error):
-        color = self.get_error_color(error.severity)
-        self.builder.begin_horizontal()
-        self.builder.label(error.message, font_style=FontStyle.BOLD, text_color=color)
-        self.builder.end_horizontal()
-        
-    def draw_inspector(self):
-        if ApplicationContext.error_manager is None:
+        self._errors = []  # listof Error, in row order
+        self._rows = {}  # Map: error key -> row
+        self._seen_version = 0
+
+    def refresh(self):
+        error_manager = ApplicationContext.error_manager
+        if error_manager.version == self._seen_version:
             return
 
-        self.builder.start()
-        self.builder.begin_scroll(policy=Qt.ScrollBarAlwaysOn)
-        for error in ApplicationContext.error_manager.get_errors():
-            self.draw_error(error)
+        current = error_manager.get_errors()
+        current_ids = set(id(error) for error in current)
+
+        # drop rows for errors that were evicted from the store
+        for row in range(len(self._errors) - 1, -1, -1):
+            if id(self._errors[row]) not in current_ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._errors[row]
+                self.endRemoveRows()
+        self._rows = {error.key(): row for row, error in enumerate(self._errors)}
+
+        new_errors = []
+        for error in current:
+            if error.version <= self._seen_version:
+                continue
+            row = self._rows.get(error.key())
+            if row is None:
+                new_errors.append(error)
+            else:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+        if new_errors:
+            first = len(self._errors)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_errors) - 1)
+            for error in new_errors:
+                self._rows[error.key()] = len(self._errors)
+                self._errors.append(error)
+            self.endInsertRows()
+
+        self._seen_version = max([self._seen_version] + [error.version for error in current])
+
+    def error_at(self, row: int) -> Error:
+        return self._errors[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._errors)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    @staticmethod
+    def _format_time(timestamp: float) -> str:
+        return time.strftime("%H:%M:%S", time.localtime(timestamp))
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        error = self._errors[index.row()]
+        if role == Qt.ForegroundRole:
+            return QColor(get_error_color(error.severity))
+
+        if role != Qt.DisplayRole:
+            return None
 
-        self.builder.flexible_space()
-        self.builder.end_scroll()
+        column = index.column()
+        if column == 0:
+            return error.severity.name
+        elif column == 1:
+            return str(error.count)
+        elif column == 2:
+            return error.message
+        elif column == 3:
+            return ErrorTableModel._format_time(error.first_time)
+        elif column == 4:
+            return ErrorTableModel._format_time(error.last_time)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+
+class SeverityFilterModel(QSortFilterProxyModel):
+    """Hides errors below a minimum severity."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.minimum_severity = ErrorSeverity.INFO
+
+    def set_minimum_severity(self, severity: ErrorSeverity):
+        self.minimum_severity = severity
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        error = self.sourceModel().error_at(source_row)
+        return error.severity.value >= self.minimum_severity.value
+
+
+@dock("Errors")
+class ErrorDock(BaseDockWidget):
+    priority = 2
+    # at most this many refreshes per second, no matter how many errors arrive
+    REFRESH_RATE = 10
+
+    def __init__(self, parent=None):
+        super().__init__("Errors", parent)
+        self.main_widget = QWidget(self)
+        self.layout = QVBoxLayout(self.main_widget)
+        self.main_widget.setLayout(self.layout)
+        self.setWidget(self.main_widget)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Minimum severity"))
+        self.severity_dropdown = QComboBox()
+        self.severity_dropdown.addItems([severity.name for severity in ErrorSeverity])
+        self.severity_dropdown.currentIndexChanged.connect(self.set_minimum_severity)
+        controls.addWidget(self.severity_dropdown)
+        controls.addStretch()
+        self.suppressed_label = QLabel("")
+        controls.addWidget(self.suppressed_label)
+        self.layout.addLayout(controls)
+
+        self.model = ErrorTableModel(self)
+        self.filter_model = SeverityFilterModel(self)
+        self.filter_model.setSourceModel(self.model)
+
+        self.table = QTableView()
+        self.table.setModel(self.filter_model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.layout.addWidget(self.table)
+
+        self.refresh_rate = ErrorDock.REFRESH_RATE
+        if ApplicationContext.error_manager is not None:
+            self.watch(ApplicationContext.error_manager.changes)
+        self.refresh()
+
+    def on_sources_changed(self):
+        self.refresh()
+
+    def refresh(self):
+        if ApplicationContext.error_manager is None:
+            return
 
+        scrollbar = self.table.verticalScrollBar()
+        following = scrollbar.value() >= scrollbar.maximum()
+        self.model.refresh()
+        suppressed = sum(ApplicationContext.error_manager.get_suppressed().values())
+        self.suppressed_label.setText(f"{suppressed} suppressed" if suppressed else "")
+        if following:
+            self.table.scrollToBottom()
 
-    def redraw(self):
-        self.set_dirty()
-        self.show()
-        
\ No newline at end of file
+    def set_minimum_severity(self, index: int):
+        self.filter_model.set_minimum_severity(list(ErrorSeverity)[index])
@@ -1,45 +1,18 @@
 import pyqtgraph as pg
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from interface.dock import BaseDockWidget, dock
 from app_context import ApplicationContext
-import time
 
-class GraphUpdateWorker(QThread):
-    # Emit two sets of data: one for joint 1 and one for joint 2.
-    # Each is a tuple: (timestamps, motor_positions)
-    data_ready = pyqtSignal(tuple, tuple)
-    
-    def __init__(self, telemetry, update_interval=200, parent=None):
-        super().__init__(parent)
-        self.telemetry = telemetry
-        self.update_interval = update_interval  # in milliseconds
-        self.running = True
-
-    def run(self):
-        while self.running:
-            # Retrieve telemetry data for joint 1 and joint 2.
-            ds1 = self.telemetry.get_datastream(0)
-            ds2 = self.telemetry.get_datastream(1)
-            
-            t1, p1 = [], []
-            t2, p2 = [], []
-            if ds1 is not None and ds1.snapshots:
-                for snap in ds1.snapshots:
-                    t1.append(snap.timestamp)
-                    p1.append(snap.motor_pos)
-            if ds2 is not None and ds2.snapshots:
-                for snap in ds2.snapshots:
-                    t2.append(snap.timestamp)
-                    p2.append(snap.motor_pos)
-            
-            self.data_ready.emit((t1, p1), (t2, p2))
-            self.msleep(self.update_interval)
-    
-    def stop(self):
-        self.running = False
-        self.quit()
-        self.wait()
+def collect_datastream(telemetry, motor_id):
+    """Returns (timestamps, motor_positions) for a joint's datastream."""
+    ds = telemetry.get_datastream(motor_id)
+    timestamps, positions = [], []
+    if ds is not None and ds.snapshots:
+        for snap in ds.snapshots:
+            timestamps.append(snap.timestamp)
+            positions.append(snap.motor_pos)
+    return timestamps, positions
 
 @dock("Telemetry Graph")
 class TelemetryGraphDock(BaseDockWidget):
@@ -65,11 +38,15 @@ class TelemetryGraphDock(BaseDockWidget):
         self.curve1 = self.plot_widget.plot([], [], pen=pg.mkPen('w', width=2))
         self.curve2 = self.plot_widget.plot([], [], pen=pg.mkPen('r', width=2))
         
-        # Start a worker thread to update the graph.
-        self.worker = GraphUpdateWorker(ApplicationContext.telemetry, update_interval=200)
-        self.worker.data_ready.connect(self.update_graph)
-        self.worker.start()
-        
+        # Redraw when new snapshots arrive, at most 5 times per second.
+        self.refresh_rate = 5
+        self.watch(ApplicationContext.telemetry.changes)
+        self.on_sources_changed()
+
+    def on_sources_changed(self):
+        telemetry = ApplicationContext.telemetry
+        self.update_graph(collect_datastream(telemetry, 0), collect_datastream(telemetry, 1))
+
     def update_graph(self, data1, data2):
         """
         data1 and data2 are tuples: (timestamps, motor_positions).
@@ -78,8 +55,3 @@ class TelemetryGraphDock(BaseDockWidget):
             self.curve1.setData(data1[0], data1[1])
         if data2[0] and data2[1]:
             self.curve2.setData(data2[0], data2[1])
-        
-    def closeEvent(self, event):
-        # Stop the worker thread when closing.
-        self.worker.stop()
-        super().closeEvent(event)
@@ -1,65 +1,181 @@
-from interface.dock import dock, ImmediateInspectorDock
+from collections import OrderedDict
+
+from interface.dock import dock, BaseDockWidget
 from rdscom.rdscom import (Message, CommunicationChannel, MessageType)
 from app_context import ApplicationContext
-from interface.imqt import FontStyle, LayoutAlignment
 from com.message_definitions import MessageDefinitions
-from util.timer import TimerGroup, TimedTask
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTreeView, QAbstractItemView
+
+
+class MessageHistoryModel(QAbstractItemModel):
+    """
+    A tree model over the MCUCom message history.
+
+    Each message is a top-level row, and its payload fields are child rows.
+    Rows are formatted lazily in data(), so only the rows the view actually
+    paints are ever turned into strings.
+    """
+
+    COLUMNS = ["Message", "Type", "Number"]
+    MAX_CACHED_ROWS = 512
 
-@dock("Message History")
-class MessageHistoryDock(ImmediateInspectorDock):
     def __init__(self, parent=None):
         super().__init__(parent)
-        # ApplicationContext.mcu_com.add_message_event_callback(self.redraw)
-        self.timer_group.add_task(200, self.redraw)
+        self._row_count = 0
+        # Map: message row -> formatted (name, type, number) tuple
+        self._row_cache = OrderedDict()
+        # Map: message row -> list of (field name, value string)
+        self._field_cache = OrderedDict()
+
+    def _history(self) -> list[Message]:
+        return ApplicationContext.mcu_com.get_message_history()
+
+    def sync(self):
+        """
+        Pick up any messages appended since the last call.
+        This is O(1) when nothing new has arrived.
+        """
+        new_count = len(self._history())
+        if new_count == self._row_count:
+            return False
+
+        if new_count < self._row_count:
+            # the history was replaced, start over
+            self.beginResetModel()
+            self._row_count = new_count
+            self._row_cache.clear()
+            self._field_cache.clear()
+            self.endResetModel()
+            return True
 
-    def draw_label(self, label, value):
-        self.builder.begin_horizontal()
-        self.builder.label(label, font_style=FontStyle.BOLD)
-        value_str = str(value)
-        self.builder.label(value_str)
-        self.builder.end_horizontal()
+        self.beginInsertRows(QModelIndex(), self._row_count, new_count - 1)
+        self._row_count = new_count
+        self.endInsertRows()
+        return True
 
-    def draw_message(self, message : Message):
+    # --------------------------------------------------------------------------
+    # LAZY FORMATTING
+    # --------------------------------------------------------------------------
+    def _cached(self, cache, row, factory):
+        if row in cache:
+            cache.move_to_end(row)
+            return cache[row]
+
+        value = factory(self._history()[row])
+        cache[row] = value
+        if len(cache) > self.MAX_CACHED_ROWS:
+            cache.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _format_message(message: Message):
         type_str = MessageType.to_string(message.type())
         payload_type_str = MessageDefinitions.get_human_name(message.data().type().identifier())
+        return (payload_type_str, type_str, str(message.message_number()))
+
+    @staticmethod
+    def _format_fields(message: Message):
+        fields = []
+        for field_name in message.data().type().field_names():
+            value = message.data().get_field(field_name).value()
+            fields.append((field_name, str(value)))
+        return fields
+
+    def _message_row(self, row):
+        return self._cached(self._row_cache, row, self._format_message)
+
+    def _message_fields(self, row):
+        return self._cached(self._field_cache, row, self._format_fields)
+
+    # --------------------------------------------------------------------------
+    # QAbstractItemModel
+    # --------------------------------------------------------------------------
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+
+        if not parent.isValid():
+            # top-level rows carry an internal id of 0
+            return self.createIndex(row, column, 0)
+
+        # field rows carry the (message row + 1) they belong to
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self._row_count
+        if parent.internalId() != 0 or parent.column() != 0:
+            return 0
+        return len(self._message_fields(parent.row()))
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return self._row_count > 0
+        # every message has a payload, so avoid formatting it just to draw the arrow
+        return parent.internalId() == 0 and parent.column() == 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        if index.internalId() == 0:
+            return self._message_row(index.row())[index.column()]
+
+        # payload field rows show "name | value" in the first two columns
+        fields = self._message_fields(index.internalId() - 1)
+        if index.column() >= 2 or index.row() >= len(fields):
+            return None
+        return fields[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+
+@dock("Message History")
+class MessageHistoryDock(BaseDockWidget):
+    priority = -1
+
+    def __init__(self, parent=None):
+        super().__init__("Message History", parent)
+        self.main_widget = QWidget(self)
+        self.layout = QVBoxLayout(self.main_widget)
+        self.main_widget.setLayout(self.layout)
+        self.setWidget(self.main_widget)
+
+        self.model = MessageHistoryModel(self)
+        self.view = QTreeView(self.main_widget)
+        self.view.setModel(self.model)
+        # uniform rows let the view skip measuring rows that are not visible
+        self.view.setUniformRowHeights(True)
+        self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self.view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.layout.addWidget(self.view)
+
+        self.refresh_rate = 5
+        self.watch(ApplicationContext.mcu_com.message_changes)
+        self.refresh()
+
+    def on_sources_changed(self):
+        self.refresh()
+
+    def _is_following(self):
+        scrollbar = self.view.verticalScrollBar()
+        return scrollbar.value() >= scrollbar.maximum()
 
-        show = self.builder.begin_foldout_header_group(f"{payload_type_str} {type_str} - {message.message_number()}", indent=10)
-        if show:
-            self.builder.begin_vertical()
-            self.builder.label("Meta Data", font_style=FontStyle.BOLD)
-            self.builder.begin_horizontal(indent=10)
-            self.draw_label("Message Type:", type_str)
-            self.draw_label("Message ID:", str(message.message_number()))
-            self.draw_label("Payload Type:", message.data().type().identifier())
-            self.builder.end_horizontal()
-            self.builder.end_vertical()
-
-            self.builder.begin_vertical()
-            self.builder.label("Payload", font_style=FontStyle.BOLD)
-            self.builder.begin_vertical(indent=10)
-            fields = message.data().type().field_names()
-            for field_name in fields:
-                value = message.data().get_field(field_name).value()
-                self.draw_label(field_name, value)
-            self.builder.end_vertical()
-            self.builder.end_vertical()
-
-        self.builder.end_foldout_header_group()
-        
-    def draw_inspector(self):
-        self.builder.start()
-        self.builder.begin_scroll(policy=Qt.ScrollBarAlwaysOn)
-        message_history = ApplicationContext.mcu_com.get_message_history()
-        # draw in reverse order
-        max_messages = min(20, len(message_history))
-        for message in reversed(message_history[-max_messages:]):
-            self.draw_message(message)
-
-        self.builder.flexible_space()
-        self.builder.end_scroll()
-
-    def redraw(self):
-        self.set_dirty()
-        self.show()
-        
\ No newline at end of file
+    def refresh(self):
+        following = self._is_following()
+        if self.model.sync() and following:
+            # keep the newest message in view, unless the user has scrolled up
+            self.view.scrollToBottom()
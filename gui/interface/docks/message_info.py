@@ -6,6 +6,8 @@ from app_context import ApplicationContext
 
 @dock("Message Information")
 class MessageHistoryDock(ImmediateInspectorDock):
+    priority = -1
+
     def __init__(self, parent=None):
         super().__init__(parent)
         print("MessageHistoryDock init")
@@ -0,0 +1,80 @@
+import time
+
+from interface.dock import dock, ImmediateInspectorDock
+from interface.imqt import FontStyle
+from interface.error_manager import ErrorSeverity
+from app_context import ApplicationContext
+from util.path import PathUtil
+from util.timer import TimerMode
+
+
+@dock("Performance")
+class PerformanceDock(ImmediateInspectorDock):
+    REFRESH_INTERVAL = 500  # milliseconds
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # no point catching up on missed refreshes, just wait a full interval after each one
+        self.timer_group.add_task(PerformanceDock.REFRESH_INTERVAL, self.redraw, TimerMode.FIXED_DELAY)
+
+    def draw_label(self, label, value):
+        self.builder.begin_horizontal()
+        self.builder.label(label, font_style=FontStyle.BOLD)
+        self.builder.label(str(value))
+        self.builder.flexible_space()
+        self.builder.end_horizontal()
+
+    def draw_globals(self, snapshot: dict):
+        self.draw_label("Frames/s", f"{snapshot['frames_per_second']:.1f}")
+        self.draw_label("Comms ticks/s", f"{snapshot['comms_ticks_per_second']:.1f}")
+        jitter = snapshot["frame_jitter"]
+        self.draw_label("Frame jitter", f"{jitter['average_ms']:.2f} ms avg, {jitter['max_ms']:.2f} ms max")
+        self.draw_label("Serial RX", f"{snapshot['serial_rx_bytes_per_second']:.0f} B/s ({snapshot['serial_rx_bytes']} B total)")
+        self.draw_label("Serial TX", f"{snapshot['serial_tx_bytes_per_second']:.0f} B/s ({snapshot['serial_tx_bytes']} B total)")
+        for name, value in snapshot["gauges"].items():
+            self.draw_label(name.replace("_", " ").capitalize(), value)
+
+    def draw_dock_stats(self, name: str, stats: dict):
+        if self.builder.begin_foldout_header_group(name):
+            draw = stats["draw"]
+            update = stats["update"]
+            lateness = stats["lateness"]
+            if draw["count"] > 0:
+                self.draw_label("Draw", f"{draw['average_ms']:.2f} ms avg, {draw['max_ms']:.2f} ms max")
+                self.draw_label("Widgets created", stats["widgets_created"])
+                self.draw_label("Widgets reused", stats["widgets_reused"])
+                self.draw_label("Rebuilds/s", f"{stats['rebuilds_per_second']:.1f}")
+            self.draw_label("Update", f"{update['average_ms']:.2f} ms avg, {update['max_ms']:.2f} ms max")
+            self.draw_label("Updates/s", f"{stats['updates_per_second']:.1f}")
+            self.draw_label("Lateness", f"{lateness['average_ms']:.2f} ms avg, {lateness['max_ms']:.2f} ms max")
+        self.builder.end_foldout_header_group()
+
+    def draw_inspector(self):
+        self.builder.start()
+        snapshot = ApplicationContext.perf_monitor.snapshot()
+
+        self.builder.begin_scroll()
+        if self.builder.button("Dump JSON"):
+            self.dump_json()
+        self.draw_globals(snapshot)
+        self.builder.space()
+        self.builder.label("Docks", font_style=FontStyle.BOLD)
+        # slowest docks first
+        docks = sorted(
+            snapshot["docks"].items(),
+            key=lambda item: item[1]["draw"]["average_ms"] + item[1]["update"]["average_ms"],
+            reverse=True,
+        )
+        for name, stats in docks:
+            self.draw_dock_stats(name, stats)
+        self.builder.flexible_space()
+        self.builder.end_scroll()
+
+    def dump_json(self):
+        path = PathUtil.file(f"logs/perf_{time.strftime('%Y%m%d_%H%M%S')}.json", make_dirs=True)
+        ApplicationContext.perf_monitor.dump_json(path)
+        ApplicationContext.error_manager.report_error(f"Performance counters written to {path}", ErrorSeverity.INFO, source="performance")
+
+    def redraw(self):
+        self.set_dirty()
+        self.show()
@@ -1,53 +1,110 @@
-from PyQt5.QtWidgets import QLineEdit
-from interface.dock import dock, ImmediateInspectorDock
-from interface.imqt import LayoutUtility, FontStyle
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QSizePolicy
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPlainTextEdit,
+    QComboBox,
+    QPushButton,
+)
+from PyQt5.QtGui import QFont
+from interface.dock import dock, BaseDockWidget
+from com.serial_channel import SerialChunk, SerialDirection
 from app_context import ApplicationContext
 
+class SerialRenderMode:
+    ASCII = 0
+    HEX = 1
+
+    @staticmethod
+    def to_string(mode):
+        if mode == SerialRenderMode.ASCII:
+            return "ASCII"
+        elif mode == SerialRenderMode.HEX:
+            return "Hex"
+        else:
+            return "Invalid"
+
+    @staticmethod
+    def all_modes():
+        return [SerialRenderMode.ASCII, SerialRenderMode.HEX]
+
+    @staticmethod
+    def all_modes_str():
+        return [SerialRenderMode.to_string(mode) for mode in SerialRenderMode.all_modes()]
+
+
 @dock("Serial")
-class SerialDock(ImmediateInspectorDock):
+class SerialDock(BaseDockWidget):
+    priority = -1
+    MAX_LINES = 2000
+
     def __init__(self, parent=None):
-        super().__init__(parent)
-        self.timer_group.add_task(2000, self.redraw)
-
-
-    def draw_serial(self):
-        # draw the console UI
-        # so we combine all of the lien into a single string with \n as separator
-        history = ApplicationContext.mcu_com.channel.get_history()
-
-        # Begin scrollable region for console output.
-        self.builder.begin_scroll(orientation=Qt.Vertical, policy=Qt.ScrollBarAlwaysOn)
-        styles = [
-            "font-family: 'Courier New', monospace;",  # Monospaced font.
-            "font-size: 12px;",                        # Reasonable font size.
-            "padding: 10px;",                          # Some internal padding.
-            "border: 1px solid #333;",                 # A dark border.
-            "white-space: pre-wrap;"                   # Preserve line breaks.
-        ]
-        # and we draw the label with a slightly darker background color, make it transparent
-        label = self.builder.label(history, bg_color="rgba(0, 0, 0, 0.1)", extra_styles=styles)
-        label.setAlignment(Qt.AlignBottom | Qt.AlignLeft)
-        # only allow the label to grow in the vertical direction
-        label.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.Expanding)
-        # set the word wrap policy
-        label.setWordWrap(True)
-        self.builder.end_scroll()
-
-    def redraw(self):
-        self.set_dirty()
-        self.show()
-
-    def draw_inspector(self):
-        self.builder.start()    
-        # Draw the console output.
-        self.draw_serial()
-
-        self.builder.begin_horizontal()
-        if self.builder.button("Clear"):
-            ApplicationContext.mcu_com.channel.clear_history()
-            self.set_dirty()
-            self.show()
-        
-        self.builder.end_horizontal()
+        super().__init__("Serial", parent)
+        self.main_widget = QWidget(self)
+        self.layout = QVBoxLayout(self.main_widget)
+        self.main_widget.setLayout(self.layout)
+        self.setWidget(self.main_widget)
+
+        # Append-only view. Qt drops the oldest blocks once MAX_LINES is reached,
+        # so the document never grows past a fixed size.
+        self.text_view = QPlainTextEdit(self.main_widget)
+        self.text_view.setReadOnly(True)
+        self.text_view.setMaximumBlockCount(SerialDock.MAX_LINES)
+        self.text_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        font = QFont("Courier New")
+        font.setStyleHint(QFont.Monospace)
+        self.text_view.setFont(font)
+        self.layout.addWidget(self.text_view)
+
+        controls = QHBoxLayout()
+        self.mode_dropdown = QComboBox()
+        self.mode_dropdown.addItems(SerialRenderMode.all_modes_str())
+        self.mode_dropdown.currentIndexChanged.connect(self.set_render_mode)
+        controls.addWidget(self.mode_dropdown)
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear)
+        controls.addWidget(clear_button)
+        self.layout.addLayout(controls)
+
+        self.render_mode = SerialRenderMode.ASCII
+        self.next_sequence = 0  # first chunk not yet shown
+        self.refresh_rate = 5
+        self.watch(ApplicationContext.mcu_com.channel.history_changes)
+        self.refresh()
+
+    def on_sources_changed(self):
+        self.refresh()
+
+    @staticmethod
+    def format_chunk(chunk: SerialChunk, mode: int) -> str:
+        prefix = "RX" if chunk.direction == SerialDirection.RX else "TX"
+        if mode == SerialRenderMode.HEX:
+            body = chunk.data.hex(" ")
+        else:
+            # only printable ascii is shown as-is, everything else becomes a dot
+            body = "".join(chr(b) if 32 <= b < 127 else "." for b in chunk.data)
+        return f"{prefix} {body}"
+
+    def refresh(self):
+        channel = ApplicationContext.mcu_com.channel
+        if channel.get_next_sequence() == self.next_sequence:
+            return
+
+        chunks, self.next_sequence = channel.get_chunks_since(self.next_sequence)
+        # no point formatting lines that would be dropped straight away
+        chunks = chunks[-SerialDock.MAX_LINES:]
+        if chunks:
+            self.text_view.appendPlainText(
+                "\n".join(SerialDock.format_chunk(chunk, self.render_mode) for chunk in chunks)
+            )
+
+    def set_render_mode(self, mode: int):
+        self.render_mode = mode
+        # re-render whatever the channel still retains in the new mode
+        self.text_view.clear()
+        self.next_sequence = 0
+        self.refresh()
+
+    def clear(self):
+        ApplicationContext.mcu_com.channel.clear_history()
+        self.text_view.clear()
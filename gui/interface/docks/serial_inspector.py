@@ -0,0 +1,176 @@
+from collections import OrderedDict
+import time
+
+from interface.dock import dock, BaseDockWidget
+from com.frame_index import FrameIndex, FrameDecoder, FrameRecord, DecodedFrame
+from com.serial_channel import SerialDirection
+from app_context import ApplicationContext
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+    QPlainTextEdit,
+    QSplitter,
+)
+
+
+class FrameTableModel(QAbstractTableModel):
+    """
+    A flat table over a FrameIndex. Frames are read from disk and decoded only
+    when the view asks for a row, and the most recent rows are kept in a small cache.
+    """
+
+    COLUMNS = ["#", "Time", "Dir", "Bytes", "Messages", "Check"]
+    MAX_CACHED_ROWS = 256
+
+    def __init__(self, frame_index: FrameIndex, parent=None):
+        super().__init__(parent)
+        self.frame_index = frame_index
+        self.decoder = FrameDecoder()
+        self._row_count = 0
+        # Map: frame number -> (FrameRecord, DecodedFrame)
+        self._cache = OrderedDict()
+
+    def sync(self):
+        new_count = self.frame_index.frame_count()
+        if new_count == self._row_count:
+            return False
+
+        self.beginInsertRows(QModelIndex(), self._row_count, new_count - 1)
+        self._row_count = new_count
+        self.endInsertRows()
+        return True
+
+    def frame(self, row: int):
+        """Returns (FrameRecord, DecodedFrame) for a row, decoding it if needed."""
+        if row in self._cache:
+            self._cache.move_to_end(row)
+            return self._cache[row]
+
+        record = self.frame_index.get_frame(row)
+        if record is None:
+            return None, None
+        entry = (record, self.decoder.decode(record.data))
+        self._cache[row] = entry
+        if len(self._cache) > self.MAX_CACHED_ROWS:
+            self._cache.popitem(last=False)
+        return entry
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        record, decoded = self.frame(index.row())
+        if record is None:
+            return None
+
+        column = index.column()
+        if column == 0:
+            return str(record.number)
+        elif column == 1:
+            millis = int((record.timestamp % 1) * 1000)
+            return time.strftime("%H:%M:%S", time.localtime(record.timestamp)) + f".{millis:03d}"
+        elif column == 2:
+            return "RX" if record.direction == SerialDirection.RX else "TX"
+        elif column == 3:
+            return str(len(record.data))
+        elif column == 4:
+            return decoded.summary()
+        elif column == 5:
+            return decoded.check_status()
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+
+@dock("Serial Inspector")
+class SerialInspectorDock(BaseDockWidget):
+    priority = -1
+
+    def __init__(self, parent=None):
+        super().__init__("Serial Inspector", parent)
+        self.main_widget = QWidget(self)
+        self.layout = QVBoxLayout(self.main_widget)
+        self.main_widget.setLayout(self.layout)
+        self.setWidget(self.main_widget)
+
+        # capturing starts with the first inspector, so sessions without one write nothing
+        frame_index = ApplicationContext.mcu_com.start_capture()
+        self.model = FrameTableModel(frame_index, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        # fixed row heights keep the view from measuring millions of rows
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.selectionModel().currentRowChanged.connect(self.show_details)
+
+        self.details = QPlainTextEdit()
+        self.details.setReadOnly(True)
+        font = QFont("Courier New")
+        font.setStyleHint(QFont.Monospace)
+        self.details.setFont(font)
+
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.table)
+        splitter.addWidget(self.details)
+        self.layout.addWidget(splitter)
+
+        self.refresh_rate = 5
+        self.watch(frame_index.changes)
+        self.refresh()
+
+    def on_sources_changed(self):
+        self.refresh()
+
+    def refresh(self):
+        scrollbar = self.table.verticalScrollBar()
+        following = scrollbar.value() >= scrollbar.maximum()
+        if self.model.sync() and following:
+            self.table.scrollToBottom()
+
+    @staticmethod
+    def format_details(record: FrameRecord, decoded: DecodedFrame) -> str:
+        direction = "RX" if record.direction == SerialDirection.RX else "TX"
+        lines = [f"Frame {record.number} ({direction}, {len(record.data)} bytes)", ""]
+        for offset in range(0, len(record.data), 16):
+            row = record.data[offset:offset + 16]
+            lines.append(f"{offset:04x}  {row.hex(' '):<47}  " + "".join(chr(b) if 32 <= b < 127 else "." for b in row))
+        lines.append("")
+
+        for message in decoded.messages:
+            status = "ok" if message.check_ok else "round-trip mismatch"
+            lines.append(f"{message.proto_name} {message.type_name} #{message.message_number} [{status}]")
+            for field_name, value in message.fields:
+                lines.append(f"    {field_name}: {value}")
+        if decoded.error is not None:
+            lines.append(decoded.error)
+        if decoded.trailing_bytes > 0:
+            lines.append(f"{decoded.trailing_bytes} trailing bytes not decoded")
+        return "\n".join(lines)
+
+    def show_details(self, current: QModelIndex, previous: QModelIndex):
+        if not current.isValid():
+            self.details.clear()
+            return
+
+        record, decoded = self.model.frame(current.row())
+        if record is None:
+            self.details.clear()
+            return
+        self.details.setPlainText(SerialInspectorDock.format_details(record, decoded))
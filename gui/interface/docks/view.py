@@ -1,105 +1,162 @@
-from PyQt5.QtCore import Qt, QSettings, QTimer
-from PyQt5.QtWidgets import QMainWindow, QDockWidget, QWidget, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, QSettings, QTimer, QRect, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QFontDatabase
+from PyQt5.QtWidgets import QMainWindow, QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox, QSpinBox
 from OpenGL import GL
 from PyQt5 import QtWidgets, QtOpenGL
-import glm
 
 from interface.dock import dock, BaseDockWidget, ImmediateInspectorDock
 from interface.renderer.renderer import Renderer
-from interface.renderer.material import Material, MaterialProperties
-from interface.renderer.scene_graph import SceneNode, Transform
-from interface.renderer.mesh import Mesh, MeshHandle, Grid
-from util.path import PathUtil
+from interface.renderer.hand_scene import HandScene
+from interface.pose_playback import PosePlayback
+from interface.error_manager import ErrorSeverity
+from util.perf import RateCounter, TimingStat
 from app_context import ApplicationContext
+import math
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 
+# OBJ parsing is done off the GUI thread, so opening the dock does not wait on it
+mesh_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mesh_loader")
 
 class OpenGLWidget(QtOpenGL.QGLWidget):
+    """
+    Draws the hand only when something visible changed: a new telemetry sample,
+    the camera moving, a resize, or while the continuous (demo) mode animates the
+    camera. Frames are never closer together than 1 / max_fps.
+
+    With smooth playback on (the default), the links show the pose interpolated
+    between telemetry samples rather than the latest one, and frames keep coming
+    while that pose is still moving.
+
+    With the stats overlay on, each frame ends with the renderer's timings and
+    counters drawn over the scene, see renderer.stats for the same numbers in code.
+    """
+    DEFAULT_MAX_FPS = 60
+    ORBIT_SPEED = 10.0  # degrees per second, while continuous
+    JOINT_COUNT = 2  # one per link
+
+    meshes_ready = pyqtSignal()
+    frame_drawn = pyqtSignal(float)  # seconds spent in paintGL
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        # start parsing the meshes now, they are uploaded once the GL context exists and they are ready
+        self.mesh_futures = {
+            mesh_name: mesh_loader.submit(HandScene.load_mesh, mesh_name)
+            for mesh_name in HandScene.MESH_NAMES
+        }
+        self.scene_ready = False
+        self.scene_failed = False  # a mesh failed to load, there is nothing to draw
         self.renderer = Renderer()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update)
-        self.timer.start(16)
+        self.scene = HandScene(self.renderer)
+
+        self.max_fps = OpenGLWidget.DEFAULT_MAX_FPS
+        self.continuous = False
+        self.last_frame_time = 0.0  # perf_counter() when the last frame started
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.setTimerType(Qt.PreciseTimer)
+        self.frame_timer.timeout.connect(self.update)
+        # emitted from the loader thread, queued to the GUI thread
+        self.meshes_ready.connect(self.request_frame)
+        for future in self.mesh_futures.values():
+            future.add_done_callback(lambda _: self.meshes_ready.emit())
+
         self.last_mouse_pos = (
             None  # Store the last mouse position for delta computation
         )
 
-        self.base_node = None
-        self.link_1_node = None
-        self.link_2_node = None
-
         self.camera_distance = 15
         self.camera_angle = 0.0
 
+        self.stats_overlay = False
+        # the overlay is painted over the scene, Qt must not clear the widget first
+        self.setAutoFillBackground(False)
+        self.paint_time = TimingStat()  # all of paintGL
+        self.frame_rate = RateCounter()
+        self.telemetry_updates = RateCounter()
 
+        self.smooth_playback = True
+        self.playback = PosePlayback(OpenGLWidget.JOINT_COUNT)
 
-    def initializeGL(self):
-        needed_meshes = ["crystal", "base", "link_1", "link_2"]
-        for mesh_name in needed_meshes:
-            self.renderer.add_mesh(Mesh.from_obj_file(PathUtil.asset_file_path(f"meshes/{mesh_name}.obj")), mesh_name)
+    def request_frame(self):
+        """Asks for a repaint, no sooner than 1 / max_fps after the last frame. Repeated requests coalesce."""
+        if self.frame_timer.isActive():
+            return
+        wait = self.last_frame_time + 1.0 / self.max_fps - time.perf_counter()
+        self.frame_timer.start(max(0, math.ceil(wait * 1000)))
 
-        red_material = Material.base_color(
-            self.renderer.context, glm.vec3(0.8, 0.1, 0.15)
-        )
+    def set_continuous(self, continuous: bool):
+        """Keep drawing at max_fps with the camera orbiting, for demos."""
+        self.continuous = continuous
+        self.request_frame()
 
-        blue_material = Material.base_color(
-            self.renderer.context, glm.vec3(0.15, 0.1, 0.9)
-        )
+    def set_max_fps(self, max_fps: int):
+        self.max_fps = max(1, max_fps)
 
-        green_material = Material.base_color(
-            self.renderer.context, glm.vec3(0.15, 0.9, 0.1)
-        )
+    def set_smooth_playback(self, smooth: bool):
+        """Interpolate the links between telemetry samples, instead of snapping them to the latest one."""
+        self.smooth_playback = smooth
+        self.update_scene()
 
-        # add the base
-        scale_axis = 10.0
-        self.base_node = self.renderer.add_child(
-            "base",
-            red_material,
-            Transform().set_position(glm.vec3(0, -3, 0)).set_scale(glm.vec3(scale_axis, scale_axis, scale_axis)),
-        )
+    def set_playback_delay(self, seconds: float):
+        """How far behind the telemetry the smooth playback runs. 0 extrapolates from the newest samples."""
+        self.playback.delay = max(0.0, seconds)
+        self.request_frame()
 
-        # as a parent of the base, add the first link
-        self.link_1_node = self.renderer.add_child(
-            "link_1",
-            blue_material,
-            Transform().set_position(glm.vec3(0, .05, -0.2)),
-            self.base_node
-        )
+    def set_stats_overlay(self, visible: bool):
+        """Show frame timings and counters over the scene. GPU timing is only done while it is shown."""
+        self.stats_overlay = visible
+        self.renderer.set_gpu_timing(visible)
+        self.request_frame()
 
-        # as a parent of the first link, add the second link
-        self.link_2_node = self.renderer.add_child(
-            "link_2",
-            green_material,
-            Transform().set_position(glm.vec3(0, 0.05, -0.55)),
-            self.link_1_node
-        )
+    def initializeGL(self):
+        GL.glClearColor(0.1, 0.2, 0.25, 1.0)
+        if self.meshes_loaded():
+            self.build_scene()
+
+    def meshes_loaded(self):
+        return all(future.done() for future in self.mesh_futures.values())
 
+    def build_scene(self):
+        """Upload the parsed meshes and create the scene. Needs the GL context to be current."""
+        try:
+            meshes = {mesh_name: future.result() for mesh_name, future in self.mesh_futures.items()}
+        except Exception as e:
+            # reported once, paintGL stops trying
+            self.scene_failed = True
+            ApplicationContext.error_manager.report_error(f"Failed to load the hand meshes: {e}", ErrorSeverity.ERROR, source="view")
+            return
+        self.scene.build(meshes)
         self.renderer.begin_rendering()
+        self.scene_ready = True
+        self.set_camera_position(self.camera_distance, self.camera_angle)
+        self.update_scene()
 
     def set_camera_position(self, distance, angle):
-        self.renderer.context.camera.transform.position = glm.vec3(
-            distance * glm.sin(glm.radians(angle)),
-            15,
-            distance * glm.cos(glm.radians(angle)),
-        )
-
-        # make the camera look at the origin
-        direction = glm.normalize(glm.vec3(0.0, 0.0, 0.0) - self.renderer.context.camera.transform.position)
-        rot = glm.quatLookAt(direction, glm.vec3(0.0, 1.0, 0.0))
-        self.renderer.context.camera.transform.rotation = rot
+        self.camera_distance = distance
+        self.camera_angle = angle
+        self.scene.set_camera_orbit(distance, angle)
+        self.request_frame()
 
 
     def rotate_link(self, node_number, angle):
         if node_number == 0:
-            node = self.link_1_node
+            node = self.scene.link_1_node
         elif node_number == 1:
-            node = self.link_2_node
+            node = self.scene.link_2_node
         else:
             return
 
-        node.rendering_info.transform.rotation = glm.angleAxis(glm.radians(angle), glm.vec3(1, 0, 0))
+        if node is None:
+            # the scene is not built yet
+            return
+
+        rotation = HandScene.link_rotation(angle)
+        if node.rendering_info.transform.rotation != rotation:
+            node.rendering_info.transform.rotation = rotation
+            self.request_frame()
 
     def update_single_link(self, joint_number):
         datastream = ApplicationContext.telemetry.get_datastream(joint_number)
@@ -114,30 +171,170 @@ class OpenGLWidget(QtOpenGL.QGLWidget):
 
 
     def update_scene(self):
-        for i in range(0, 2):
+        """Takes in new telemetry, requesting a frame if the links may move."""
+        self.telemetry_updates.add()
+        if self.smooth_playback:
+            # the links are posed when the frame is drawn
+            self.playback.set_samples([ApplicationContext.telemetry.get_datastream(i) for i in range(0, OpenGLWidget.JOINT_COUNT)])
+            self.request_frame()
+            return
+
+        for i in range(0, OpenGLWidget.JOINT_COUNT):
             self.update_single_link(i)
 
-        self.set_camera_position(self.camera_distance, time.time() * 10)
+    def apply_playback_pose(self):
+        """Moves the links to the pose playback shows now, and asks for the next frame until that pose settles."""
+        now = time.time()
+        angles = self.playback.current_pose(now)
+        for joint_number in range(0, OpenGLWidget.JOINT_COUNT):
+            if self.playback.has_samples[joint_number]:
+                self.rotate_link(joint_number, float(angles[joint_number]) * 360)
+        # not whether the links moved this frame, playback may be in a flat stretch before newer samples that differ
+        if not self.playback.is_settled(now):
+            self.request_frame()
 
 
     def resizeGL(self, width, height):
         GL.glViewport(0, 0, width, height)
+        self.request_frame()
 
     def paintGL(self):
-        aspect_ratio = self.width() / self.height()
+        start = time.perf_counter()
+        elapsed = start - self.last_frame_time
+        self.last_frame_time = start
+        if not self.scene_ready:
+            if not self.scene_failed and self.meshes_loaded():
+                self.build_scene()
+            if not self.scene_ready:
+                GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+                return
+
+        if self.continuous:
+            # animate the camera by however long the last frame took, and ask for the next one
+            self.set_camera_position(self.camera_distance, self.camera_angle + OpenGLWidget.ORBIT_SPEED * min(elapsed, 0.1))
+        if self.smooth_playback:
+            self.apply_playback_pose()
+
+        aspect_ratio = self.width() / max(1, self.height())
         self.renderer.context.camera.update_aspect_ratio(aspect_ratio)
         self.renderer.render()
         GL.glGetError()
 
+        seconds = time.perf_counter() - start
+        self.paint_time.add(seconds)
+        self.frame_rate.add()
+        self.frame_drawn.emit(seconds)
+
+    def newest_sample_age(self):
+        """Seconds since the newest telemetry sample of the shown joints was received, None without samples."""
+        timestamps = []
+        for joint_number in range(0, OpenGLWidget.JOINT_COUNT):
+            datastream = ApplicationContext.telemetry.get_datastream(joint_number)
+            latest = datastream.get_latest_snapshot() if datastream is not None else None
+            if latest is not None:
+                timestamps.append(latest.timestamp)
+        return time.time() - max(timestamps) if timestamps else None
+
+    def stats_overlay_lines(self) -> list[str]:
+        stats = self.renderer.stats
+        frame = stats.last
+        gpu = f"{stats.gpu_time.average * 1000:.2f} ms" if stats.gpu_time.count > 0 else "waiting"
+        sample_age = self.newest_sample_age()
+        return [
+            f"CPU {stats.cpu_time.average * 1000:.2f} ms (traverse {stats.traversal_time.average * 1000:.2f}, "
+            f"upload {stats.upload_time.average * 1000:.2f}, submit {stats.submit_time.average * 1000:.2f})",
+            f"GPU {gpu}, paint {self.paint_time.average * 1000:.2f} ms, {self.frame_rate.rate():.1f} frames/s",
+            f"{frame.draw_calls} draw calls, {frame.state_changes} state changes, {frame.triangles} triangles",
+            f"{self.telemetry_updates.rate():.1f} telemetry updates/s, newest sample "
+            + (f"{sample_age * 1000:.0f} ms old" if sample_age is not None else "none"),
+        ]
+
+    def paintEvent(self, event):
+        # without a GL context, QPainter would crash where QGLWidget just draws nothing
+        if not self.stats_overlay or not self.isValid():
+            super().paintEvent(event)
+            return
+
+        # a QPainter on a QGLWidget swaps the buffers when it ends, so the whole frame is drawn inside one
+        painter = QPainter(self)
+        painter.beginNativePainting()
+        # the painter leaves its own GL state behind
+        self.renderer.apply_render_state()
+        GL.glViewport(0, 0, self.width(), self.height())
+        self.paintGL()
+        painter.endNativePainting()
+        self.draw_stats_overlay(painter)
+        painter.end()
+
+    def draw_stats_overlay(self, painter: QPainter):
+        painter.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        metrics = painter.fontMetrics()
+        lines = self.stats_overlay_lines()
+        padding = 6
+        width = max(metrics.horizontalAdvance(line) for line in lines) + 2 * padding
+        height = metrics.height() * len(lines) + 2 * padding
+        painter.fillRect(QRect(0, 0, width, height), QColor(0, 0, 0, 160))
+        painter.setPen(QColor(230, 230, 230))
+        for index, line in enumerate(lines):
+            painter.drawText(padding, padding + metrics.ascent() + index * metrics.height(), line)
+
 
 
 @dock("Simulation")
 class SimulationDock(BaseDockWidget):
+    priority = 1
+
     def __init__(self, parent=None):
         super().__init__("OpenGL Dock", parent)
-        self.main_widget = OpenGLWidget(self)
-        self.layout = QVBoxLayout(self.main_widget)
-        self.main_widget.setLayout(self.layout)
-        self.setWidget(self.main_widget)
+        self.container = QWidget(self)
+        self.layout = QVBoxLayout(self.container)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+        self.continuous_toggle = QCheckBox("Continuous")
+        self.continuous_toggle.setToolTip("Keep drawing with the camera orbiting, for demos")
+        self.max_fps_field = QSpinBox()
+        self.max_fps_field.setRange(1, 240)
+        self.max_fps_field.setValue(OpenGLWidget.DEFAULT_MAX_FPS)
+        self.max_fps_field.setSuffix(" FPS max")
+        self.smooth_toggle = QCheckBox("Smooth")
+        self.smooth_toggle.setChecked(True)
+        self.smooth_toggle.setToolTip("Interpolate the links between telemetry samples")
+        self.delay_field = QSpinBox()
+        self.delay_field.setRange(0, 1000)
+        self.delay_field.setSingleStep(10)
+        self.delay_field.setValue(round(PosePlayback.DEFAULT_DELAY * 1000))
+        self.delay_field.setSuffix(" ms delay")
+        self.delay_field.setToolTip("How far behind the telemetry the smooth playback runs, 0 extrapolates from the newest samples")
+        self.stats_toggle = QCheckBox("Stats")
+        self.stats_toggle.setToolTip("Show frame timings, draw calls and state changes over the view")
+        controls = QHBoxLayout()
+        controls.addWidget(self.continuous_toggle)
+        controls.addWidget(self.max_fps_field)
+        controls.addWidget(self.smooth_toggle)
+        controls.addWidget(self.delay_field)
+        controls.addWidget(self.stats_toggle)
+        controls.addStretch()
+        self.layout.addLayout(controls)
+
+        self.main_widget = OpenGLWidget(self.container)
+        self.layout.addWidget(self.main_widget, 1)
+        self.setWidget(self.container)
+
+        self.continuous_toggle.toggled.connect(self.main_widget.set_continuous)
+        self.smooth_toggle.toggled.connect(self.main_widget.set_smooth_playback)
+        self.smooth_toggle.toggled.connect(self.delay_field.setEnabled)
+        self.delay_field.valueChanged.connect(lambda milliseconds: self.main_widget.set_playback_delay(milliseconds / 1000))
+        self.stats_toggle.toggled.connect(self.main_widget.set_stats_overlay)
+        self.max_fps_field.valueChanged.connect(self.set_max_fps)
+        self.main_widget.frame_drawn.connect(lambda seconds: self.perf_stats().record_draw(seconds, 0))
+
+        # new samples move the links, no more often than frames can be drawn
+        self.refresh_rate = OpenGLWidget.DEFAULT_MAX_FPS
+        self.watch(ApplicationContext.telemetry.changes)
+
+    def set_max_fps(self, max_fps: int):
+        self.main_widget.set_max_fps(max_fps)
+        self.refresh_rate = max_fps
 
-        self.timer_group.add_task(-1, self.main_widget.update_scene)
+    def on_sources_changed(self):
+        self.main_widget.update_scene()
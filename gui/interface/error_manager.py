@@ -1,4 +1,9 @@
 import enum
+import re
+import threading
+import time
+from collections import OrderedDict
+from util.observable import ChangeSource
 
 class ErrorSeverity(enum.Enum):
     INFO = 1
@@ -7,24 +12,120 @@ class ErrorSeverity(enum.Enum):
     STOP_EXECUTION = 4
 
 class Error:
-    def __init__(self, message: str, severity: ErrorSeverity):
+    """
+    A coalesced error. Every report that shares this error's template and
+    severity is folded into it, so `message` is the most recent text and
+    `count` is how many times it has been reported.
+    """
+    def __init__(self, message: str, severity: ErrorSeverity, template: str, source: str):
         self.message = message
         self.severity = severity
+        self.template = template
+        self.source = source
+        self.count = 1
+        self.first_time = time.time()
+        self.last_time = self.first_time
+        self.version = 0  # ErrorManager.version at the time of the last report
+
+    def key(self):
+        return (self.template, self.severity)
 
     def __str__(self):
+        if self.count > 1:
+            return f"{self.severity.name}: {self.message} (x{self.count})"
         return f"{self.severity.name}: {self.message}"
 
     def __repr__(self):
         return self.__str__()
 
+class RateLimiter:
+    """A token bucket: `rate` tokens per second, holding at most `burst` tokens."""
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_time = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate)
+        self.last_time = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
 class ErrorManager:
+    MAX_UNIQUE_ERRORS = 256
+    NEW_ERRORS_PER_SECOND = 5
+    NEW_ERROR_BURST = 20
+    DEFAULT_SOURCE = "general"
+
+    _NUMBER_PATTERN = re.compile(r"-?\d+(\.\d+)?")
+
     def __init__(self):
-        self.errors = []
+        # Map: (template, severity) -> Error, ordered from least to most recently reported
+        self.errors = OrderedDict()
+        self.rate_limiters = {}  # Map: source -> RateLimiter
+        self.suppressed = {}  # Map: source -> number of new errors dropped by the rate limit
+        self.version = 0  # bumped every time the stored errors change
+        self.changes = ChangeSource("errors")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_template(message: str) -> str:
+        """Strip the numbers out of a message, so that e.g. message numbers do not make every report unique."""
+        return ErrorManager._NUMBER_PATTERN.sub("#", message)
 
     def get_errors(self) -> list[Error]:
-        return self.errors
+        with self._lock:
+            return list(self.errors.values())
+
+    def get_suppressed(self) -> dict:
+        with self._lock:
+            return dict(self.suppressed)
+
+    def report_error(self, message: str, severity: ErrorSeverity, source: str = None):
+        """
+        Report an error. Repeats of a known (template, severity) pair only bump
+        its counter. New errors are rate limited per source, and the oldest
+        errors are dropped once MAX_UNIQUE_ERRORS is reached.
+
+        Repeats are not rate limited, so counts stay exact: each one updates
+        the existing entry's message, count and time and notifies `changes`.
+        That costs no memory, and watchers redraw at their own refresh rate
+        rather than once per report.
+        """
+        template = ErrorManager.make_template(message)
+        source = source if source is not None else ErrorManager.DEFAULT_SOURCE
+        key = (template, severity)
+
+        with self._lock:
+            error = self.errors.get(key)
+            if error is not None:
+                # a repeat, never rate limited, see above
+                error.count += 1
+                error.message = message
+                error.last_time = time.time()
+                self.errors.move_to_end(key)
+            else:
+                limiter = self.rate_limiters.get(source)
+                if limiter is None:
+                    limiter = RateLimiter(ErrorManager.NEW_ERRORS_PER_SECOND, ErrorManager.NEW_ERROR_BURST)
+                    self.rate_limiters[source] = limiter
+
+                if limiter.allow():
+                    error = Error(message, severity, template, source)
+                    self.errors[key] = error
+                    if len(self.errors) > ErrorManager.MAX_UNIQUE_ERRORS:
+                        self.errors.popitem(last=False)
+                else:
+                    # the stored errors are unchanged, but watchers show the suppressed count
+                    self.suppressed[source] = self.suppressed.get(source, 0) + 1
+
+            if error is not None:
+                self.version += 1
+                error.version = self.version
 
-    def report_error(self, message: str, severity: ErrorSeverity):
-        error = Error(message, severity)
-        self.errors.append(error)
-        # print(error)
\ No newline at end of file
+        # callbacks run outside the lock, so they are free to read the errors back
+        self.changes.notify()
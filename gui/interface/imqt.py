@@ -13,9 +13,10 @@ from PyQt5.QtWidgets import (
     QSlider,
     QLineEdit,
     QComboBox,
+    QLayout,
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QGraphicsOpacityEffect
+from PyQt5.QtWidgets import QGraphicsOpacityEffect, QApplication
 from enum import Enum
 
 
@@ -37,7 +38,7 @@ class LayoutAlignment(Enum):
     BOTTOM_RIGHT = Qt.AlignBottom | Qt.AlignRight
 
 
-def apply_style(widget, text_color=None, bg_color=None, font_size=None, extra_styles="", font_style=FontStyle.NORMAL):
+def build_style(text_color=None, bg_color=None, font_size=None, extra_styles="", font_style=FontStyle.NORMAL) -> str:
     styles = []
 
     if text_color:
@@ -55,16 +56,113 @@ def apply_style(widget, text_color=None, bg_color=None, font_size=None, extra_st
             styles.append(extra_styles)
         elif isinstance(extra_styles, list):
             styles.append(" ".join(extra_styles))
-    widget.setStyleSheet(" ".join(styles))
+    return " ".join(styles)
+
+
+class StyleRegistry:
+    """
+    Interns style declarations into classes on the application stylesheet.
+
+    Each distinct (widget type, declarations) pair becomes one rule selecting on
+    the `imqtStyle` dynamic property, so styling a widget is a property set
+    rather than a stylesheet parse. The application stylesheet is only rebuilt
+    when a combination is seen for the first time.
+    """
+    PROPERTY = "imqtStyle"
+
+    classes = {}  # Map: (widget type, declarations) -> class name
+    rules = []  # listof str, one per class
+    _base_stylesheet = None  # the application stylesheet before any classes were added
+    _needs_flush = False
+
+    @staticmethod
+    def class_for(type_name: str, declarations: str) -> str:
+        if not declarations:
+            return ""
+        key = (type_name, declarations)
+        class_name = StyleRegistry.classes.get(key)
+        if class_name is None:
+            class_name = f"s{len(StyleRegistry.classes)}"
+            StyleRegistry.classes[key] = class_name
+            StyleRegistry.rules.append(f'{type_name}[{StyleRegistry.PROPERTY}="{class_name}"] {{ {declarations} }}')
+            StyleRegistry._needs_flush = True
+        return class_name
+
+    @staticmethod
+    def apply(widget, declarations: str):
+        """Give `widget` the style `declarations`. Call flush() before the widget is painted."""
+        class_name = StyleRegistry.class_for(widget.metaObject().className(), declarations)
+        if widget.property(StyleRegistry.PROPERTY) == class_name:
+            return
+        widget.setProperty(StyleRegistry.PROPERTY, class_name)
+        if not StyleRegistry._needs_flush and widget.testAttribute(Qt.WA_WState_Polished):
+            # the rule already exists, so nothing else will make Qt notice the new property
+            widget.style().unpolish(widget)
+            widget.style().polish(widget)
+
+    @staticmethod
+    def flush():
+        """Push newly interned classes to the application stylesheet."""
+        app = QApplication.instance()
+        if not StyleRegistry._needs_flush or app is None:
+            return
+        if StyleRegistry._base_stylesheet is None:
+            StyleRegistry._base_stylesheet = app.styleSheet()
+        app.setStyleSheet(StyleRegistry._base_stylesheet + "\n" + "\n".join(StyleRegistry.rules))
+        StyleRegistry._needs_flush = False
+
+
+def apply_style(widget, text_color=None, bg_color=None, font_size=None, extra_styles="", font_style=FontStyle.NORMAL):
+    StyleRegistry.apply(widget, build_style(text_color, bg_color, font_size, extra_styles, font_style))
+    StyleRegistry.flush()
+
+
+class RetainedNode:
+    """
+    A widget or layout that LayoutUtility keeps alive between passes.
+
+    `item` is what sits in the parent layout, and `content` is the layout that
+    children are drawn into, for nodes that contain other nodes.
+    """
+    def __init__(self, kind: str, item, content=None, owned=True):
+        self.kind = kind
+        self.item = item
+        self.content = content
+        self.owned = owned  # False for widgets that belong to the caller
+        self.key = None
+        self.widget_id = None
+        self.parent_layout = None
+        self.pass_number = -1
+        self.style = None  # last style declarations applied to item
+        self.data = {}  # kind specific values, e.g. the options of a dropdown
+
+    def signal_senders(self) -> list:
+        """The objects whose signals were connected when the node was created."""
+        if isinstance(self.item, QScrollArea):
+            return [self.item.verticalScrollBar()]
+        return [self.item]
 
 
 class LayoutUtility:
+    # kinds whose released widgets are kept for reuse instead of deleted
+    POOLED_KINDS = {"label", "slider_value", "button", "foldout", "toggle", "slider_handle", "scroll_vertical", "scroll_horizontal"}
+    MAX_POOLED = 256  # per kind, anything released beyond that is deleted
+
     def __init__(self, imdock):
         """
         Initialize with an ImmediateInspectorDock (or similar) instance.
+
+        Widgets are retained between passes. Each call finds the widget it drew
+        last pass by its _get_key identity (or, failing that, a widget of the same
+        kind sitting at the same position), patches whatever changed, and only
+        creates a new widget when there is nothing to reuse. Anything that was
+        not drawn again is removed when its enclosing group ends; common widgets
+        removed that way go to a per-kind pool and are taken from it before a new
+        one is created, instead of piling up in deleteLater.
         """
         self.dock = imdock
         self._layout_stack = [self.dock.layout]
+        self._cursor_stack = [0]  # next item index in each layout on the stack
         self._current_layout = self.dock.layout
 
         # Persistent state dictionaries.
@@ -77,16 +175,41 @@ class LayoutUtility:
         self._slider_labels = {} # Map: unique widget ID -> QLabel displaying slider value
         self._dropdown_state = {} # Map: unique widget ID -> int
         self._scroll_flags = {}    # maps scroll id -> bool (True means "keep at bottom")
-        self._scroll_amount = {}  # maps scroll id -> QScrollArea
-        self._scroll_widget = {}  # maps scroll id -> QWidget
-        self._scroll_stack = []  # stack of scroll widgets ids
+        self._scroll_amount = {}  # maps scroll id -> int
         self._key_counter = {}
 
+        # Retained widget tree.
+        self._nodes = {}  # Map: "kind:key" -> RetainedNode
+        self._nodes_by_item = {}  # Map: id(widget or layout) -> RetainedNode
+        self._pass_number = 0
+        self._in_pass = False
+        self.created_count = 0  # nodes created over the builder's lifetime
+        self._pool = {}  # Map: kind -> listof released RetainedNode, ready for reuse
+        self.reused_count = 0  # nodes taken from the pool over the builder's lifetime
+
     def start(self):
         """Resets the key counters and layout stack."""
         self._key_counter = {}
+        self._pass_number += 1
+        self._in_pass = True
+        self._layout_stack = [self.dock.layout]
+        self._cursor_stack = [0]
+        self._current_layout = self.dock.layout
+
+    def finish(self):
+        """
+        Ends the pass started by start(), removing everything that was not drawn again.
+        """
+        if not self._in_pass:
+            return
+
+        while self._layout_stack:
+            self._trim(self._layout_stack.pop(), self._cursor_stack.pop())
         self._layout_stack = [self.dock.layout]
+        self._cursor_stack = [0]
         self._current_layout = self.dock.layout
+        self._in_pass = False
+        StyleRegistry.flush()
 
     def _get_key(self, base_key):
         if base_key not in self._key_counter:
@@ -96,6 +219,180 @@ class LayoutUtility:
             self._key_counter[base_key] += 1
             return f"{base_key} {self._key_counter[base_key]}"
 
+    # --------------------------------------------------------------------------
+    # RECONCILIATION
+    # --------------------------------------------------------------------------
+    @staticmethod
+    def _item_object(item):
+        if item is None:
+            return None
+        widget = item.widget()
+        if widget is not None:
+            return widget
+        return item.layout()
+
+    def _adopt(self, kind, layout, index):
+        """Reuse an unclaimed node of the same kind at this position, e.g. a label whose text changed."""
+        obj = LayoutUtility._item_object(layout.itemAt(index))
+        if obj is None:
+            return None
+        node = self._nodes_by_item.get(id(obj))
+        if node is None or node.kind != kind or not node.owned or node.pass_number == self._pass_number:
+            return None
+        if self._nodes.get(node.key) is node:
+            del self._nodes[node.key]
+        return node
+
+    def _place(self, kind, widget_id, create):
+        """
+        Puts the node for (kind, widget_id) at the cursor of the current layout,
+        creating it with create() if there is nothing to reuse.
+        """
+        layout = self._current_layout
+        index = self._cursor_stack[-1]
+        key = f"{kind}:{widget_id}"
+
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._adopt(kind, layout, index)
+        if node is None:
+            node = self._take_pooled(kind)
+        if node is None:
+            node = create()
+            self._nodes_by_item[id(node.item)] = node
+            self.created_count += 1
+
+        node.key = key
+        node.widget_id = widget_id
+        self._nodes[key] = node
+
+        if LayoutUtility._item_object(layout.itemAt(index)) is not node.item:
+            self._detach(node)
+            if isinstance(node.item, QLayout):
+                layout.insertLayout(index, node.item)
+            else:
+                layout.insertWidget(index, node.item)
+            node.parent_layout = layout
+
+        self._cursor_stack[-1] = index + 1
+        node.pass_number = self._pass_number
+        return node
+
+    def _detach(self, node):
+        if node.parent_layout is None:
+            return
+        if isinstance(node.item, QLayout):
+            node.parent_layout.removeItem(node.item)
+        else:
+            node.parent_layout.removeWidget(node.item)
+        node.parent_layout = None
+
+    def _trim(self, layout, index):
+        """Removes every item from `index` onwards, they were not drawn this pass."""
+        while layout.count() > index:
+            item = layout.takeAt(index)
+            obj = LayoutUtility._item_object(item)
+            if obj is None:
+                continue  # spacer
+            node = self._nodes_by_item.get(id(obj))
+            if node is not None:
+                self._release(node)
+            elif isinstance(obj, QLayout):
+                self._trim(obj, 0)
+                obj.deleteLater()
+            else:
+                obj.deleteLater()
+
+    def _release(self, node):
+        if self._nodes.get(node.key) is node:
+            del self._nodes[node.key]
+        self._nodes_by_item.pop(id(node.item), None)
+        node.parent_layout = None
+        if node.content is not None:
+            self._trim(node.content, 0)
+
+        if not node.owned:
+            node.item.setParent(None)
+            return
+        if self._pool_node(node):
+            return
+        node.item.deleteLater()
+
+    def _pool_node(self, node) -> bool:
+        """Keeps a released node for the next widget of its kind. Returns False if it should be deleted."""
+        if node.kind not in LayoutUtility.POOLED_KINDS:
+            return False
+        pool = self._pool.setdefault(node.kind, [])
+        if len(pool) >= LayoutUtility.MAX_POOLED:
+            return False
+
+        # silence the node while it waits, its handlers would write state for the key it used to have
+        for sender in node.signal_senders():
+            sender.blockSignals(True)
+        # unparenting hides the widget without marking it explicitly hidden, so the layout shows it again on reuse
+        node.item.setParent(None)
+        if isinstance(node.item, QScrollArea):
+            node.item.verticalScrollBar().setValue(0)
+            node.item.horizontalScrollBar().setValue(0)
+        node.key = None
+        node.widget_id = None
+        node.pass_number = -1
+        pool.append(node)
+        return True
+
+    def _take_pooled(self, kind):
+        pool = self._pool.get(kind)
+        if not pool:
+            return None
+        node = pool.pop()
+        for sender in node.signal_senders():
+            sender.blockSignals(False)
+        self._nodes_by_item[id(node.item)] = node
+        self.reused_count += 1
+        return node
+
+    def clear_pool(self):
+        """Deletes every pooled widget."""
+        for pool in self._pool.values():
+            for node in pool:
+                node.item.deleteLater()
+        self._pool = {}
+
+    @staticmethod
+    def _layout_node(kind, layout):
+        return RetainedNode(kind, layout, content=layout)
+
+    def _push_layout(self, layout):
+        self._layout_stack.append(layout)
+        self._cursor_stack.append(0)
+        self._current_layout = layout
+
+    def _pop_layout(self):
+        if len(self._layout_stack) > 1:
+            self._trim(self._layout_stack.pop(), self._cursor_stack.pop())
+            self._current_layout = self._layout_stack[-1]
+
+    @staticmethod
+    def _patch_text(widget, text):
+        if widget.text() != text:
+            widget.setText(text)
+
+    @staticmethod
+    def _patch_style(node, style):
+        if node.style != style:
+            StyleRegistry.apply(node.item, style)
+            node.style = style
+
+    @staticmethod
+    def _patch_layout(node, layout, indent, alignment):
+        margins = (indent, 0, 0, 0)
+        if node.data.get("margins") != margins:
+            layout.setContentsMargins(*margins)
+            node.data["margins"] = margins
+        if alignment is not None and node.data.get("alignment") != alignment:
+            layout.setAlignment(alignment.value)
+            node.data["alignment"] = alignment
+
     # --------------------------------------------------------------------------
     # BUTTON
     # --------------------------------------------------------------------------
@@ -104,16 +401,19 @@ class LayoutUtility:
         if widget_id not in self._button_state:
             self._button_state[widget_id] = False
 
-        btn = QPushButton(label)
-        apply_style(btn, text_color, bg_color, font_size, extra_styles)
-        btn.clicked.connect(lambda _, wid=widget_id: self._set_button_state(wid, True))
-        self._current_layout.addWidget(btn)
-        self.dock.set_dirty()
+        node = self._place("button", widget_id, self._create_button)
+        LayoutUtility._patch_text(node.item, label)
+        LayoutUtility._patch_style(node, build_style(text_color, bg_color, font_size, extra_styles))
 
         was_clicked = self._button_state[widget_id]
         self._button_state[widget_id] = False
         return was_clicked
 
+    def _create_button(self):
+        node = RetainedNode("button", QPushButton())
+        node.item.clicked.connect(lambda _, node=node: self._set_button_state(node.widget_id, True))
+        return node
+
     def _set_button_state(self, widget_id, value):
         self._button_state[widget_id] = value
         self.dock.set_dirty()
@@ -127,14 +427,21 @@ class LayoutUtility:
         if widget_id not in self._toggle_state:
             self._toggle_state[widget_id] = initial_value
 
-        chk = QCheckBox(label)
-        chk.setChecked(self._toggle_state[widget_id])
-        apply_style(chk, text_color, bg_color, font_size, extra_styles)
-        chk.stateChanged.connect(lambda state, wid=widget_id: self._set_toggle_state(wid, state))
-        self._current_layout.addWidget(chk)
-        self.dock.set_dirty()
+        node = self._place("toggle", widget_id, self._create_toggle)
+        chk = node.item
+        LayoutUtility._patch_text(chk, label)
+        if chk.isChecked() != self._toggle_state[widget_id]:
+            chk.blockSignals(True)
+            chk.setChecked(self._toggle_state[widget_id])
+            chk.blockSignals(False)
+        LayoutUtility._patch_style(node, build_style(text_color, bg_color, font_size, extra_styles))
         return self._toggle_state[widget_id]
 
+    def _create_toggle(self):
+        node = RetainedNode("toggle", QCheckBox())
+        node.item.stateChanged.connect(lambda state, node=node: self._set_toggle_state(node.widget_id, state))
+        return node
+
     def _set_toggle_state(self, widget_id, state):
         self._toggle_state[widget_id] = (state == Qt.Checked)
         self.dock.set_dirty()
@@ -147,11 +454,10 @@ class LayoutUtility:
         widget_id = self._get_key(text)
         # make sure the label is not bytes
         text = str(text)
-        lbl = QLabel(text)
-        apply_style(lbl, text_color, bg_color, font_size, extra_styles, font_style=font_style)
-        self._current_layout.addWidget(lbl)
-        self.dock.set_dirty()
-        return lbl
+        node = self._place("label", widget_id, lambda: RetainedNode("label", QLabel()))
+        LayoutUtility._patch_text(node.item, text)
+        LayoutUtility._patch_style(node, build_style(text_color, bg_color, font_size, extra_styles, font_style=font_style))
+        return node.item
 
     # --------------------------------------------------------------------------
     # TEXT FIELD
@@ -161,16 +467,22 @@ class LayoutUtility:
         if widget_id not in self._text_field_state:
             self._text_field_state[widget_id] = initial_value
 
-        field = QLineEdit()
-        field.setText(self._text_field_state[widget_id])
-        if placeholder:
+        node = self._place("text_field", widget_id, self._create_text_field)
+        field = node.item
+        if field.text() != self._text_field_state[widget_id]:
+            field.blockSignals(True)
+            field.setText(self._text_field_state[widget_id])
+            field.blockSignals(False)
+        if field.placeholderText() != placeholder:
             field.setPlaceholderText(placeholder)
-        apply_style(field, text_color, bg_color, font_size, extra_styles, font_style=font_style)
-        field.textChanged.connect(lambda text, wid=widget_id: self._set_text_field_state(wid, text))
-        self._current_layout.addWidget(field)
-        self.dock.set_dirty()
+        LayoutUtility._patch_style(node, build_style(text_color, bg_color, font_size, extra_styles, font_style=font_style))
         return self._text_field_state[widget_id]
 
+    def _create_text_field(self):
+        node = RetainedNode("text_field", QLineEdit())
+        node.item.textChanged.connect(lambda text, node=node: self._set_text_field_state(node.widget_id, text))
+        return node
+
     def _set_text_field_state(self, widget_id, text):
         self._text_field_state[widget_id] = text
         self.dock.set_dirty()
@@ -189,33 +501,43 @@ class LayoutUtility:
         if widget_id not in self._slider_state:
             self._slider_state[widget_id] = initial_value
 
-        # Create a horizontal layout to hold slider and value label.
-        h_layout = QHBoxLayout()
-        slider_widget = QSlider(orientation)
-        slider_widget.setMinimum(min_value)
-        slider_widget.setMaximum(max_value)
-        slider_widget.setValue(self._slider_state[widget_id])
-        slider_widget.valueChanged.connect(lambda value, wid=widget_id: self._set_slider_state(wid, value))
-        slider_widget.sliderReleased.connect(lambda wid=widget_id: self._on_slider_release(wid))
-        h_layout.addWidget(slider_widget)
-
-        # Create a label to display the slider's current value.
-        value_label = QLabel(str(self._slider_state[widget_id]))
-        apply_style(value_label, text_color="white", bg_color="transparent", font_size=12)
-        h_layout.addWidget(value_label)
+        # A horizontal layout holds the slider and the value label.
+        row = self._place("slider", widget_id, lambda: LayoutUtility._layout_node("slider", QHBoxLayout()))
+        self._push_layout(row.content)
+
+        handle = self._place("slider_handle", widget_id, lambda: self._create_slider_handle(orientation))
+        slider_widget = handle.item
+        if slider_widget.orientation() != orientation:
+            slider_widget.setOrientation(orientation)
+        if (slider_widget.minimum(), slider_widget.maximum()) != (min_value, max_value):
+            slider_widget.setRange(min_value, max_value)
+        if slider_widget.value() != self._slider_state[widget_id]:
+            slider_widget.blockSignals(True)
+            slider_widget.setValue(self._slider_state[widget_id])
+            slider_widget.blockSignals(False)
+
+        # A label displays the slider's current value.
+        value_node = self._place("slider_value", widget_id, lambda: RetainedNode("slider_value", QLabel()))
+        value_label = value_node.item
+        LayoutUtility._patch_text(value_label, str(self._slider_state[widget_id]))
+        LayoutUtility._patch_style(value_node, build_style(text_color="white", bg_color="transparent", font_size=12))
 
         # Store the label for later updates.
-        if not hasattr(self, "_slider_labels"):
-            self._slider_labels = {}
         self._slider_labels[widget_id] = value_label
 
-        self._current_layout.addLayout(h_layout)
+        self._pop_layout()
         return self._slider_state[widget_id]
 
+    def _create_slider_handle(self, orientation):
+        node = RetainedNode("slider_handle", QSlider(orientation))
+        node.item.valueChanged.connect(lambda value, node=node: self._set_slider_state(node.widget_id, value))
+        node.item.sliderReleased.connect(lambda node=node: self._on_slider_release(node.widget_id))
+        return node
+
     def _set_slider_state(self, widget_id, value):
         self._slider_state[widget_id] = value
         # Update the label if it exists.
-        if hasattr(self, "_slider_labels") and widget_id in self._slider_labels:
+        if widget_id in self._slider_labels:
             self._slider_labels[widget_id].setText(str(value))
         # Optionally, you might mark the dock dirty here.
         # self.dock.set_dirty()
@@ -234,19 +556,43 @@ class LayoutUtility:
         if widget_id not in self._dropdown_state:
             self._dropdown_state[widget_id] = initial_value
 
-        dropdown = QComboBox()
-        dropdown.addItems(options)
-        dropdown.setCurrentIndex(self._dropdown_state[widget_id])
-        dropdown.currentIndexChanged.connect(lambda index, wid=widget_id: self._set_dropdown_state(wid, index))
-        self._current_layout.addWidget(dropdown)
-        self.dock.set_dirty()
+        node = self._place("dropdown", widget_id, self._create_dropdown)
+        dropdown = node.item
+        dropdown.blockSignals(True)
+        if node.data.get("options") != list(options):
+            dropdown.clear()
+            dropdown.addItems(options)
+            node.data["options"] = list(options)
+        if dropdown.currentIndex() != self._dropdown_state[widget_id]:
+            dropdown.setCurrentIndex(self._dropdown_state[widget_id])
+        dropdown.blockSignals(False)
         return self._dropdown_state[widget_id]
+
+    def _create_dropdown(self):
+        node = RetainedNode("dropdown", QComboBox())
+        node.item.currentIndexChanged.connect(lambda index, node=node: self._set_dropdown_state(node.widget_id, index))
+        return node
     
     def _set_dropdown_state(self, widget_id, index):
         self._dropdown_state[widget_id] = index
         self.dock.set_dirty()
         self.dock.show()
 
+    # --------------------------------------------------------------------------
+    # CUSTOM WIDGETS
+    # --------------------------------------------------------------------------
+    def widget(self, widget, key):
+        """
+        Places a widget owned by the caller into the current layout. It is kept
+        across passes like any other, but is never deleted by the builder.
+        """
+        widget_id = self._get_key(key)
+        existing = self._nodes.get(f"widget:{widget_id}")
+        if existing is not None and existing.item is not widget:
+            self._detach(existing)
+            self._release(existing)
+        self._place("widget", widget_id, lambda: RetainedNode("widget", widget, owned=False))
+        return widget
 
     # --------------------------------------------------------------------------
     # UTILITY
@@ -255,70 +601,49 @@ class LayoutUtility:
         value = 200
         return f"rgb({value}, {value}, {value})"
 
-    def _create_boxed_container(self, layout_class, indent=0, box_color=None):
-        frame = QFrame()
-        frame.setFrameShape(QFrame.Box)
-        frame.setFrameShadow(QFrame.Plain)
-        frame.setLineWidth(1)
+    def _create_boxed_container(self, kind, layout_class, indent=0, box_color=None):
         frame_id = self._get_key("box")
+
+        def create():
+            frame = QFrame()
+            frame.setFrameShape(QFrame.Box)
+            frame.setFrameShadow(QFrame.Plain)
+            frame.setLineWidth(1)
+            # make the height the minimum necessary to contain the layout
+            frame.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
+            layout = layout_class()
+            frame.setLayout(layout)
+            return RetainedNode(kind, frame, content=layout)
+
+        node = self._place(kind, frame_id, create)
+        frame = node.item
         computed_color = box_color if box_color else self._compute_box_color()
-        frame.setObjectName(frame_id)
-        # make the height the minimum necessary to contain the layout
-        frame.setSizePolicy(QSizePolicy.Minimum, QSizePolicy.Minimum)
-        frame.setStyleSheet(f"QFrame#{frame_id} {{ border: 1px solid {computed_color}; padding: 5px; }}")
-        layout = layout_class()
-        layout.setContentsMargins(indent, 0, 0, 0)
-        frame.setLayout(layout)
-        return frame, layout
+        LayoutUtility._patch_style(node, f"border: 1px solid {computed_color}; padding: 5px;")
+        return node
 
     # --------------------------------------------------------------------------
     # GROUPING METHODS (WITH OPTIONAL BOXING, INDENT, AND ALIGNMENT)
     # --------------------------------------------------------------------------
-    def begin_horizontal(self, boxed=False, box_color=None, indent=0, alignment: LayoutAlignment = None):
+    def _begin_group(self, kind, layout_class, boxed, box_color, indent, alignment):
         if boxed:
-            container, layout = self._create_boxed_container(QHBoxLayout, indent, box_color)
-            if alignment is not None:
-                layout.setAlignment(alignment.value)
-            self._current_layout.addWidget(container)
-            self._layout_stack.append(layout)
-            self._current_layout = layout
+            node = self._create_boxed_container(f"{kind}_box", layout_class, indent, box_color)
+            LayoutUtility._patch_layout(node, node.content, indent, alignment)
         else:
-            h_layout = QHBoxLayout()
-            if indent:
-                h_layout.setContentsMargins(indent, 0, 0, 0)
-            if alignment is not None:
-                h_layout.setAlignment(alignment.value)
-            self._current_layout.addLayout(h_layout)
-            self._layout_stack.append(h_layout)
-            self._current_layout = h_layout
+            node = self._place(kind, self._get_key(kind), lambda: LayoutUtility._layout_node(kind, layout_class()))
+            LayoutUtility._patch_layout(node, node.content, indent, alignment)
+        self._push_layout(node.content)
+
+    def begin_horizontal(self, boxed=False, box_color=None, indent=0, alignment: LayoutAlignment = None):
+        self._begin_group("horizontal", QHBoxLayout, boxed, box_color, indent, alignment)
 
     def begin_vertical(self, boxed=False, box_color=None, indent=0, alignment: LayoutAlignment = None):
-        if boxed:
-            container, layout = self._create_boxed_container(QVBoxLayout, indent, box_color)
-            if alignment is not None:
-                layout.setAlignment(alignment.value)
-            self._current_layout.addWidget(container)
-            self._layout_stack.append(layout)
-            self._current_layout = layout
-        else:
-            v_layout = QVBoxLayout()
-            if indent:
-                v_layout.setContentsMargins(indent, 0, 0, 0)
-            if alignment is not None:
-                v_layout.setAlignment(alignment.value)
-            self._current_layout.addLayout(v_layout)
-            self._layout_stack.append(v_layout)
-            self._current_layout = v_layout
+        self._begin_group("vertical", QVBoxLayout, boxed, box_color, indent, alignment)
 
     def end_horizontal(self):
-        if len(self._layout_stack) > 1:
-            self._layout_stack.pop()
-            self._current_layout = self._layout_stack[-1]
+        self._pop_layout()
 
     def end_vertical(self):
-        if len(self._layout_stack) > 1:
-            self._layout_stack.pop()
-            self._current_layout = self._layout_stack[-1]
+        self._pop_layout()
 
     # --------------------------------------------------------------------------
     # SCROLLABLE REGION (with persistent scroll state)
@@ -327,9 +652,25 @@ class LayoutUtility:
         # If no scroll_id is provided, generate one.
         if scroll_id is None:
             scroll_id = self._get_key("scroll")
-        scroll_area = QScrollArea()
-        if policy is not None:
+
+        kind = "scroll_vertical" if orientation == Qt.Vertical else "scroll_horizontal"
+        node = self._place(kind, scroll_id, lambda: self._create_scroll(kind, orientation))
+        scroll_area = node.item
+        if policy is not None and node.data.get("policy") != policy:
             scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+            node.data["policy"] = policy
+
+        # If we haven't stored a scroll amount before, initialize it.
+        if scroll_id not in self._scroll_amount.keys():
+            self._scroll_amount[scroll_id] = 0
+        # Store the keep_bottom flag.
+        self._scroll_flags[scroll_id] = keep_bottom
+
+        self._push_layout(node.content)
+        return scroll_id
+
+    def _create_scroll(self, kind, orientation):
+        scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
         container = QWidget()
         if orientation == Qt.Vertical:
@@ -343,66 +684,48 @@ class LayoutUtility:
         container.setLayout(container_layout)
         scroll_area.setWidget(container)
 
-
-        # Connect the scrollbar's valueChanged signal to store its current value.
+        node = RetainedNode(kind, scroll_area, content=container_layout)
+        # Connect the scrollbar's signals to store its current value, and to follow the bottom if asked to.
         scroll_area.verticalScrollBar().valueChanged.connect(
-            lambda value, sid=scroll_id: self._on_scroll_value_changed(value, sid)
+            lambda value, node=node: self._on_scroll_value_changed(value, node.widget_id)
         )
-
-        # Persist this scroll widget.
-        self._scroll_widget[scroll_id] = scroll_area
-        # If we haven't stored a scroll amount before, initialize it.
-        if scroll_id not in self._scroll_amount.keys():
-            self._scroll_amount[scroll_id] = 0
-        # Store the keep_bottom flag.
-        self._scroll_flags[scroll_id] = keep_bottom
-
-        self._current_layout.addWidget(scroll_area)
-        self._layout_stack.append(container_layout)
-        self._current_layout = container_layout
-
-        # Push this scroll_id onto our scroll stack.
-        self._scroll_stack.append(scroll_id)
-        return scroll_id
+        scroll_area.verticalScrollBar().rangeChanged.connect(
+            lambda minimum, maximum, node=node: self._on_scroll_range_changed(maximum, node)
+        )
+        return node
 
     def end_scroll(self):
-        if len(self._layout_stack) > 1:
-            self._layout_stack.pop()
-            self._current_layout = self._layout_stack[-1]
-
-    def _update_scroll_values(self):
-        for scroll_id in self._scroll_stack:
-            if self._scroll_flags[scroll_id]:
-                self._scroll_widget[scroll_id].verticalScrollBar().setValue(
-                    self._scroll_widget[scroll_id].verticalScrollBar().maximum()
-                )
-            else:
-                self._scroll_widget[scroll_id].verticalScrollBar().setValue(self._scroll_amount[scroll_id])
+        self._pop_layout()
 
     def _on_scroll_value_changed(self, value, scroll_id):
         # Store the current scroll value.
-        print(f"Scroll {scroll_id} value changed to {value}")
         self._scroll_amount[scroll_id] = value
 
+    def _on_scroll_range_changed(self, maximum, node):
+        if self._scroll_flags.get(node.widget_id, False):
+            node.item.verticalScrollBar().setValue(maximum)
+
     # --------------------------------------------------------------------------
     # FADE GROUP
     # --------------------------------------------------------------------------
     def begin_fade_group(self, initial_opacity=1.0):
-        container = QWidget()
-        effect = QGraphicsOpacityEffect(container)
-        effect.setOpacity(initial_opacity)
-        container.setGraphicsEffect(effect)
-        container_layout = QVBoxLayout()
-        container.setLayout(container_layout)
-        self._current_layout.addWidget(container)
-        self._layout_stack.append(container_layout)
-        self._current_layout = container_layout
-        return effect
+        def create():
+            container = QWidget()
+            effect = QGraphicsOpacityEffect(container)
+            effect.setOpacity(initial_opacity)
+            container.setGraphicsEffect(effect)
+            container_layout = QVBoxLayout()
+            container.setLayout(container_layout)
+            node = RetainedNode("fade", container, content=container_layout)
+            node.data["effect"] = effect
+            return node
+
+        node = self._place("fade", self._get_key("fade"), create)
+        self._push_layout(node.content)
+        return node.data["effect"]
 
     def end_fade_group(self):
-        if len(self._layout_stack) > 1:
-            self._layout_stack.pop()
-            self._current_layout = self._layout_stack[-1]
+        self._pop_layout()
 
     # --------------------------------------------------------------------------
     # FOLDOUT HEADER GROUP (STATEFUL) USING PUSHBUTTON
@@ -412,35 +735,39 @@ class LayoutUtility:
         if widget_id not in self._foldout_state:
             self._foldout_state[widget_id] = True
 
-        button = QPushButton()
-        button.setCheckable(True)
-        button.setChecked(self._foldout_state[widget_id])
+        node = self._place("foldout", widget_id, self._create_foldout_button)
+        button = node.item
+        node.data["title"] = title
+        if button.isChecked() != self._foldout_state[widget_id]:
+            button.blockSignals(True)
+            button.setChecked(self._foldout_state[widget_id])
+            button.blockSignals(False)
         arrow = "v" if self._foldout_state[widget_id] else ">"
-        button.setText(f"{arrow} {title}")
-        button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        button.setFixedHeight(20)
-        button.setStyleSheet("QPushButton { text-align: left; padding: 2px 5px; margin: 0px; }")
-        button.clicked.connect(lambda checked, wid=widget_id: self._on_foldout_toggled(checked, wid, title, button))
-        self._current_layout.addWidget(button)
+        LayoutUtility._patch_text(button, f"{arrow} {title}")
 
         if boxed:
-            container, layout = self._create_boxed_container(QVBoxLayout, indent, box_color)
-            self._current_layout.addWidget(container)
-            self._layout_stack.append(layout)
-            self._current_layout = layout
+            body = self._create_boxed_container("foldout_box", QVBoxLayout, indent, box_color)
         else:
-            v_layout = QVBoxLayout()
-            v_layout.setContentsMargins(indent, 0, 0, 0)
-            self._current_layout.addLayout(v_layout)
-            self._layout_stack.append(v_layout)
-            self._current_layout = v_layout
+            body = self._place("foldout_body", widget_id, lambda: LayoutUtility._layout_node("foldout_body", QVBoxLayout()))
+        LayoutUtility._patch_layout(body, body.content, indent, None)
+        self._push_layout(body.content)
 
         return self._foldout_state[widget_id]
 
-    def _on_foldout_toggled(self, checked, widget_id, title, button):
-        self._set_foldout_state(widget_id, checked)
+    def _create_foldout_button(self):
+        button = QPushButton()
+        button.setCheckable(True)
+        button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        button.setFixedHeight(20)
+        StyleRegistry.apply(button, "text-align: left; padding: 2px 5px; margin: 0px;")
+        node = RetainedNode("foldout", button)
+        button.clicked.connect(lambda checked, node=node: self._on_foldout_toggled(checked, node))
+        return node
+
+    def _on_foldout_toggled(self, checked, node):
+        self._set_foldout_state(node.widget_id, checked)
         new_arrow = "v" if checked else ">"
-        button.setText(f"{new_arrow} {title}")
+        node.item.setText(f"{new_arrow} {node.data['title']}")
 
     def _set_foldout_state(self, widget_id, value):
         self._foldout_state[widget_id] = value
@@ -448,51 +775,65 @@ class LayoutUtility:
         self.dock.show()
 
     def end_foldout_header_group(self):
-        if len(self._layout_stack) > 1:
-            self._layout_stack.pop()
-            self._current_layout = self._layout_stack[-1]
+        self._pop_layout()
 
     # --------------------------------------------------------------------------
     # TOGGLE GROUP
     # --------------------------------------------------------------------------
     def begin_toggle_group(self, label, initial_state=True, boxed=False, box_color=None, indent=10):
-        group_box = QGroupBox(label)
-        group_box.setCheckable(True)
-        group_box.setChecked(initial_state)
-        group_layout = QVBoxLayout()
-        group_box.setLayout(group_layout)
+        widget_id = self._get_key(label)
+
+        def create():
+            group_box = QGroupBox(label)
+            group_box.setCheckable(True)
+            group_box.setChecked(initial_state)
+            group_layout = QVBoxLayout()
+            group_box.setLayout(group_layout)
+            return RetainedNode("toggle_group", group_box, content=group_layout)
+
+        node = self._place("toggle_group", widget_id, create)
+        group_box = node.item
+        if group_box.title() != label:
+            group_box.setTitle(label)
         if boxed:
             computed_color = box_color if box_color else self._compute_box_color()
-            group_box.setStyleSheet(f"QGroupBox {{ border: 1px solid {computed_color}; padding: 5px; }}")
+            LayoutUtility._patch_style(node, f"border: 1px solid {computed_color}; padding: 5px;")
+            LayoutUtility._patch_layout(node, node.content, 0, None)
         else:
-            group_layout.setContentsMargins(indent, 0, 0, 0)
-        self._current_layout.addWidget(group_box)
-        self._layout_stack.append(group_layout)
-        self._current_layout = group_layout
+            LayoutUtility._patch_style(node, "")
+            LayoutUtility._patch_layout(node, node.content, indent, None)
+        self._push_layout(node.content)
         return group_box
 
     def end_toggle_group(self):
-        if len(self._layout_stack) > 1:
-            self._layout_stack.pop()
-            self._current_layout = self._layout_stack[-1]
+        self._pop_layout()
 
     # --------------------------------------------------------------------------
     # SPACE METHODS (Like Unity's GUILayout.Space and FlexibleSpace)
     # --------------------------------------------------------------------------
+    def _place_spacer(self, width, height, horizontal_policy, vertical_policy):
+        layout = self._current_layout
+        index = self._cursor_stack[-1]
+        item = layout.itemAt(index)
+        spacer = item.spacerItem() if item is not None else None
+        if spacer is None:
+            layout.insertSpacerItem(index, QSpacerItem(width, height, horizontal_policy, vertical_policy))
+        else:
+            size_policy = spacer.sizePolicy()
+            if (spacer.sizeHint().width(), spacer.sizeHint().height(),
+                size_policy.horizontalPolicy(), size_policy.verticalPolicy()) != (width, height, horizontal_policy, vertical_policy):
+                spacer.changeSize(width, height, horizontal_policy, vertical_policy)
+                layout.invalidate()
+        self._cursor_stack[-1] = index + 1
+
     def space(self, size=10):
-        if isinstance(self._current_layout, QVBoxLayout):
-            spacer = QSpacerItem(0, size, QSizePolicy.Fixed, QSizePolicy.Fixed)
-        elif isinstance(self._current_layout, QHBoxLayout):
-            spacer = QSpacerItem(size, 0, QSizePolicy.Fixed, QSizePolicy.Fixed)
+        if isinstance(self._current_layout, QHBoxLayout):
+            self._place_spacer(size, 0, QSizePolicy.Fixed, QSizePolicy.Fixed)
         else:
-            spacer = QSpacerItem(0, size, QSizePolicy.Fixed, QSizePolicy.Fixed)
-        self._current_layout.addItem(spacer)
+            self._place_spacer(0, size, QSizePolicy.Fixed, QSizePolicy.Fixed)
 
     def flexible_space(self):
-        if isinstance(self._current_layout, QVBoxLayout):
-            spacer = QSpacerItem(0, 0, QSizePolicy.Minimum, QSizePolicy.Expanding)
-        elif isinstance(self._current_layout, QHBoxLayout):
-            spacer = QSpacerItem(0, 0, QSizePolicy.Expanding, QSizePolicy.Minimum)
+        if isinstance(self._current_layout, QHBoxLayout):
+            self._place_spacer(0, 0, QSizePolicy.Expanding, QSizePolicy.Minimum)
         else:
-            spacer = QSpacerItem(0, 0, QSizePolicy.Minimum, QSizePolicy.Expanding)
-        self._current_layout.addItem(spacer)
+            self._place_spacer(0, 0, QSizePolicy.Minimum, QSizePolicy.Expanding)
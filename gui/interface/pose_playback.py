@@ -0,0 +1,88 @@
+import numpy as np
+
+
+class PosePlayback:
+    """
+    Joint angles in between telemetry samples, so the view moves smoothly whatever the datastream rate.
+
+    Poses are shown `delay` seconds in the past and interpolated between the two
+    samples around that time. Once there is no newer sample (the delay is shorter
+    than the sample interval, or the stream paused), the motion between the last
+    two samples is extrapolated for at most `max_extrapolation` seconds, then the
+    newest sample is shown as is. A delay of 0 always extrapolates.
+
+    set_samples() copies the last few samples of every joint into (joints, samples)
+    arrays when telemetry arrives, and pose_at() computes all joints from them at
+    once, so a frame costs a handful of NumPy operations whatever the joint count.
+    """
+    HISTORY = 8  # samples per joint used for playback
+    DEFAULT_DELAY = 0.1  # seconds
+    DEFAULT_MAX_EXTRAPOLATION = 0.1  # seconds
+
+    def __init__(self, joint_count: int):
+        self.joint_count = joint_count
+        self.delay = PosePlayback.DEFAULT_DELAY
+        self.max_extrapolation = PosePlayback.DEFAULT_MAX_EXTRAPOLATION
+        # oldest sample first, rows with fewer samples are padded at the front with their oldest one
+        self.timestamps = np.zeros((joint_count, PosePlayback.HISTORY))
+        self.angles = np.zeros((joint_count, PosePlayback.HISTORY))  # in turns, like SensorDataSnapshot.joint_angle
+        self.has_samples = np.zeros(joint_count, dtype=bool)
+
+    def set_samples(self, datastreams: list):
+        """`datastreams` holds one SensorDatastream, or None, per joint."""
+        history = PosePlayback.HISTORY
+        timestamps = np.zeros((self.joint_count, history))
+        angles = np.zeros((self.joint_count, history))
+        has_samples = np.zeros(self.joint_count, dtype=bool)
+        for joint, datastream in enumerate(datastreams[:self.joint_count]):
+            snapshots = datastream.snapshots[-history:] if datastream is not None else []
+            if not snapshots:
+                continue
+            padding = history - len(snapshots)
+            timestamps[joint, padding:] = [snapshot.timestamp for snapshot in snapshots]
+            angles[joint, padding:] = [snapshot.joint_angle for snapshot in snapshots]
+            timestamps[joint, :padding] = timestamps[joint, padding]
+            angles[joint, :padding] = angles[joint, padding]
+            has_samples[joint] = True
+
+        # go the short way around when the angle wraps between samples
+        self.angles = np.unwrap(angles, period=1.0, axis=1)
+        self.timestamps = timestamps
+        self.has_samples = has_samples
+
+    def pose_at(self, time: float) -> np.ndarray:
+        """
+        Angle of every joint, in turns, at `time` (same clock as the snapshot timestamps).
+        Joints without samples are 0, see has_samples.
+        """
+        timestamps = self.timestamps
+        rows = np.arange(self.joint_count)
+        # the first sample after `time`, kept in 1 .. HISTORY - 1 so that (after - 1, after) is always a pair
+        after = np.clip((timestamps <= time).sum(axis=1), 1, PosePlayback.HISTORY - 1)
+        start_times = timestamps[rows, after - 1]
+        start_angles = self.angles[rows, after - 1]
+        spans = timestamps[rows, after] - start_times
+
+        # padding and repeated timestamps have no span, show the newer sample
+        has_span = spans > 0
+        fractions = np.divide(time - start_times, spans, out=np.ones_like(spans), where=has_span)
+        # hold the oldest sample before it, extrapolate the newest for at most max_extrapolation, then
+        # hold the newest sample itself, a stalled stream should not leave the links where a guess put them
+        limits = 1 + np.divide(self.max_extrapolation, spans, out=np.zeros_like(spans), where=has_span)
+        fractions = np.where(fractions >= limits, 1.0, np.maximum(fractions, 0))
+        return start_angles + fractions * (self.angles[rows, after] - start_angles)
+
+    def is_settled(self, now: float) -> bool:
+        """
+        Whether the pose shown at `now` is final until new samples arrive, i.e. playback
+        has passed the newest sample and its extrapolation. Until then the pose may still
+        change, even if it did not change over the last frame.
+        """
+        if not self.has_samples.any():
+            return True
+        newest = self.timestamps[self.has_samples, -1].max()
+        return now - self.delay >= newest + self.max_extrapolation
+
+    def current_pose(self, now: float) -> np.ndarray:
+        """pose_at() the time shown at `now`, i.e. `delay` seconds earlier."""
+        return self.pose_at(now - self.delay)
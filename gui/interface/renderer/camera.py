@@ -14,6 +14,9 @@ class PerspectiveCamera:
         self.near = near
         self.far = far
 
+    def parameters(self) -> tuple:
+        return (self.fov, self.aspect_ratio, self.near, self.far)
+
     def get_projection_matrix(self):
         return glm.perspective(self.fov, self.aspect_ratio, self.near, self.far)
 
@@ -26,6 +29,9 @@ class OrthographicCamera:
         self.near = near
         self.far = far
 
+    def parameters(self) -> tuple:
+        return (self.left, self.right, self.bottom, self.top, self.near, self.far)
+
     def get_projection_matrix(self):
         return glm.ortho(self.left, self.right, self.bottom, self.top, self.near, self.far)
 
@@ -35,6 +41,12 @@ class Camera:
         self.transform = transform
         self.perspective = None
         self.orthographic = None
+        # cached matrices, with the state they were built from
+        self._view_matrix = None
+        self._view_transform = None  # the transform _view_matrix was built from
+        self._view_version = -1  # and its version at the time
+        self._projection_matrix = None
+        self._projection_key = None
 
     @staticmethod
     def perspective(fov: float, aspect_ratio: float, near: float, far: float) -> "Camera":
@@ -75,11 +87,28 @@ class Camera:
         self.mode = CameraMode.ORTHOGRAPHIC
         self.orthographic = OrthographicCamera(left, right, bottom, top, near, far)
 
-    def get_projection_matrix(self):
+    def _projection_parameters(self):
         if self.mode == CameraMode.PERSPECTIVE:
-            return self.perspective.get_projection_matrix()
+            return self.perspective
         elif self.mode == CameraMode.ORTHOGRAPHIC:
-            return self.orthographic.get_projection_matrix()
+            return self.orthographic
+
+    def state_key(self) -> tuple:
+        """Changes whenever the view or projection matrix would, without building them."""
+        return (id(self.transform), self.transform.version, self.mode, self._projection_parameters().parameters())
+
+    def get_projection_matrix(self):
+        projection_parameters = self._projection_parameters()
+        key = (self.mode, projection_parameters.parameters())
+        if self._projection_key != key:
+            self._projection_matrix = projection_parameters.get_projection_matrix()
+            self._projection_key = key
+        return self._projection_matrix
         
     def get_view_matrix(self):
-        return glm.inverse(self.transform.get_matrix())
\ No newline at end of file
+        # only inverted again once the camera moved
+        if self._view_transform is not self.transform or self._view_version != self.transform.version:
+            self._view_matrix = glm.inverse(self.transform.get_matrix())
+            self._view_transform = self.transform
+            self._view_version = self.transform.version
+        return self._view_matrix
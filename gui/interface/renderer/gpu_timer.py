@@ -0,0 +1,54 @@
+import ctypes
+from collections import deque
+
+from OpenGL import GL
+
+
+class GpuTimer:
+    """
+    Measures GPU time with GL_TIME_ELAPSED queries.
+
+    Results are read back only once the GPU has them, usually a frame or two
+    later, so timing never makes the CPU wait on the GPU. GL allows only one
+    GL_TIME_ELAPSED query at a time, so begin()/end() pairs can't be nested.
+    """
+    def __init__(self):
+        self._free_queries = []
+        self._pending = deque()  # query ids ended but not read back, oldest first
+        self._active = None
+        self.last_seconds = None  # most recent result, None until one is available
+
+    def begin(self):
+        if self._active is not None:
+            raise RuntimeError("GpuTimer.begin called twice without end")
+        self._active = self._free_queries.pop() if self._free_queries else int(GL.glGenQueries(1)[0])
+        GL.glBeginQuery(GL.GL_TIME_ELAPSED, self._active)
+
+    def end(self):
+        GL.glEndQuery(GL.GL_TIME_ELAPSED)
+        self._pending.append(self._active)
+        self._active = None
+
+    def poll(self) -> list[float]:
+        """Seconds measured by every query that finished since the last poll, oldest first."""
+        results = []
+        while self._pending:
+            query = self._pending[0]
+            if not GL.glGetQueryObjectuiv(query, GL.GL_QUERY_RESULT_AVAILABLE):
+                break
+            self._pending.popleft()
+            # PyOpenGL can't allocate the 64 bit output itself
+            nanoseconds = ctypes.c_uint64()
+            GL.glGetQueryObjectui64v(query, GL.GL_QUERY_RESULT, ctypes.byref(nanoseconds))
+            results.append(nanoseconds.value / 1e9)
+            self._free_queries.append(query)
+        if results:
+            self.last_seconds = results[-1]
+        return results
+
+    def delete(self):
+        queries = self._free_queries + list(self._pending)
+        if queries:
+            GL.glDeleteQueries(len(queries), queries)
+        self._free_queries = []
+        self._pending.clear()
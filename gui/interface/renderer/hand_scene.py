@@ -0,0 +1,90 @@
+import glm
+
+from interface.renderer.renderer import Renderer
+from interface.renderer.material import Material
+from interface.renderer.scene_graph import Transform
+from interface.renderer.mesh import Mesh
+from util.path import PathUtil
+
+
+class HandScene:
+    """
+    The finger shown in the Simulation view: a base with two links, each a child of
+    the one before, and a camera orbiting the origin. Shared by the view and the
+    headless render benchmark, so both draw the same thing.
+    """
+    MESH_NAMES = ["crystal", "base", "link_1", "link_2"]
+    BASE_POSITION = glm.vec3(0, -3, 0)
+    CAMERA_HEIGHT = 15
+
+    def __init__(self, renderer: Renderer):
+        self.renderer = renderer
+        self.materials = {}  # Map: name -> Material
+        self.base_node = None
+        self.link_1_node = None
+        self.link_2_node = None
+        self.fingers = []  # listof (base, link 1, link 2) nodes, the first one is the main finger
+
+    @staticmethod
+    def load_mesh(mesh_name: str) -> Mesh:
+        return Mesh.from_obj_file(PathUtil.asset_file_path(f"meshes/{mesh_name}.obj"))
+
+    def build(self, meshes: dict):
+        """Upload `meshes` (Map: name -> Mesh) and create the main finger. Needs the GL context to be current."""
+        for mesh_name, mesh in meshes.items():
+            self.renderer.add_mesh(mesh, mesh_name)
+
+        context = self.renderer.context
+        self.materials = {
+            "red": Material.base_color(context, glm.vec3(0.8, 0.1, 0.15)),
+            "blue": Material.base_color(context, glm.vec3(0.15, 0.1, 0.9)),
+            "green": Material.base_color(context, glm.vec3(0.15, 0.9, 0.1)),
+        }
+        self.base_node, self.link_1_node, self.link_2_node = self.add_finger(HandScene.BASE_POSITION)
+
+    def add_finger(self, position: glm.vec3) -> tuple:
+        """Adds a finger with its base at `position`, sharing meshes and materials with the others."""
+        # add the base
+        scale_axis = 10.0
+        base_node = self.renderer.add_child(
+            "base",
+            self.materials["red"],
+            Transform().set_position(position).set_scale(glm.vec3(scale_axis, scale_axis, scale_axis)),
+        )
+
+        # as a parent of the base, add the first link
+        link_1_node = self.renderer.add_child(
+            "link_1",
+            self.materials["blue"],
+            Transform().set_position(glm.vec3(0, .05, -0.2)),
+            base_node
+        )
+
+        # as a parent of the first link, add the second link
+        link_2_node = self.renderer.add_child(
+            "link_2",
+            self.materials["green"],
+            Transform().set_position(glm.vec3(0, 0.05, -0.55)),
+            link_1_node
+        )
+
+        finger = (base_node, link_1_node, link_2_node)
+        self.fingers.append(finger)
+        return finger
+
+    @staticmethod
+    def link_rotation(angle: float) -> glm.quat:
+        """Rotation of a link `angle` degrees about its joint axis."""
+        return glm.angleAxis(glm.radians(angle), glm.vec3(1, 0, 0))
+
+    def set_camera_orbit(self, distance: float, angle: float):
+        camera = self.renderer.context.camera
+        camera.transform.position = glm.vec3(
+            distance * glm.sin(glm.radians(angle)),
+            HandScene.CAMERA_HEIGHT,
+            distance * glm.cos(glm.radians(angle)),
+        )
+
+        # make the camera look at the origin
+        direction = glm.normalize(glm.vec3(0.0, 0.0, 0.0) - camera.transform.position)
+        camera.transform.rotation = glm.quatLookAt(direction, glm.vec3(0.0, 1.0, 0.0))
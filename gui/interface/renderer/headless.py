@@ -0,0 +1,153 @@
+import ctypes
+import os
+import sys
+
+PLATFORMS = ("egl", "osmesa")
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+
+def select_platform(platform: str):
+    """
+    Makes PyOpenGL load `platform` ("egl" or "osmesa") instead of the windowing system's GL.
+    PyOpenGL picks its platform when OpenGL is first imported, so call this before anything imports it.
+    """
+    if platform not in PLATFORMS:
+        raise ValueError(f"Unknown headless platform {platform}, expected one of {', '.join(PLATFORMS)}")
+    if "OpenGL" in sys.modules and os.environ.get("PYOPENGL_PLATFORM") != platform:
+        raise RuntimeError("OpenGL was imported before the headless platform was selected")
+    os.environ["PYOPENGL_PLATFORM"] = platform
+
+
+class HeadlessContext:
+    """
+    An OpenGL 3.3 core context with no window, rendering into a framebuffer object.
+
+    Uses EGL (surfaceless, e.g. Mesa llvmpipe on a machine with no GPU or
+    display) or OSMesa, whichever select_platform() chose. Everything the
+    renderer draws while the context is current ends up in the framebuffer,
+    which read_pixels() and save_image() read back.
+    """
+    def __init__(self, width: int, height: int):
+        self.platform = os.environ.get("PYOPENGL_PLATFORM")
+        if self.platform not in PLATFORMS:
+            raise RuntimeError("Call headless.select_platform before creating a HeadlessContext")
+        self.width = width
+        self.height = height
+        self._display = None
+        self._context = None
+        self._osmesa_buffer = None
+
+        if self.platform == "egl":
+            self._create_egl_context()
+        else:
+            self._create_osmesa_context()
+        self._create_framebuffer()
+
+    def _create_egl_context(self):
+        from OpenGL import EGL
+
+        display = EGL.EGL_NO_DISPLAY
+        if bool(EGL.eglGetPlatformDisplayEXT):
+            display = EGL.eglGetPlatformDisplayEXT(EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+        if not display:
+            display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError("Could not initialize an EGL display")
+
+        config = EGL.EGLConfig()
+        config_count = EGL.EGLint()
+        # the default surface type is window, which a surfaceless display has none of
+        config_attributes = (EGL.EGLint * 5)(
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_NONE,
+        )
+        EGL.eglChooseConfig(display, config_attributes, ctypes.pointer(config), 1, ctypes.pointer(config_count))
+        if config_count.value == 0:
+            raise RuntimeError("No EGL config supports desktop OpenGL")
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attributes = (EGL.EGLint * 7)(
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+            EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+            EGL.EGL_NONE,
+        )
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, context_attributes)
+        if not context:
+            raise RuntimeError("Could not create an OpenGL 3.3 core EGL context")
+        # surfaceless, all drawing goes to the framebuffer object
+        if not EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, context):
+            raise RuntimeError("Could not make the EGL context current")
+        self._display = display
+        self._context = context
+
+    def _create_osmesa_context(self):
+        from OpenGL import GL, arrays, osmesa
+
+        context = osmesa.OSMesaCreateContextAttribs([
+            osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+            osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+            osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3,
+            osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3,
+            0,
+        ], None)
+        if not context:
+            raise RuntimeError("Could not create an OpenGL 3.3 core OSMesa context")
+        # OSMesa needs a buffer to make the context current, even though drawing goes to the framebuffer object
+        self._osmesa_buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        if not osmesa.OSMesaMakeCurrent(context, self._osmesa_buffer, GL.GL_UNSIGNED_BYTE, self.width, self.height):
+            raise RuntimeError("Could not make the OSMesa context current")
+        self._context = context
+
+    def _create_framebuffer(self):
+        from OpenGL import GL
+
+        self.framebuffer = GL.glGenFramebuffers(1)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.framebuffer)
+        self.color_buffer, self.depth_buffer = GL.glGenRenderbuffers(2)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.color_buffer)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_RGBA8, self.width, self.height)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_RENDERBUFFER, self.color_buffer)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.depth_buffer)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_DEPTH_COMPONENT24, self.width, self.height)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_DEPTH_ATTACHMENT, GL.GL_RENDERBUFFER, self.depth_buffer)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+        if GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER) != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("The offscreen framebuffer is incomplete")
+        GL.glViewport(0, 0, self.width, self.height)
+
+    def renderer_name(self) -> str:
+        from OpenGL import GL
+        return f"{GL.glGetString(GL.GL_RENDERER).decode()} ({GL.glGetString(GL.GL_VERSION).decode()})"
+
+    def read_pixels(self):
+        """The framebuffer as a (height, width, 4) uint8 RGBA array, top row first."""
+        import numpy as np
+        from OpenGL import GL
+
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self.framebuffer)
+        data = GL.glReadPixels(0, 0, self.width, self.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
+        # GL rows start at the bottom
+        return np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 4)[::-1]
+
+    def save_image(self, path: str):
+        """Writes the framebuffer to `path`, in whatever format its extension names (e.g. .png)."""
+        from PyQt5.QtGui import QImage
+
+        pixels = self.read_pixels().copy()
+        image = QImage(pixels.data, self.width, self.height, 4 * self.width, QImage.Format_RGBA8888)
+        if not image.save(path):
+            raise OSError(f"Could not write {path}")
+
+    def close(self):
+        if self.platform == "egl" and self._context is not None:
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self._display, self._context)
+            EGL.eglTerminate(self._display)
+        elif self.platform == "osmesa" and self._context is not None:
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self._context)
+        self._context = None
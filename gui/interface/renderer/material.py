@@ -1,16 +1,18 @@
+import itertools
+
 import glm
 from OpenGL import GL
 
 from util.path import PathUtil
 
+# the uniform block holding the camera matrices, see RendererContext.upload_camera_buffer
+CAMERA_BLOCK_NAME = "CameraData"
+CAMERA_BLOCK_BINDING = 0
+
 class UniformLocations:
     def __init__(self, shader):
         self.color = GL.glGetUniformLocation(shader, "u_color")
-        self.model = GL.glGetUniformLocation(shader, "u_model")
-        self.view = GL.glGetUniformLocation(shader, "u_view")
-        self.projection = GL.glGetUniformLocation(shader, "u_proj")
         self.use_fade = GL.glGetUniformLocation(shader, "u_fade")
-        self.camera_position = GL.glGetUniformLocation(shader, "u_cameraPos")
 
 class ShaderPair:
     def __init__(self, vertex_shader: str, fragment_shader: str):
@@ -42,6 +44,14 @@ class ShaderRegistry:
     def __init__(self):
         self.keys_to_shader_ids = {}
         self.shader_ids_to_pair = {}
+        self.shader_ids_to_locations = {}  # Map: shader id -> UniformLocations, looked up once per program
+
+    def locations(self, shader_id: int) -> UniformLocations:
+        locations = self.shader_ids_to_locations.get(shader_id)
+        if locations is None:
+            locations = UniformLocations(shader_id)
+            self.shader_ids_to_locations[shader_id] = locations
+        return locations
 
     def _generate_shader_key(self, vertex_shader_path: str, fragment_shader_path: str) -> str:
         return f"{vertex_shader_path},{fragment_shader_path}"
@@ -57,6 +67,9 @@ class ShaderRegistry:
             PathUtil.read_file(fragment_shader_path),
         )
         shader_id = shader_pair.compile()
+        camera_block = GL.glGetUniformBlockIndex(shader_id, CAMERA_BLOCK_NAME)
+        if camera_block != GL.GL_INVALID_INDEX:
+            GL.glUniformBlockBinding(shader_id, camera_block, CAMERA_BLOCK_BINDING)
         # print(f"Registered shader pair {key} with id {shader_id}")
         self.keys_to_shader_ids[key] = shader_id
         self.shader_ids_to_pair[shader_id] = shader_pair
@@ -90,22 +103,20 @@ class MaterialProperties:
 
 
 class Material:
+    _sequence = itertools.count()
+
     def __init__(self, shader: int, properties: MaterialProperties):
         self.shader = shader
         self.properties = properties
+        self.sort_id = next(Material._sequence)  # orders materials in the render queue
 
     def apply(self, rendering_context):
-        if rendering_context.current_material == self:
+        if rendering_context.current_material is self:
             return
 
         rendering_context.current_material = self
-
-        if rendering_context.current_shader != self.shader:
-            print("Switching shader to", self.shader)
-            rendering_context.current_shader = self.shader
-            GL.glUseProgram(self.shader)
-            rendering_context.renderer_locations = UniformLocations(self.shader)
-            rendering_context.pass_camera_uniforms()
+        rendering_context.use_program(self.shader)
+        rendering_context.state_changes += 1
 
         GL.glUniform3f(
             rendering_context.renderer_locations.color,
@@ -3,6 +3,8 @@ from OpenGL import GL
 import numpy as np
 import ctypes
 
+from interface.renderer.obj_loader import ObjLoader
+
 class Vertex:
     def __init__(self, position: glm.vec3, normal: glm.vec3):
         self.position = position
@@ -37,87 +39,44 @@ class Vertex:
 
 class Mesh:
     def __init__(self, vertices: list, indices: list[int]):
-        self.vertices = vertices  # List of Vertex objects
-        self.indices = indices  # List of int
+        # interleaved (position xyz, normal xyz) float32 rows, and uint32 indices into them
+        self.vertex_data = np.array(
+            [[v.position.x, v.position.y, v.position.z, v.normal.x, v.normal.y, v.normal.z] for v in vertices],
+            dtype=np.float32,
+        ).reshape(-1, 6)
+        self.index_data = np.array(indices, dtype=np.uint32)
+
+    @staticmethod
+    def from_arrays(vertex_data: np.ndarray, index_data: np.ndarray) -> "Mesh":
+        mesh = Mesh.__new__(Mesh)
+        mesh.vertex_data = np.ascontiguousarray(vertex_data, dtype=np.float32).reshape(-1, 6)
+        mesh.index_data = np.ascontiguousarray(index_data, dtype=np.uint32)
+        return mesh
 
-    def add_to_buffer(self, vbos: list, ibos: list):
-        offset = len(vbos) // 6
-        for vertex in self.vertices:
-            vertex.add_to_vbo(vbos)
+    @property
+    def vertices(self) -> list:
+        """The vertices as Vertex objects, built on demand."""
+        return [Vertex(glm.vec3(*row[0:3]), glm.vec3(*row[3:6])) for row in self.vertex_data.tolist()]
 
-        for index in self.indices:
-            ibos.append(index + offset)
+    @property
+    def indices(self) -> list[int]:
+        return self.index_data.tolist()
 
     @staticmethod
-    def from_obj_file(file_path: str) -> "Mesh":
+    def from_obj_file(file_path: str, use_cache: bool = True) -> "Mesh":
         """
         Load a mesh from an OBJ file.
 
         :param file_path: The path to the OBJ file.
+        :param use_cache: Reuse (and write) the parsed arrays cached next to the file, see ObjLoader.
         :return: A new Mesh object.
         """
-        positions = []  # list of glm.vec3 for vertex positions
-        normals = []  # list of glm.vec3 for vertex normals
-        vertices = []  # final list of Vertex objects
-        indices = []  # final list of indices
-        vertex_map = {}  # maps (position_index, normal_index) to the final vertex index
+        vertex_data, index_data = ObjLoader.load(file_path, use_cache)
+        return Mesh.from_arrays(vertex_data, index_data)
 
-        with open(file_path, "r") as file:
-            for line in file:
-                # Strip any whitespace at the ends.
-                line = line.strip()
-                if line.startswith("v "):
-                    parts = line.split()
-                    # Parse the x, y, z components.
-                    pos = glm.vec3(float(parts[1]), float(parts[2]), float(parts[3]))
-                    positions.append(pos)
-                elif line.startswith("vn "):
-                    parts = line.split()
-                    norm = glm.vec3(float(parts[1]), float(parts[2]), float(parts[3]))
-                    normals.append(norm)
-                elif line.startswith("f "):
-                    # Process face definitions.
-                    # Faces may have more than 3 vertices (polygon). We'll triangulate them using a fan.
-                    parts = line.split()[1:]
-                    face_vertex_indices = []
-                    for token in parts:
-                        # The token can be in formats such as:
-                        # "1" (only vertex position), "1/2" (position/texcoord),
-                        # "1//3" (position//normal), or "1/2/3" (position/texcoord/normal)
-                        splits = token.split("/")
-                        pos_index = int(splits[0])
-                        norm_index = 3
-                        if len(splits) >= 3 and splits[2] != "":
-                            norm_index = int(splits[2])
-
-                        # Use 0 as a placeholder key for missing normal
-                        key = (pos_index, norm_index if norm_index is not None else 0)
-
-                        # Check if we've already created this vertex.
-                        if key not in vertex_map.keys():
-                            position = positions[pos_index - 1]
-                            # If no normal is provided, use a default normal.
-                            if norm_index is not None:
-                                normal = normals[norm_index - 1]
-                            else:
-                                normal = glm.vec3(0.0, 0.0, 0.0)
-                            new_vertex = Vertex(position, normal)
-                            vertices.append(new_vertex)
-                            vertex_map[key] = len(vertices) - 1
-                        # Append the index for this vertex.
-                        face_vertex_indices.append(vertex_map[key])
-
-                    # Triangulate the face (assuming convex polygon using a fan)
-                    if len(face_vertex_indices) >= 3:
-                        for i in range(1, len(face_vertex_indices) - 1):
-                            indices.extend(
-                                [
-                                    face_vertex_indices[0],
-                                    face_vertex_indices[i],
-                                    face_vertex_indices[i + 1],
-                                ]
-                            )
-        return Mesh(vertices, indices)
+    @staticmethod
+    def from_obj_string(contents: str) -> "Mesh":
+        return Mesh.from_arrays(*ObjLoader.parse(contents))
     
     @staticmethod
     def multiple_from_obj_file(file_path: str) -> list["Mesh"]:
@@ -160,57 +119,128 @@ class MeshHandle:
 
 
 class MeshBuffer:
+    """
+    Every mesh's vertices and indices, packed into one vertex buffer and one index buffer.
+
+    The data lives in NumPy arrays that grow geometrically as meshes are added,
+    and the GL objects (VAO, VBO, IBO) are created once and kept for the
+    lifetime of the context. upload() only sends what was added since the last
+    upload with glBufferSubData, reallocating a GL buffer only when it is out of room.
+    """
+    INITIAL_CAPACITY = 1024  # vertices, and indices
+
     def __init__(self):
-        self.mesh_vbos = []  # List of floats (vertex buffer)
-        self.mesh_ibos = []  # List of ints (index buffer)
+        self.vertex_data = np.zeros((MeshBuffer.INITIAL_CAPACITY, 6), dtype=np.float32)
+        self.index_data = np.zeros(MeshBuffer.INITIAL_CAPACITY, dtype=np.uint32)
+        self.vertex_count = 0
+        self.index_count = 0
         self.mesh_handles = {}  # Dict mapping mesh names to MeshHandle objects
 
+        # GL objects, created by the first upload
+        self.vao = None
+        self.vbo = None
+        self.ibo = None
+        self.uploaded_vertex_count = 0
+        self.uploaded_index_count = 0
+        self.vbo_capacity = 0  # vertices the VBO has room for
+        self.ibo_capacity = 0  # indices the IBO has room for
+
+    @staticmethod
+    def _grown(array: np.ndarray, required: int) -> np.ndarray:
+        if required <= len(array):
+            return array
+        capacity = len(array)
+        while capacity < required:
+            capacity *= 2
+        grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
     def add_mesh(self, mesh: Mesh, mesh_name: str):
-        starting_index = len(self.mesh_ibos)
-        mesh.add_to_buffer(self.mesh_vbos, self.mesh_ibos)
-        index_count = len(self.mesh_ibos) - starting_index
-        self.mesh_handles[mesh_name] = MeshHandle(starting_index, index_count)
+        vertex_count = len(mesh.vertex_data)
+        index_count = len(mesh.index_data)
+        self.vertex_data = MeshBuffer._grown(self.vertex_data, self.vertex_count + vertex_count)
+        self.index_data = MeshBuffer._grown(self.index_data, self.index_count + index_count)
 
-    # Optionally, you might add functions to retrieve buffers as arrays, etc.
-    def get_vertex_buffer(self):
-        return self.mesh_vbos
+        self.vertex_data[self.vertex_count:self.vertex_count + vertex_count] = mesh.vertex_data
+        self.index_data[self.index_count:self.index_count + index_count] = mesh.index_data + self.vertex_count
 
-    def get_index_buffer(self):
-        return self.mesh_ibos
+        self.mesh_handles[mesh_name] = MeshHandle(self.index_count, index_count)
+        self.vertex_count += vertex_count
+        self.index_count += index_count
+
+    def get_vertex_buffer(self) -> np.ndarray:
+        return self.vertex_data[:self.vertex_count]
+
+    def get_index_buffer(self) -> np.ndarray:
+        return self.index_data[:self.index_count]
     
     def get_handle(self, mesh_name: str) -> MeshHandle:
         if mesh_name not in self.mesh_handles:
             return MeshHandle.make_empty()
         return self.mesh_handles[mesh_name]
-    
-    def bind(self):
-        """
-        Create and bind the VAO, VBO, and IBO, and upload the mesh data to the GPU.
-        """
+
+    def has_pending_upload(self) -> bool:
+        return self.vao is None or self.uploaded_vertex_count != self.vertex_count or self.uploaded_index_count != self.index_count
+
+    def _create_objects(self):
         # Generate and bind a Vertex Array Object (VAO)
         self.vao = GL.glGenVertexArrays(1)
         GL.glBindVertexArray(self.vao)
-
-        # Create and bind a Vertex Buffer Object (VBO)
         self.vbo = GL.glGenBuffers(1)
         GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
-        # Convert the list of floats into a numpy array of type float32.
-        vertex_data = np.array(self.mesh_vbos, dtype=np.float32)
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, vertex_data.nbytes, vertex_data, GL.GL_STATIC_DRAW)
-
-        # Create and bind an Index Buffer Object (IBO or EBO)
+        # the element array buffer binding is stored in the VAO
         self.ibo = GL.glGenBuffers(1)
         GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.ibo)
-        # Convert the list of indices into a numpy array of type uint32.
-        index_data = np.array(self.mesh_ibos, dtype=np.uint32)
-        GL.glBufferData(GL.GL_ELEMENT_ARRAY_BUFFER, index_data.nbytes, index_data, GL.GL_STATIC_DRAW)
 
         # Setup the vertex attribute pointers.
         # Here, attribute location 0 is for positions, and location 1 is for normals.
         Vertex.set_vertex_attrib_pointers()
 
-        # Unbind the VAO (the element array buffer binding is stored in the VAO)
         GL.glBindVertexArray(0)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+    @staticmethod
+    def _upload_range(buffer: int, data: np.ndarray, capacity: int, uploaded: int, count: int) -> int:
+        """
+        Sends data[uploaded:count] to `buffer`, reallocating it to len(data) if it has less than `count` room.
+        Returns the buffer's capacity afterwards.
+        """
+        # GL_COPY_WRITE_BUFFER leaves the array and element array bindings (and so whatever VAO is bound) alone
+        GL.glBindBuffer(GL.GL_COPY_WRITE_BUFFER, buffer)
+        if count > capacity:
+            # out of room, reallocate to the array's (geometrically grown) size and send everything
+            capacity = len(data)
+            GL.glBufferData(GL.GL_COPY_WRITE_BUFFER, data.nbytes, None, GL.GL_STATIC_DRAW)
+            uploaded = 0
+        item_size = data.itemsize * (data.shape[1] if data.ndim > 1 else 1)
+        pending = data[uploaded:count]
+        GL.glBufferSubData(GL.GL_COPY_WRITE_BUFFER, uploaded * item_size, pending.nbytes, pending)
+        GL.glBindBuffer(GL.GL_COPY_WRITE_BUFFER, 0)
+        return capacity
+
+    def upload(self):
+        """
+        Creates the GL objects on the first call, then sends the meshes added since the last call.
+        Needs the GL context to be current.
+        """
+        if self.vao is None:
+            self._create_objects()
+
+        if self.uploaded_vertex_count != self.vertex_count:
+            self.vbo_capacity = MeshBuffer._upload_range(
+                self.vbo, self.vertex_data, self.vbo_capacity, self.uploaded_vertex_count, self.vertex_count
+            )
+            self.uploaded_vertex_count = self.vertex_count
+        if self.uploaded_index_count != self.index_count:
+            self.ibo_capacity = MeshBuffer._upload_range(
+                self.ibo, self.index_data, self.ibo_capacity, self.uploaded_index_count, self.index_count
+            )
+            self.uploaded_index_count = self.index_count
+
+    def bind(self):
+        """Kept for callers of the old API, the buffers are only created once, see upload()."""
+        self.upload()
 
 class Grid:
     @staticmethod
@@ -0,0 +1,197 @@
+import hashlib
+import os
+
+import numpy as np
+
+
+class ObjLoader:
+    """
+    Parses OBJ files straight into interleaved vertex data and index data with NumPy.
+
+    Vertex data is float32, one (position xyz, normal xyz) row per vertex, and
+    index data is uint32 triangles (or whatever the faces are fanned into).
+    Vertices are deduplicated on their (position, normal) pair, in the order
+    they first appear in the faces.
+
+    load() keeps the result in a .npz file next to the OBJ, and reuses it as
+    long as the OBJ's modification time and size are unchanged, or its
+    contents hash to the same value, so only the first load pays for parsing.
+    """
+    CACHE_VERSION = 2  # bump when the parser output changes, to invalidate existing caches
+    CACHE_SUFFIX = ".cache.npz"
+
+    @staticmethod
+    def _parse_numbers(lines: list, dtype) -> np.ndarray:
+        if not lines:
+            return np.zeros(0, dtype=dtype)
+        return np.fromstring(" ".join(lines), dtype=dtype, sep=" ")
+
+    @staticmethod
+    def _three_fields(tokens: list, line: str) -> str:
+        if len(tokens) < 4:
+            raise ValueError(f"Expected three coordinates in OBJ line {line!r}")
+        return " ".join(tokens[1:4])
+
+    @staticmethod
+    def _resolve(indices: np.ndarray, count: int) -> np.ndarray:
+        """1-based OBJ indices to 0-based, negative ones count back from the end."""
+        return np.where(indices < 0, indices + count, indices - 1)
+
+    @staticmethod
+    def _face_corners(face_tokens: list, position_count: int, normal_count: int):
+        """
+        Position and normal index of every face corner, in order. Normal index -1 means the corner has no normal.
+        """
+        # corners are "p", "p/t", "p//n" or "p/t/n"
+        slash_count = face_tokens[0].count("/")
+        if all(token.count("/") == slash_count for token in face_tokens):
+            # every corner has the same layout, so they can all be parsed in one go
+            corners = " ".join(face_tokens).replace("//", " 0 ").replace("/", " ")
+            fields = np.fromstring(corners, dtype=np.int64, sep=" ")
+            if fields.size == len(face_tokens) * (slash_count + 1):
+                fields = fields.reshape(len(face_tokens), slash_count + 1)
+                positions = ObjLoader._resolve(fields[:, 0], position_count)
+                if slash_count == 2:
+                    normals = ObjLoader._resolve(fields[:, 2], normal_count)
+                else:
+                    normals = np.full(len(face_tokens), -1, dtype=np.int64)
+                return positions, normals
+
+        # mixed layouts or empty fields, parse each corner on its own
+        positions = np.empty(len(face_tokens), dtype=np.int64)
+        normals = np.zeros(len(face_tokens), dtype=np.int64)  # 0 marks a missing normal, OBJ indices never are 0
+        for index, token in enumerate(face_tokens):
+            splits = token.split("/")
+            positions[index] = int(splits[0])
+            if len(splits) >= 3 and splits[2] != "":
+                normals[index] = int(splits[2])
+        normals = np.where(normals == 0, -1, ObjLoader._resolve(normals, normal_count))
+        return ObjLoader._resolve(positions, position_count), normals
+
+    @staticmethod
+    def parse(text: str) -> tuple[np.ndarray, np.ndarray]:
+        """Returns (vertex data, index data) for the OBJ source `text`."""
+        position_lines = []
+        normal_lines = []
+        face_tokens = []
+        face_sizes = []
+        for line in text.splitlines():
+            # drop comments, fields may be separated by any whitespace
+            tokens = line.split("#", 1)[0].split()
+            if not tokens:
+                continue
+            keyword = tokens[0]
+            if keyword == "v":
+                # only x y z, ignoring an optional w or vertex color
+                position_lines.append(ObjLoader._three_fields(tokens, line))
+            elif keyword == "vn":
+                normal_lines.append(ObjLoader._three_fields(tokens, line))
+            elif keyword == "f":
+                face_tokens.extend(tokens[1:])
+                face_sizes.append(len(tokens) - 1)
+
+        positions = ObjLoader._parse_numbers(position_lines, np.float32).reshape(-1, 3)
+        normals = ObjLoader._parse_numbers(normal_lines, np.float32).reshape(-1, 3)
+        if not face_tokens:
+            return np.zeros((0, 6), dtype=np.float32), np.zeros(0, dtype=np.uint32)
+
+        corner_positions, corner_normals = ObjLoader._face_corners(face_tokens, len(positions), len(normals))
+
+        # deduplicate (position, normal) pairs, numbered in order of first appearance
+        # normals are shifted by one so that "no normal" (-1) becomes 0
+        keys = corner_positions * (len(normals) + 1) + (corner_normals + 1)
+        unique_keys, first_corner, corner_to_unique = np.unique(keys, return_index=True, return_inverse=True)
+        order = np.argsort(first_corner)
+        unique_to_vertex = np.empty(len(order), dtype=np.int64)
+        unique_to_vertex[order] = np.arange(len(order))
+        corner_vertices = unique_to_vertex[corner_to_unique.reshape(-1)]
+
+        vertex_positions = corner_positions[first_corner[order]]
+        vertex_normals = corner_normals[first_corner[order]]
+        vertex_data = np.zeros((len(order), 6), dtype=np.float32)
+        vertex_data[:, 0:3] = positions[vertex_positions]
+        # corners without a normal get a zero normal
+        has_normal = vertex_normals >= 0
+        vertex_data[has_normal, 3:6] = normals[vertex_normals[has_normal]]
+
+        # fan each face (assumed convex) into triangles: (first, i, i + 1) for i in 1 .. size - 2
+        face_sizes = np.asarray(face_sizes, dtype=np.int64)
+        face_starts = np.concatenate(([0], np.cumsum(face_sizes)[:-1]))
+        triangle_counts = np.maximum(face_sizes - 2, 0)
+        triangle_faces = np.repeat(np.arange(len(face_sizes)), triangle_counts)
+        # position of each triangle within its face, 1-based
+        triangle_offsets = np.arange(len(triangle_faces)) - np.repeat(np.cumsum(triangle_counts) - triangle_counts, triangle_counts) + 1
+        first = face_starts[triangle_faces]
+        triangles = np.stack((first, first + triangle_offsets, first + triangle_offsets + 1), axis=1)
+        index_data = corner_vertices[triangles.reshape(-1)].astype(np.uint32)
+        return vertex_data, index_data
+
+    @staticmethod
+    def cache_path(file_path: str) -> str:
+        return file_path + ObjLoader.CACHE_SUFFIX
+
+    @staticmethod
+    def _read_cache(cache_path: str, stat: os.stat_result, source_bytes: bytes = None):
+        """The cached arrays, or None if there is no usable cache for the source."""
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with np.load(cache_path) as cache:
+                if int(cache["version"]) != ObjLoader.CACHE_VERSION:
+                    return None
+                same_stamp = int(cache["source_mtime_ns"]) == stat.st_mtime_ns and int(cache["source_size"]) == stat.st_size
+                if not same_stamp:
+                    if source_bytes is None:
+                        return None
+                    # touched (e.g. by a checkout) but maybe not changed
+                    if str(cache["source_hash"]) != hashlib.sha1(source_bytes).hexdigest():
+                        return None
+                return cache["vertex_data"], cache["index_data"]
+        except (OSError, ValueError, KeyError):
+            # unreadable or from an older layout, parse again
+            return None
+
+    @staticmethod
+    def _write_cache(cache_path: str, stat: os.stat_result, source_bytes: bytes, vertex_data: np.ndarray, index_data: np.ndarray):
+        temporary_path = cache_path + ".tmp"
+        try:
+            with open(temporary_path, "wb") as file:
+                np.savez(
+                    file,
+                    version=ObjLoader.CACHE_VERSION,
+                    source_mtime_ns=stat.st_mtime_ns,
+                    source_size=stat.st_size,
+                    source_hash=hashlib.sha1(source_bytes).hexdigest(),
+                    vertex_data=vertex_data,
+                    index_data=index_data,
+                )
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            # the asset folder may be read only, the cache is only an optimization
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    @staticmethod
+    def load(file_path: str, use_cache: bool = True) -> tuple[np.ndarray, np.ndarray]:
+        """Returns (vertex data, index data) for the OBJ file at `file_path`."""
+        stat = os.stat(file_path)
+        cache_path = ObjLoader.cache_path(file_path)
+        if use_cache:
+            # the stamp check avoids reading the source at all in the common case
+            cached = ObjLoader._read_cache(cache_path, stat)
+            if cached is not None:
+                return cached
+
+        with open(file_path, "rb") as file:
+            source_bytes = file.read()
+        if use_cache:
+            cached = ObjLoader._read_cache(cache_path, stat, source_bytes)
+            if cached is not None:
+                # same contents, store the new stamp so the next load doesn't hash again
+                ObjLoader._write_cache(cache_path, stat, source_bytes, *cached)
+                return cached
+
+        vertex_data, index_data = ObjLoader.parse(source_bytes.decode("utf-8", errors="replace"))
+        if use_cache:
+            ObjLoader._write_cache(cache_path, stat, source_bytes, vertex_data, index_data)
+        return vertex_data, index_data
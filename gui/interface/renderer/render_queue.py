@@ -0,0 +1,172 @@
+import ctypes
+
+from OpenGL import GL
+from OpenGL.extensions import hasGLExtension
+import numpy as np
+
+from interface.renderer.mesh import MeshHandle
+from interface.renderer.scene_graph import SceneNode
+
+# a_model in the vertex shader, a mat4 takes four attribute locations, one per column
+INSTANCE_MODEL_LOCATION = 2
+INSTANCE_STRIDE = 16 * 4  # one float32 mat4 per instance
+
+
+class DrawItem:
+    __slots__ = ("node", "sort_key")
+
+    def __init__(self, node: SceneNode, sort_key: tuple):
+        self.node = node
+        self.sort_key = sort_key
+
+
+class DrawBatch:
+    """Nodes sharing a material, mesh and draw mode, drawn with one instanced call."""
+    __slots__ = ("material", "mesh_handle", "draw_mode", "first_instance", "instance_count")
+
+    def __init__(self, material, mesh_handle: MeshHandle, draw_mode: int, first_instance: int):
+        self.material = material
+        self.mesh_handle = mesh_handle
+        self.draw_mode = draw_mode
+        self.first_instance = first_instance  # row of the batch's first model matrix in the instance buffer
+        self.instance_count = 0
+
+
+class RenderQueue:
+    """
+    The drawable nodes of a scene, sorted so that draws sharing a shader,
+    then a material, then a mesh are next to each other, and grouped into
+    batches that are each drawn with a single glDrawElementsInstanced.
+
+    The queue only depends on the structure of the scene (which nodes exist,
+    their material and mesh), not on transforms, so it is rebuilt when the
+    structure changes rather than every frame. Every frame the world matrices
+    of the nodes are copied into the instance buffer, in queue order, and the
+    buffer is only uploaded if one of them changed.
+    """
+    def __init__(self):
+        self.items = []  # listof DrawItem, in draw order
+        self.batches = []  # listof DrawBatch, in draw order
+        self.scene_version = -1  # RendererContext.scene_version the queue was built for
+
+        self.instance_data = np.zeros((0, 16), dtype=np.float32)  # one model matrix per item
+        self._instance_matrices = []  # listof glm.mat4 in instance_data, compared by identity
+        self._instance_data_dirty = True
+        self.instance_buffer = None
+        self._instance_buffer_capacity = 0  # in instances
+        self._attribute_vertex_array = None  # the VAO the instance attributes were set up in
+        self._attribute_offset = None  # first instance the attributes currently point at
+        self._has_base_instance = None  # glDrawElementsInstancedBaseInstance is available (GL 4.2)
+        self.state_changes = 0  # instance uploads and attribute changes since creation, Renderer.render takes the difference per frame
+
+    @staticmethod
+    def sort_key(node: SceneNode) -> tuple:
+        rendering_info = node.rendering_info
+        return (
+            # draws that don't write depth go last, so they don't hide what is behind them
+            rendering_info.draw_mode == GL.GL_LINES,
+            rendering_info.material.shader,
+            rendering_info.material.sort_id,
+            rendering_info.mesh_handle.starting_index,
+            rendering_info.mesh_handle.index_count,
+            rendering_info.draw_mode,
+        )
+
+    @staticmethod
+    def supports_base_instance() -> bool:
+        """Whether the current context has glDrawElementsInstancedBaseInstance (GL 4.2 or ARB_base_instance)."""
+        # a resolved entry point proves nothing, glXGetProcAddress returns one for any name
+        version = (GL.glGetIntegerv(GL.GL_MAJOR_VERSION), GL.glGetIntegerv(GL.GL_MINOR_VERSION))
+        if version >= (4, 2):
+            return True
+        return hasGLExtension("GL_ARB_base_instance") and bool(GL.glDrawElementsInstancedBaseInstance)
+
+    def rebuild(self, scene_root: SceneNode, scene_version: int):
+        items = []
+
+        def collect(node, current_transform, level):
+            if not MeshHandle.is_empty(node.rendering_info.mesh_handle):
+                items.append(DrawItem(node, RenderQueue.sort_key(node)))
+
+        scene_root.traverse(collect)
+        # sort is stable, nodes with the same state keep their scene order
+        items.sort(key=lambda item: item.sort_key)
+
+        batches = []
+        previous_key = None
+        for index, item in enumerate(items):
+            # the key holds everything a batch shares, material sort ids are unique
+            if item.sort_key != previous_key:
+                rendering_info = item.node.rendering_info
+                batches.append(DrawBatch(rendering_info.material, rendering_info.mesh_handle, rendering_info.draw_mode, index))
+                previous_key = item.sort_key
+            batches[-1].instance_count += 1
+
+        self.items = items
+        self.batches = batches
+        self.instance_data = np.zeros((len(items), 16), dtype=np.float32)
+        self._instance_matrices = [None] * len(items)
+        self._instance_data_dirty = True
+        self.scene_version = scene_version
+
+    def is_stale(self, scene_version: int) -> bool:
+        return self.scene_version != scene_version
+
+    def update_instances(self):
+        """Copies the world matrices that changed since the last frame into the instance data."""
+        matrices = self._instance_matrices
+        for index, item in enumerate(self.items):
+            matrix = item.node.world_matrix()
+            if matrices[index] is not matrix:
+                # world matrices are replaced, never modified, when a node moves
+                matrices[index] = matrix
+                self.instance_data[index] = np.frombuffer(matrix.to_bytes(), dtype=np.float32)
+                self._instance_data_dirty = True
+
+    def upload_instances(self, vertex_array: int):
+        """Sends the instance data to the GPU if it changed, and sets up the instance attributes in `vertex_array`."""
+        if self.instance_buffer is None:
+            self.instance_buffer = GL.glGenBuffers(1)
+            self._has_base_instance = RenderQueue.supports_base_instance()
+
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.instance_buffer)
+        if self._instance_data_dirty and len(self.instance_data) > 0:
+            if len(self.instance_data) > self._instance_buffer_capacity:
+                self._instance_buffer_capacity = max(len(self.instance_data), 2 * self._instance_buffer_capacity)
+                GL.glBufferData(GL.GL_ARRAY_BUFFER, self._instance_buffer_capacity * INSTANCE_STRIDE, None, GL.GL_DYNAMIC_DRAW)
+            GL.glBufferSubData(GL.GL_ARRAY_BUFFER, 0, self.instance_data.nbytes, self.instance_data)
+            self.state_changes += 1
+        self._instance_data_dirty = False
+
+        if self._attribute_vertex_array != vertex_array:
+            # the mesh buffer made a new VAO
+            for column in range(4):
+                GL.glEnableVertexAttribArray(INSTANCE_MODEL_LOCATION + column)
+                GL.glVertexAttribDivisor(INSTANCE_MODEL_LOCATION + column, 1)
+            self._attribute_vertex_array = vertex_array
+            self._attribute_offset = None
+        if self._has_base_instance:
+            self._point_instance_attributes(0)
+
+    def _point_instance_attributes(self, first_instance: int):
+        # expects the instance buffer to be bound to GL_ARRAY_BUFFER
+        if self._attribute_offset == first_instance:
+            return
+        for column in range(4):
+            offset = ctypes.c_void_p(first_instance * INSTANCE_STRIDE + column * 16)
+            GL.glVertexAttribPointer(INSTANCE_MODEL_LOCATION + column, 4, GL.GL_FLOAT, GL.GL_FALSE, INSTANCE_STRIDE, offset)
+        self._attribute_offset = first_instance
+        self.state_changes += 1
+
+    def draw_batch(self, batch: DrawBatch):
+        offset = ctypes.c_void_p(batch.mesh_handle.starting_index * ctypes.sizeof(GL.GLuint))
+        if self._has_base_instance:
+            GL.glDrawElementsInstancedBaseInstance(
+                batch.draw_mode, batch.mesh_handle.index_count, GL.GL_UNSIGNED_INT, offset,
+                batch.instance_count, batch.first_instance,
+            )
+            return
+
+        # GL 3.3 has no base instance, move the attributes to the batch's first matrix instead
+        self._point_instance_attributes(batch.first_instance)
+        GL.glDrawElementsInstanced(batch.draw_mode, batch.mesh_handle.index_count, GL.GL_UNSIGNED_INT, offset, batch.instance_count)
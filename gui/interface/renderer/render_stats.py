@@ -0,0 +1,75 @@
+from collections import deque
+
+from util.perf import TimingStat
+
+
+class FrameStats:
+    """Counters and timings of one Renderer.render() call. Times are in seconds."""
+    __slots__ = (
+        "draw_calls", "state_changes", "triangles",
+        "traversal_seconds", "upload_seconds", "submit_seconds", "cpu_seconds", "gpu_seconds",
+    )
+
+    def __init__(self):
+        self.draw_calls = 0
+        self.state_changes = 0  # program, material, vertex array, depth mask and buffer changes that reached GL
+        self.triangles = 0
+        self.traversal_seconds = 0.0  # rebuilding the render queue and gathering world matrices
+        self.upload_seconds = 0.0  # meshes, camera buffer and instance data
+        self.submit_seconds = 0.0  # clearing and issuing the draw calls
+        self.cpu_seconds = 0.0  # the whole render() call
+        self.gpu_seconds = None  # filled in a frame or two later, None if GPU timing is off or not read back yet
+
+    def to_dict(self) -> dict:
+        return {
+            "draw_calls": self.draw_calls,
+            "state_changes": self.state_changes,
+            "triangles": self.triangles,
+            "traversal_ms": self.traversal_seconds * 1000,
+            "upload_ms": self.upload_seconds * 1000,
+            "submit_ms": self.submit_seconds * 1000,
+            "cpu_ms": self.cpu_seconds * 1000,
+            "gpu_ms": None if self.gpu_seconds is None else self.gpu_seconds * 1000,
+        }
+
+
+class RenderStats:
+    """
+    What the renderer spent its frames on, for the Simulation view's overlay and
+    for scripts such as the headless benchmark.
+
+    `last` is the most recent frame, `history` the recent ones, oldest first,
+    and the TimingStats keep running averages and maxima across all of them.
+    """
+    HISTORY_LENGTH = 120
+
+    def __init__(self):
+        self.last = FrameStats()
+        self.history = deque(maxlen=RenderStats.HISTORY_LENGTH)  # listof FrameStats
+        self.traversal_time = TimingStat()
+        self.upload_time = TimingStat()
+        self.submit_time = TimingStat()
+        self.cpu_time = TimingStat()
+        self.gpu_time = TimingStat()
+
+    def record_frame(self, frame: FrameStats):
+        self.last = frame
+        self.history.append(frame)
+        self.traversal_time.add(frame.traversal_seconds)
+        self.upload_time.add(frame.upload_seconds)
+        self.submit_time.add(frame.submit_seconds)
+        self.cpu_time.add(frame.cpu_seconds)
+
+    def record_gpu_time(self, frame: FrameStats, seconds: float):
+        frame.gpu_seconds = seconds
+        self.gpu_time.add(seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "last_frame": self.last.to_dict(),
+            "traversal": self.traversal_time.to_dict(),
+            "upload": self.upload_time.to_dict(),
+            "submit": self.submit_time.to_dict(),
+            "cpu": self.cpu_time.to_dict(),
+            "gpu": self.gpu_time.to_dict(),
+        }
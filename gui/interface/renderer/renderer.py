@@ -1,11 +1,16 @@
+import time
+from collections import deque
+
 from OpenGL import GL
 import glm
 
 from interface.renderer.mesh import MeshBuffer, MeshHandle, Mesh
-from interface.renderer.material import Material, UniformLocations, ShaderRegistry
+from interface.renderer.material import Material, UniformLocations, ShaderRegistry, CAMERA_BLOCK_BINDING
 from interface.renderer.scene_graph import SceneNode, Transform, RenderingInfo
 from interface.renderer.camera import Camera
-import ctypes
+from interface.renderer.render_queue import RenderQueue, DrawBatch
+from interface.renderer.render_stats import FrameStats, RenderStats
+from interface.renderer.gpu_timer import GpuTimer
 
 
 class RendererContext:
@@ -16,6 +21,7 @@ class RendererContext:
     renderer_locations : UniformLocations = None
     camera : Camera = None
     shader_registry : ShaderRegistry = None
+    scene_version : int = 0
 
     def __init__(self):
         self.current_shader = -1
@@ -25,39 +31,124 @@ class RendererContext:
         self.renderer_locations = None
         self.camera = Camera.default()
         self.shader_registry = ShaderRegistry()
+        # bumped when nodes are added or their material or mesh changes, the render queue is rebuilt then
+        self.scene_version = 0
+
+        # GL state last set through the context, calls that would not change it are skipped
+        self.current_vertex_array = None
+        self.depth_mask = None
+
+        # in the current frame
+        self.draw_calls = 0
+        self.state_changes = 0
+        self.triangles = 0
+
+        # uniform buffer with the camera matrices, shared by every program
+        self.camera_buffer = None
+        self.camera_buffer_key = None  # Camera.state_key() of what is in the buffer
+
+    def begin_frame(self):
+        """
+        Forget the cached GL state, something outside the renderer may have changed it
+        between frames, and bring the camera buffer up to date.
+        """
+        self.current_shader = -1
+        self.current_material = None
+        self.current_vertex_array = None
+        self.depth_mask = None
+        self.draw_calls = 0
+        self.state_changes = 0
+        self.triangles = 0
+        self.upload_camera_buffer()
+
+    def invalidate_scene(self):
+        """Call after changing a node's material, mesh or draw mode, or adding nodes without add_node."""
+        self.scene_version += 1
+
+    def use_program(self, shader : int):
+        if self.current_shader == shader:
+            return
+        self.current_shader = shader
+        self.current_material = None
+        self.state_changes += 1
+        GL.glUseProgram(shader)
+        self.renderer_locations = self.shader_registry.locations(shader)
+
+    def bind_vertex_array(self, vertex_array : int):
+        if self.current_vertex_array == vertex_array:
+            return
+        self.current_vertex_array = vertex_array
+        self.state_changes += 1
+        GL.glBindVertexArray(vertex_array)
+
+    def set_depth_mask(self, enabled : bool):
+        if self.depth_mask == enabled:
+            return
+        self.depth_mask = enabled
+        self.state_changes += 1
+        GL.glDepthMask(GL.GL_TRUE if enabled else GL.GL_FALSE)
 
     def add_mesh(self, mesh : Mesh, mesh_name : str):
         self.mesh_buffer.add_mesh(mesh, mesh_name)
 
     def add_mesh_from_file(self, file_path : str, mesh_name : str):
-        mesh = Mesh.from_obj(file_path)
+        mesh = Mesh.from_obj_file(file_path)
         self.add_mesh(mesh, mesh_name)
 
     def add_node(self, mesh_name : str, material : Material, transform : Transform, parent : SceneNode, draw_mode : int = GL.GL_TRIANGLES):
         mesh_handle = self.mesh_buffer.get_handle(mesh_name)
         rendering_info = RenderingInfo(transform, material, mesh_handle, draw_mode)
         node = SceneNode(mesh_name, rendering_info)
+        self.invalidate_scene()
         if parent is None:
             return self.scene_root.add_child(node)
 
         return parent.add_child(node)
 
-    def pass_camera_uniforms(self):
-        projection = self.camera.get_projection_matrix()
-        view = self.camera.get_view_matrix()
-        camera_position = self.camera.transform.position
-        GL.glUniformMatrix4fv(self.renderer_locations.projection, 1, GL.GL_FALSE, glm.value_ptr(projection))
-        GL.glUniformMatrix4fv(self.renderer_locations.view, 1, GL.GL_FALSE, glm.value_ptr(view))
-        GL.glUniform3f(self.renderer_locations.camera_position, camera_position.x, camera_position.y, camera_position.z)
+    def upload_camera_buffer(self):
+        """
+        Writes projection, view and camera position to the camera uniform buffer, in std140
+        layout (two column major mat4 then a vec3 padded to 16 bytes). Only done when the camera changed.
+        """
+        if self.camera_buffer is None:
+            self.camera_buffer = GL.glGenBuffers(1)
+            GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self.camera_buffer)
+            GL.glBufferData(GL.GL_UNIFORM_BUFFER, 144, None, GL.GL_DYNAMIC_DRAW)
+            GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, 0)
+        # the binding point is global GL state, so it is set every frame like the rest
+        GL.glBindBufferBase(GL.GL_UNIFORM_BUFFER, CAMERA_BLOCK_BINDING, self.camera_buffer)
+
+        key = self.camera.state_key()
+        if key == self.camera_buffer_key:
+            return
+        self.camera_buffer_key = key
+        self.state_changes += 1
+
+        data = (
+            self.camera.get_projection_matrix().to_bytes()
+            + self.camera.get_view_matrix().to_bytes()
+            + glm.vec4(self.camera.transform.position, 0.0).to_bytes()
+        )
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, self.camera_buffer)
+        GL.glBufferSubData(GL.GL_UNIFORM_BUFFER, 0, len(data), data)
+        GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, 0)
 
 
 class Renderer:
     def __init__(self):
         self.context = RendererContext()
+        self.render_queue = RenderQueue()
         self.mesh_dirty = True
 
+        self.stats = RenderStats()
+        # GL_TIME_ELAPSED queries around the scene pass, off by default as they cost a little each frame
+        self.gpu_timing = False
+        self.gpu_timer = None
+        self._gpu_timed_frames = deque()  # FrameStats whose GPU time is not read back yet, oldest first
+
     def bind_buffer(self):
-        self.context.mesh_buffer.bind()
+        # only sends the meshes added since the last call, the GL buffers are kept
+        self.context.mesh_buffer.upload()
         self.mesh_dirty = False
 
     def add_child(self, mesh_name : str, material : Material, transform : glm.mat4, parent : SceneNode=None, draw_mode : int = GL.GL_TRIANGLES):
@@ -68,11 +159,16 @@ class Renderer:
         self.mesh_dirty = True
 
     def begin_rendering(self):
-        GL.glClearColor(0.1, 0.2, 0.25, 1.0)
         self.bind_buffer()
+        self.apply_render_state()
 
+    def apply_render_state(self):
+        """Sets the GL state every frame relies on. Call again after anything else draws with the context, e.g. a QPainter."""
+        GL.glClearColor(0.1, 0.2, 0.25, 1.0)
         # bunch of flags
         GL.glEnable(GL.GL_DEPTH_TEST)
+        # glClear only clears depth while it can be written
+        GL.glDepthMask(GL.GL_TRUE)
         GL.glEnable(GL.GL_CULL_FACE)
         GL.glCullFace(GL.GL_BACK)
         GL.glFrontFace(GL.GL_CCW)
@@ -80,48 +176,66 @@ class Renderer:
         # enable transparency
         GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
 
-    def render(self):
-        if self.mesh_dirty:
-            self.bind_buffer()
-
-        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
-        GL.glBindVertexArray(self.context.mesh_buffer.vao)
-
-        # set whatever shader pair
-        shader_id = self.context.shader_registry.get_any_shader()
-        if self.context.current_shader != shader_id:
-            self.context.current_shader = shader_id
-            GL.glUseProgram(shader_id)
-            self.context.renderer_locations = UniformLocations(shader_id)
-
-        self.context.pass_camera_uniforms()
-        self.context.scene_root.traverse(self.render_node)
-        GL.glBindVertexArray(0)
+    def set_gpu_timing(self, enabled : bool):
+        """Measure how long the GPU takes for each frame, into stats. The results arrive a frame or two late."""
+        self.gpu_timing = enabled
 
-    def render_node(self, node : SceneNode, current_transform : glm.mat4, level : int):
-        if MeshHandle.is_empty(node.rendering_info.mesh_handle):
+    def poll_gpu_times(self):
+        """Reads back the GPU times that are ready into their frames' stats. render() does this itself."""
+        if self.gpu_timer is None:
             return
+        for seconds in self.gpu_timer.poll():
+            self.stats.record_gpu_time(self._gpu_timed_frames.popleft(), seconds)
 
-        rendering_info = node.rendering_info
-        material = rendering_info.material
-        mesh_handle = rendering_info.mesh_handle
-        material.apply(self.context)
-
-        self.render_mesh(mesh_handle, current_transform, rendering_info.draw_mode)
-
-    def render_mesh(self, mesh_handle : MeshHandle, transform : glm.mat4, draw_mode : int = GL.GL_TRIANGLES):
-        if MeshHandle.is_empty(mesh_handle):
-            return
-    
-        # print(f"Rendering mesh from {mesh_handle.starting_index} to {mesh_handle.ending_index}")
-        GL.glUniformMatrix4fv(self.context.renderer_locations.model, 1, GL.GL_FALSE, glm.value_ptr(transform))
-        offset = ctypes.c_void_p(mesh_handle.starting_index * ctypes.sizeof(GL.GLuint))
-
-        if draw_mode == GL.GL_LINES:
-            # disable writing to depth buffer for lines
-            GL.glDepthMask(GL.GL_FALSE)
-            GL.glDrawElements(draw_mode, mesh_handle.index_count, GL.GL_UNSIGNED_INT, offset)
-            GL.glDepthMask(GL.GL_TRUE)
-            return
+    def render(self):
+        frame = FrameStats()
+        start = time.perf_counter()
+        self.poll_gpu_times()
+        queue_state_changes = self.render_queue.state_changes
 
-        GL.glDrawElements(draw_mode, mesh_handle.index_count, GL.GL_UNSIGNED_INT, offset)
+        if self.mesh_dirty:
+            self.bind_buffer()
+        self.context.begin_frame()
+        self.context.bind_vertex_array(self.context.mesh_buffer.vao)
+        uploaded = time.perf_counter()
+
+        if self.render_queue.is_stale(self.context.scene_version):
+            self.render_queue.rebuild(self.context.scene_root, self.context.scene_version)
+        self.render_queue.update_instances()
+        traversed = time.perf_counter()
+
+        self.render_queue.upload_instances(self.context.mesh_buffer.vao)
+        instances_uploaded = time.perf_counter()
+
+        if self.gpu_timing:
+            if self.gpu_timer is None:
+                self.gpu_timer = GpuTimer()
+            self.gpu_timer.begin()
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        for batch in self.render_queue.batches:
+            self.render_batch(batch)
+
+        self.context.set_depth_mask(True)
+        self.context.bind_vertex_array(0)
+        if self.gpu_timing:
+            self.gpu_timer.end()
+            self._gpu_timed_frames.append(frame)
+        end = time.perf_counter()
+
+        frame.traversal_seconds = traversed - uploaded
+        frame.upload_seconds = (uploaded - start) + (instances_uploaded - traversed)
+        frame.submit_seconds = end - instances_uploaded
+        frame.cpu_seconds = end - start
+        frame.draw_calls = self.context.draw_calls
+        frame.state_changes = self.context.state_changes + self.render_queue.state_changes - queue_state_changes
+        frame.triangles = self.context.triangles
+        self.stats.record_frame(frame)
+
+    def render_batch(self, batch : DrawBatch):
+        batch.material.apply(self.context)
+        # don't write to the depth buffer for lines, the queue draws them last
+        self.context.set_depth_mask(batch.draw_mode != GL.GL_LINES)
+        self.render_queue.draw_batch(batch)
+        self.context.draw_calls += 1
+        if batch.draw_mode == GL.GL_TRIANGLES:
+            self.context.triangles += batch.mesh_handle.index_count // 3 * batch.instance_count
@@ -5,12 +5,54 @@ from interface.renderer.material import Material
 from interface.renderer.mesh import MeshHandle
 
 class Transform:
+    """
+    Position, rotation and scale, with the matrix they make cached until one of them is set.
+
+    Assign whole values (transform.position = glm.vec3(...)), changing a component
+    in place (transform.position.x = 1) is not noticed.
+    """
     def __init__(self):
-        self.position = glm.vec3(0.0, 0.0, 0.0)
+        self._position = glm.vec3(0.0, 0.0, 0.0)
         # Use glm.quat for rotation.
         # Note: In GLM the identity quaternion is glm.quat(1, 0, 0, 0) (w, x, y, z).
-        self.rotation = glm.quat(1, 0, 0, 0)
-        self.scale = glm.vec3(1.0, 1.0, 1.0)
+        self._rotation = glm.quat(1, 0, 0, 0)
+        self._scale = glm.vec3(1.0, 1.0, 1.0)
+        self._matrix = None  # cached get_matrix(), None when it has to be rebuilt
+        self.version = 0  # incremented every time the transform changes
+        self.nodes = []  # listof SceneNode whose world matrix depends on this transform
+
+    def _changed(self):
+        self._matrix = None
+        self.version += 1
+        for node in self.nodes:
+            node.mark_dirty()
+
+    @property
+    def position(self) -> glm.vec3:
+        return self._position
+
+    @position.setter
+    def position(self, position: glm.vec3):
+        self._position = position
+        self._changed()
+
+    @property
+    def rotation(self) -> glm.quat:
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, rotation: glm.quat):
+        self._rotation = rotation
+        self._changed()
+
+    @property
+    def scale(self) -> glm.vec3:
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale: glm.vec3):
+        self._scale = scale
+        self._changed()
 
     def set_position(self, position: glm.vec3):
         self.position = position
@@ -28,14 +70,18 @@ class Transform:
         """
         Constructs a 4x4 transformation matrix from position, rotation, and scale.
         The order is: Translation * Rotation * Scale.
+        The matrix is kept until the transform changes, don't modify it.
         """
+        if self._matrix is not None:
+            return self._matrix
         # Create translation matrix.
-        translation = glm.translate(glm.mat4(1.0), self.position)
+        translation = glm.translate(glm.mat4(1.0), self._position)
         # Create rotation matrix from quaternion.
-        rotation = glm.mat4_cast(self.rotation)
+        rotation = glm.mat4_cast(self._rotation)
         # Create scaling matrix.
-        scaling = glm.scale(glm.mat4(1.0), self.scale)
-        return translation * rotation * scaling
+        scaling = glm.scale(glm.mat4(1.0), self._scale)
+        self._matrix = translation * rotation * scaling
+        return self._matrix
 
 
 class RenderingInfo:
@@ -52,6 +98,9 @@ class SceneNode:
         self.name = name
         self.rendering_info = render_info
         self.children = []
+        self.parent = None
+        self._world_matrix = None  # cached parent world matrix * local matrix, None when dirty
+        render_info.transform.nodes.append(self)
 
     @staticmethod
     def empty_node(name: str) -> "SceneNode":
@@ -62,31 +111,53 @@ class SceneNode:
 
     def add_child(self, child: "SceneNode"):
         self.children.append(child)
+        child.parent = self
+        child.mark_dirty()
         return child
 
-    def _traverse_helper(self, callback, parent_transform: glm.mat4, level: int):
+    def set_transform(self, transform: Transform):
+        """Replace the node's transform, use this rather than assigning rendering_info.transform."""
+        self.rendering_info.transform.nodes.remove(self)
+        self.rendering_info.transform = transform
+        transform.nodes.append(self)
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        """Drops the cached world matrix of this node and everything below it."""
+        if self._world_matrix is None:
+            # already dirty, and so is the whole subtree
+            return
+        self._world_matrix = None
+        for child in self.children:
+            child.mark_dirty()
+
+    def world_matrix(self) -> glm.mat4:
+        """The node's transform combined with all of its parents', cached until one of them changes."""
+        if self._world_matrix is None:
+            local_transform = self.rendering_info.transform.get_matrix()
+            if self.parent is None:
+                self._world_matrix = local_transform
+            else:
+                self._world_matrix = glm.mul(self.parent.world_matrix(), local_transform)
+        return self._world_matrix
+
+    def _traverse_helper(self, callback, level: int):
         """
         Recursively traverse the scene graph.
 
         :param callback: A function that takes (node, current_transform, level).
-        :param parent_transform: The accumulated transformation matrix from parent nodes.
         :param level: The current depth level in the scene graph.
         """
-        # Compute the local transformation matrix.
-        local_transform = self.rendering_info.transform.get_matrix()
-        # Combine with parent's transformation.
-        current_transform = glm.mul(parent_transform, local_transform)
-
-        # Call the callback for the current node.
-        callback(self, current_transform, level)
+        # Call the callback for the current node, its world matrix is only rebuilt if it changed.
+        callback(self, self.world_matrix(), level)
 
         # Recurse for each child.
         for child in self.children:
-            child._traverse_helper(callback, current_transform, level + 1)
+            child._traverse_helper(callback, level + 1)
 
     def traverse(self, callback):
         """
-        Begin traversal from this node with the identity transformation.
+        Begin traversal from this node. Transforms are accumulated from the root
+        of the graph the node belongs to.
         """
-        identity = glm.mat4(1.0)
-        self._traverse_helper(callback, identity, 0)
\ No newline at end of file
+        self._traverse_helper(callback, 0)
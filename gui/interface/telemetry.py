@@ -2,6 +2,7 @@ from rdscom.rdscom import Message, CommunicationChannel, DataField, Communicatio
 from com.message_definitions import MessageDefinitions
 from interface.error_manager import ErrorSeverity
 from app_context import ApplicationContext
+from util.observable import ChangeSource
 import time
 
 class SensorDataSnapshot:
@@ -33,24 +34,26 @@ class SensorDatastream:
 class Telemetry:
     def __init__(self):
         self.sensor_datastreams : list[SensorDatastream] = []
+        self.changes = ChangeSource("telemetry")
 
         ApplicationContext.mcu_com.comm_interface.add_callback(MessageDefinitions.sensor_datastream_id(), MessageType.REQUEST, self._on_sensor_datastream)
 
     def enable_sensor_datastream(self, joint_number: int, frequency: float):
         datastream = SensorDatastream(joint_number, frequency)
         self.sensor_datastreams.append(datastream)
+        self.changes.notify()
         
         enable_message = MessageDefinitions.create_start_sensor_datastream_message(MessageType.REQUEST, joint_number, frequency)
         ApplicationContext.mcu_com.send_message(enable_message, ack_required=True, on_failure=self._on_enable_failure)
 
     def _on_enable_failure(self, message: Message):
         joint_number = message.data().get_field("joint_id").value()
-        ApplicationContext.error_manager.report_error(f"Failed to enable sensor datastream for joint {joint_number}", ErrorSeverity.WARNING)
+        ApplicationContext.error_manager.report_error(f"Failed to enable sensor datastream for joint {joint_number}", ErrorSeverity.WARNING, source="telemetry")
 
     def disable_sensor_datastream(self, joint_number: int):
         in_list = [datastream for datastream in self.sensor_datastreams if datastream.joint_number == joint_number]
         if len(in_list) == 0:
-            ApplicationContext.error_manager.report_error(f"No datastream for joint number {joint_number}", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error(f"No datastream for joint number {joint_number}", ErrorSeverity.WARNING, source="telemetry")
             return
         
         datastream = in_list[0]
@@ -58,10 +61,11 @@ class Telemetry:
         ApplicationContext.mcu_com.send_message(disable_message, ack_required=True, on_failure=self._on_disable_failure)
 
         self.sensor_datastreams = [datastream for datastream in self.sensor_datastreams if datastream.joint_number != joint_number]
+        self.changes.notify()
 
     def _on_disable_failure(self, message: Message):
         joint_number = message.data().get_field("joint_id").value()
-        ApplicationContext.error_manager.report_error(f"Failed to disable sensor datastream for joint {joint_number}", ErrorSeverity.WARNING)
+        ApplicationContext.error_manager.report_error(f"Failed to disable sensor datastream for joint {joint_number}", ErrorSeverity.WARNING, source="telemetry")
 
     def is_active(self, joint_number: int) -> bool:
         in_list = [datastream for datastream in self.sensor_datastreams if datastream.joint_number == joint_number]
@@ -72,7 +76,7 @@ class Telemetry:
 
         in_list = [datastream for datastream in self.sensor_datastreams if datastream.joint_number == joint_number]
         if len(in_list) == 0:
-            ApplicationContext.error_manager.report_error(f"Received sensor datastream for unregistered joint {joint_number}", ErrorSeverity.WARNING)
+            ApplicationContext.error_manager.report_error(f"Received sensor datastream for unregistered joint {joint_number}", ErrorSeverity.WARNING, source="telemetry")
             return
         
         datastream = in_list[0]
@@ -83,6 +87,7 @@ class Telemetry:
             message.data().get_field("motor_temp").value(),
             message.data().get_field("joint_angle").value()
         ))
+        self.changes.notify()
 
     def get_datastream(self, joint_number: int) -> SensorDatastream:
         in_list = [datastream for datastream in self.sensor_datastreams if datastream.joint_number == joint_number]
@@ -0,0 +1,90 @@
+import hashlib
+import importlib.util
+import json
+import os
+
+from PyQt5.QtCore import QDir
+from PyQt5.QtGui import QColor, QFontDatabase, QGuiApplication, QPalette
+
+from util.path import PathUtil
+
+
+class ThemeCache:
+    """
+    Applies a qt_material theme from a stylesheet compiled on a previous run.
+
+    qt_material renders its stylesheet template and recolors its icons every
+    time it is applied, which is most of the cost of importing and using it.
+    The compiled stylesheet, the recolored icons and the palette color are
+    kept under cache/theme, keyed by the theme and the installed qt_material,
+    so only the first start (or a qt_material upgrade) pays for it.
+    """
+    CACHE_FOLDER = "cache/theme"
+
+    @staticmethod
+    def _package_folder() -> str:
+        spec = importlib.util.find_spec("qt_material")
+        return os.path.dirname(spec.origin)
+
+    @staticmethod
+    def _key(theme: str, invert_secondary: bool) -> str:
+        package_folder = ThemeCache._package_folder()
+        stamp = [theme, str(invert_secondary)]
+        for name in ("__init__.py", "material.qss.template"):
+            path = os.path.join(package_folder, name)
+            if os.path.exists(path):
+                stamp.append(f"{name}:{os.path.getmtime(path)}:{os.path.getsize(path)}")
+        digest = hashlib.sha1("|".join(stamp).encode()).hexdigest()[:12]
+        return f"{os.path.splitext(theme)[0]}_{digest}"
+
+    @staticmethod
+    def _compile(folder: str, theme: str, invert_secondary: bool):
+        # only imported on a cache miss, qt_material pulls in jinja2
+        import qt_material
+
+        icons_folder = os.path.join(folder, "icons")
+        stylesheet = qt_material.build_stylesheet(theme, invert_secondary, parent=icons_folder)
+        colors = qt_material.get_theme(theme, invert_secondary)
+
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "theme.json"), "w") as file:
+            json.dump({"primary_color": colors["primaryColor"]}, file)
+        # written last, its presence marks the cache entry as complete
+        temporary_path = os.path.join(folder, "stylesheet.qss.tmp")
+        with open(temporary_path, "w") as file:
+            file.write(stylesheet)
+        os.replace(temporary_path, os.path.join(folder, "stylesheet.qss"))
+
+    @staticmethod
+    def _add_fonts(package_folder: str):
+        fonts_folder = os.path.join(package_folder, "fonts", "roboto")
+        if not os.path.isdir(fonts_folder):
+            return
+        for font in os.listdir(fonts_folder):
+            if font.endswith(".ttf"):
+                QFontDatabase.addApplicationFont(os.path.join(fonts_folder, font))
+
+    @staticmethod
+    def apply(app, theme: str, invert_secondary: bool = False):
+        folder = PathUtil.file(os.path.join(ThemeCache.CACHE_FOLDER, ThemeCache._key(theme, invert_secondary)))
+        stylesheet_path = os.path.join(folder, "stylesheet.qss")
+        if not os.path.exists(stylesheet_path):
+            print(f"Compiling theme {theme}...")
+            ThemeCache._compile(folder, theme, invert_secondary)
+
+        with open(stylesheet_path, "r") as file:
+            stylesheet = file.read()
+        with open(os.path.join(folder, "theme.json"), "r") as file:
+            primary_color = json.load(file)["primary_color"]
+
+        # the rest of what qt_material.apply_stylesheet does
+        package_folder = ThemeCache._package_folder()
+        app.setStyle("Fusion")
+        ThemeCache._add_fonts(package_folder)
+        QDir.addSearchPath("icon", os.path.join(folder, "icons"))
+        QDir.addSearchPath("qt_material", os.path.join(package_folder, "resources"))
+        palette = QGuiApplication.palette()
+        palette.setColor(QPalette.Text, QColor(*[int(primary_color[i:i + 2], 16) for i in range(1, 6, 2)], 92))
+        QGuiApplication.setPalette(palette)
+
+        app.setStyleSheet(stylesheet)
@@ -0,0 +1,159 @@
+"""
+render_benchmark.py
+
+Renders the Simulation view's scene with no window or GPU (EGL or OSMesa, e.g. Mesa llvmpipe)
+and reports frame times, split by stage, and per frame counters, for comparing renderer changes on CI machines.
+
+Every frame ends with glFinish, reported as "finish". A software rasterizer such
+as llvmpipe does the actual drawing there, so on CI the frame time (render plus
+finish) is the number to compare. The "GPU" time comes from GL_TIME_ELAPSED
+queries and is only meaningful on a real GPU, llvmpipe reports next to nothing.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from interface.renderer import headless
+
+# renderer names whose GL_TIME_ELAPSED queries don't measure the drawing, see above
+SOFTWARE_RASTERIZERS = ("llvmpipe", "softpipe", "swrast")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless render benchmark of the Simulation view")
+    parser.add_argument("--platform", choices=headless.PLATFORMS, default="egl", help="How to get a GL context without a display")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=300, help="Frames to measure")
+    parser.add_argument("--warmup", type=int, default=30, help="Frames to draw before measuring")
+    parser.add_argument("--fingers", type=int, default=1, help="Fingers in the scene, the extra ones are laid out on a grid")
+    parser.add_argument("--static", action="store_true", help="Don't move the links and camera between frames")
+    parser.add_argument("--dump", type=str, default=None, help="Write the last frame to this image file (e.g. frame.png)")
+    parser.add_argument("--json", type=str, default=None, help="Write the results to this JSON file")
+    return parser.parse_args()
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(seconds: list) -> dict:
+    if not seconds:
+        return None
+    milliseconds = [value * 1000 for value in seconds]
+    return {
+        "average_ms": statistics.fmean(milliseconds),
+        "median_ms": statistics.median(milliseconds),
+        "p95_ms": percentile(milliseconds, 0.95),
+        "max_ms": max(milliseconds),
+    }
+
+
+def main():
+    args = parse_args()
+    # before anything imports OpenGL
+    headless.select_platform(args.platform)
+
+    import glm
+    from OpenGL import GL
+    from interface.renderer.renderer import Renderer
+    from interface.renderer.hand_scene import HandScene
+
+    context = headless.HeadlessContext(args.width, args.height)
+    renderer = Renderer()
+    scene = HandScene(renderer)
+
+    load_start = time.perf_counter()
+    scene.build({mesh_name: HandScene.load_mesh(mesh_name) for mesh_name in HandScene.MESH_NAMES})
+    for index in range(1, args.fingers):
+        # a square grid around the main finger
+        side = int(args.fingers ** 0.5) + 1
+        scene.add_finger(HandScene.BASE_POSITION + glm.vec3((index % side) * 2.0, 0, (index // side) * 2.0))
+    renderer.begin_rendering()
+    renderer.context.camera.update_aspect_ratio(args.width / args.height)
+    scene.set_camera_orbit(15, 30)
+    load_seconds = time.perf_counter() - load_start
+
+    renderer.set_gpu_timing(True)
+    frames = []  # listof FrameStats of the measured frames
+    finish_times = []
+    frame_times = []  # render() and glFinish
+    for frame in range(args.warmup + args.frames):
+        measured = frame >= args.warmup
+        if not args.static:
+            for _, link_1, link_2 in scene.fingers:
+                link_1.rendering_info.transform.rotation = HandScene.link_rotation(30 * glm.sin(frame * 0.05))
+                link_2.rendering_info.transform.rotation = HandScene.link_rotation(45 * glm.sin(frame * 0.07))
+            scene.set_camera_orbit(15, 30 + frame * 0.5)
+
+        start = time.perf_counter()
+        renderer.render()
+        # don't let frames overlap, with a software rasterizer this is where the drawing happens
+        finish_start = time.perf_counter()
+        GL.glFinish()
+        end = time.perf_counter()
+        renderer.poll_gpu_times()
+        if measured:
+            frames.append(renderer.stats.last)
+            finish_times.append(end - finish_start)
+            frame_times.append(end - start)
+
+    def values(name):
+        # gpu_seconds is None for frames whose query was never read back
+        return [getattr(frame, name) for frame in frames if getattr(frame, name) is not None]
+
+    def per_frame(name):
+        return statistics.fmean(values(name)) if frames else 0
+
+    results = {
+        "renderer": context.renderer_name(),
+        "platform": args.platform,
+        "size": [args.width, args.height],
+        "frames": args.frames,
+        "fingers": args.fingers,
+        "nodes": len(renderer.render_queue.items),
+        "scene_load_ms": load_seconds * 1000,
+        "frame": summarize(frame_times),
+        "cpu": summarize(values("cpu_seconds")),
+        "finish": summarize(finish_times),
+        "gpu": summarize(values("gpu_seconds")),
+        "traversal": summarize(values("traversal_seconds")),
+        "upload": summarize(values("upload_seconds")),
+        "submit": summarize(values("submit_seconds")),
+        "draw_calls_per_frame": per_frame("draw_calls"),
+        "state_changes_per_frame": per_frame("state_changes"),
+        "triangles_per_frame": per_frame("triangles"),
+        "gl_error": int(GL.glGetError()),
+    }
+
+    print(f"Renderer: {results['renderer']}")
+    print(f"Scene: {results['nodes']} nodes, loaded in {results['scene_load_ms']:.1f} ms")
+    for name, label in (("frame", "Frame"), ("cpu", "CPU"), ("finish", "Finish"), ("gpu", "GPU"), ("traversal", "Traversal"), ("upload", "Upload"), ("submit", "Submit")):
+        summary = results[name]
+        if summary is None:
+            print(f"{label}: no measurements")
+            continue
+        print(f"{label}: {summary['average_ms']:.3f} ms avg, {summary['median_ms']:.3f} ms median, "
+              f"{summary['p95_ms']:.3f} ms p95, {summary['max_ms']:.3f} ms max")
+    if any(name in results["renderer"] for name in SOFTWARE_RASTERIZERS):
+        print("GPU time is not meaningful with a software rasterizer, compare frame times instead")
+    print(f"Per frame: {results['draw_calls_per_frame']:.1f} draw calls, {results['state_changes_per_frame']:.1f} state changes, "
+          f"{results['triangles_per_frame']:.0f} triangles")
+
+    if args.dump:
+        context.save_image(args.dump)
+        print(f"Last frame written to {args.dump}")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+    context.close()
+    return 1 if results["gl_error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
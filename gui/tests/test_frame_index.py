@@ -0,0 +1,26 @@
+import unittest
+
+from rdscom.rdscom import Message, MessageType
+from com.frame_index import FrameAssembler
+from com.message_definitions import MessageDefinitions
+
+
+class FrameAssemblerTest(unittest.TestCase):
+    def setUp(self):
+        self.assembler = FrameAssembler(FrameAssembler.sizes_from_definitions())
+        proto = MessageDefinitions.all_protos()[0]
+        self.message = Message.from_type_and_proto(MessageType.REQUEST, proto).serialize()
+
+    def test_message_split_across_reads_is_one_frame(self):
+        half = len(self.message) // 2
+        self.assertEqual(self.assembler.feed(self.message[:half], 1.0), [])
+        frames = self.assembler.feed(self.message[half:], 1.1)
+        self.assertEqual(frames, [(self.message, 1.0)])
+
+    def test_read_with_several_messages_is_several_frames(self):
+        frames = self.assembler.feed(self.message * 2, 1.0)
+        self.assertEqual(frames, [(self.message, 1.0), (self.message, 1.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
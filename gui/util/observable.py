@@ -0,0 +1,28 @@
+import threading
+
+class ChangeSource:
+    """
+    A version counter that a data owner bumps whenever its data changes.
+
+    Readers can either remember the last version they saw and compare, or
+    register a callback to be told about changes. notify() may be called
+    from any thread, and callbacks run on the thread that called it.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.version = 0
+        self.callbacks = []  # listof func()
+        self._lock = threading.Lock()
+
+    def notify(self):
+        with self._lock:
+            self.version += 1
+        for callback in list(self.callbacks):
+            callback()
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
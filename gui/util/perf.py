@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from collections import deque
+
+
+class RateCounter:
+    """Counts events (or amounts, e.g. bytes) and reports their rate over a sliding window."""
+
+    def __init__(self, window: float = 2.0):
+        self.window = window  # seconds
+        self.total = 0
+        self._events = deque()  # listof (time.monotonic(), amount)
+        self._lock = threading.Lock()
+
+    def add(self, amount: float = 1):
+        now = time.monotonic()
+        with self._lock:
+            self.total += amount
+            self._events.append((now, amount))
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self._events and now - self._events[0][0] > self.window:
+            self._events.popleft()
+
+    def rate(self) -> float:
+        """Per second, over the last `window` seconds."""
+        with self._lock:
+            self._trim(time.monotonic())
+            return sum(amount for _, amount in self._events) / self.window
+
+
+class TimingStat:
+    """Running average and maximum of a duration, in seconds."""
+
+    def __init__(self, smoothing: float = 0.1):
+        self.smoothing = smoothing
+        self.last = 0.0
+        self.average = 0.0
+        self.max = 0.0
+        self.count = 0
+
+    def add(self, seconds: float):
+        self.last = seconds
+        self.average = seconds if self.count == 0 else self.average + (seconds - self.average) * self.smoothing
+        self.max = max(self.max, seconds)
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "last_ms": self.last * 1000,
+            "average_ms": self.average * 1000,
+            "max_ms": self.max * 1000,
+            "count": self.count,
+        }
+
+
+class DockStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.draw_time = TimingStat()  # time spent in draw_inspector and the LayoutUtility pass
+        self.widgets_created = 0  # by the last rebuild
+        self.widgets_reused = 0  # taken from the widget pool by the last rebuild
+        self.rebuilds = RateCounter()
+        self.update_time = TimingStat()  # time spent in scheduled refreshes and timer tasks
+        self.lateness = TimingStat()  # how long scheduled work waited past when it was due
+        self.updates = RateCounter()
+
+    def record_draw(self, seconds: float, widgets_created: int, widgets_reused: int = 0):
+        self.draw_time.add(seconds)
+        self.widgets_created = widgets_created
+        self.widgets_reused = widgets_reused
+        self.rebuilds.add()
+
+    def record_update(self, seconds: float, lateness: float):
+        self.update_time.add(seconds)
+        self.lateness.add(lateness)
+        self.updates.add()
+
+    def to_dict(self) -> dict:
+        return {
+            "draw": self.draw_time.to_dict(),
+            "widgets_created": self.widgets_created,
+            "widgets_reused": self.widgets_reused,
+            "rebuilds_per_second": self.rebuilds.rate(),
+            "update": self.update_time.to_dict(),
+            "lateness": self.lateness.to_dict(),
+            "updates_per_second": self.updates.rate(),
+        }
+
+
+class PerfMonitor:
+    """
+    Collects performance counters for the whole application.
+
+    Docks are instrumented by BaseDockWidget and the DockScheduler, so every
+    dock shows up here without doing anything itself. Gauges are sampled
+    lazily, when a snapshot is taken.
+    """
+
+    def __init__(self):
+        self.docks = []  # listof DockStats
+        self.frames = RateCounter()
+        self.comms_ticks = RateCounter()
+        self.frame_jitter = TimingStat()  # how far frames ran from when they were scheduled
+        self.serial_rx = RateCounter()  # bytes
+        self.serial_tx = RateCounter()  # bytes
+        self.gauges = {}  # Map: name -> func() -> number, sampled on snapshot
+        self.start_time = time.time()
+
+    def add_dock_stats(self, stats: DockStats):
+        self.docks.append(stats)
+
+    def remove_dock_stats(self, stats: DockStats):
+        if stats in self.docks:
+            self.docks.remove(stats)
+
+    def attach_channel(self, channel):
+        channel.add_receive_callback(lambda data: self.serial_rx.add(len(data)))
+        channel.add_transmit_callback(lambda data: self.serial_tx.add(len(data)))
+
+    def add_gauge(self, name: str, sample: callable):
+        self.gauges[name] = sample
+
+    def record_frame(self):
+        self.frames.add()
+
+    def record_frame_jitter(self, jitter: float):
+        self.frame_jitter.add(abs(jitter))
+
+    def record_comms_tick(self):
+        self.comms_ticks.add()
+
+    def snapshot(self) -> dict:
+        gauges = {}
+        for name, sample in self.gauges.items():
+            try:
+                gauges[name] = sample()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+
+        return {
+            "time": time.time(),
+            "uptime": time.time() - self.start_time,
+            "frames_per_second": self.frames.rate(),
+            "comms_ticks_per_second": self.comms_ticks.rate(),
+            "frame_jitter": self.frame_jitter.to_dict(),
+            "serial_rx_bytes_per_second": self.serial_rx.rate(),
+            "serial_tx_bytes_per_second": self.serial_tx.rate(),
+            "serial_rx_bytes": self.serial_rx.total,
+            "serial_tx_bytes": self.serial_tx.total,
+            "gauges": gauges,
+            "docks": {stats.name: stats.to_dict() for stats in self.docks},
+        }
+
+    def dump_json(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.snapshot(), file, indent=2)
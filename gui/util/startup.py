@@ -0,0 +1,51 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """
+    Records a timeline of the phases the application goes through while starting.
+
+    Phases are always recorded, they are cheap. The timeline is only printed when
+    the application is started with --profile-startup.
+    """
+    enabled = False
+    start_time = time.perf_counter()
+    events = []  # listof (name, start offset in seconds, duration in seconds or None for marks, depth)
+    _depth = 0
+
+    @staticmethod
+    def enable():
+        StartupProfiler.enabled = True
+
+    @staticmethod
+    def elapsed() -> float:
+        return time.perf_counter() - StartupProfiler.start_time
+
+    @staticmethod
+    @contextmanager
+    def phase(name: str):
+        start = StartupProfiler.elapsed()
+        index = len(StartupProfiler.events)
+        StartupProfiler.events.append((name, start, 0.0, StartupProfiler._depth))
+        StartupProfiler._depth += 1
+        try:
+            yield
+        finally:
+            StartupProfiler._depth -= 1
+            StartupProfiler.events[index] = (name, start, StartupProfiler.elapsed() - start, StartupProfiler._depth)
+
+    @staticmethod
+    def mark(name: str):
+        StartupProfiler.events.append((name, StartupProfiler.elapsed(), None, StartupProfiler._depth))
+
+    @staticmethod
+    def report() -> str:
+        lines = ["Startup timeline:"]
+        for name, start, duration, depth in StartupProfiler.events:
+            indent = "  " * (depth + 1)
+            if duration is None:
+                lines.append(f"{start * 1000:9.1f} ms {indent}* {name}")
+            else:
+                lines.append(f"{start * 1000:9.1f} ms {indent}{name}: {duration * 1000:.1f} ms")
+        return "\n".join(lines)
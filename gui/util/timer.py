@@ -1,29 +1,159 @@
+import enum
+import heapq
+import itertools
 import time
 
+NANOSECONDS_PER_MILLISECOND = 1_000_000
+
+class TimerMode(enum.Enum):
+    # deadlines stay on a fixed grid: start + n * interval, however long the task takes
+    FIXED_RATE = 0
+    # the next deadline is one interval after the task finished
+    FIXED_DELAY = 1
+
 class TimedTask:
-    def __init__(self, interval: float, task : callable):
+    def __init__(self, interval: float, task : callable, mode: TimerMode = TimerMode.FIXED_RATE, group=None):
         """
         interval: time in milliseconds between each task execution
         task: the task to execute
+        mode: how the next deadline is chosen after each run
         """
+        if interval <= 0:
+            raise ValueError(f"TimedTask interval must be positive, got {interval}")
         self.interval = interval
+        self.interval_ns = int(interval * NANOSECONDS_PER_MILLISECOND)
         self.task = task
-        self.last_time = time.time()
+        self.mode = mode
+        self.group = group
+        self.deadline_ns = time.monotonic_ns() + self.interval_ns
+        self.due_ns = None  # the deadline due_tasks handed the task out for, until it runs
+        self.heap_sequence = None  # the group's heap entry for the current deadline, older ones are stale
+        self.runs = 0
+        self.missed = 0  # deadlines skipped because the task ran more than an interval late
+        self.last_lateness_ns = 0
+        self.cancelled = False
+
+    def is_due(self, now_ns: int = None) -> bool:
+        now_ns = now_ns if now_ns is not None else time.monotonic_ns()
+        return now_ns >= self.deadline_ns
+
+    def time_until_due(self) -> float:
+        """Milliseconds until the task is due, 0 if it already is."""
+        return max(0, self.deadline_ns - time.monotonic_ns()) / NANOSECONDS_PER_MILLISECOND
+
+    def overdue(self) -> float:
+        """Seconds the task has been due for, 0 if it is not due."""
+        deadline_ns = self.due_ns if self.due_ns is not None else self.deadline_ns
+        return max(0, time.monotonic_ns() - deadline_ns) / 1e9
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _advance(self, now_ns: int):
+        """Moves the deadline past `now_ns`."""
+        if self.mode == TimerMode.FIXED_DELAY:
+            self.deadline_ns = now_ns + self.interval_ns
+            return
+
+        # stay on the grid, and count every deadline that passed while we were late
+        self.deadline_ns += self.interval_ns
+        if self.deadline_ns <= now_ns:
+            skipped = (now_ns - self.deadline_ns) // self.interval_ns + 1
+            self.missed += skipped
+            self.deadline_ns += skipped * self.interval_ns
+
+    def _reschedule(self, now_ns: int):
+        self._advance(now_ns)
+        if self.group is not None and not self.cancelled:
+            self.group._push(self)
+
+    def _hand_out(self, now_ns: int):
+        """
+        Schedules the next deadline before the task runs, so it stays scheduled
+        if the task raises or is never run.
+        """
+        self.due_ns = self.deadline_ns
+        self._reschedule(now_ns)
 
-    def update(self):
-        current_time = time.time()
-        # check if the interval has passed in milliseconds
-        if (current_time - self.last_time) * 1000 >= self.interval:
+    def run(self):
+        """Runs the task and schedules its next deadline."""
+        start_ns = time.monotonic_ns()
+        if self.due_ns is None:
+            # not handed out by due_tasks
+            self._hand_out(start_ns)
+        self.last_lateness_ns = max(0, start_ns - self.due_ns)
+        self.due_ns = None
+        try:
             self.task()
-            self.last_time = current_time
+        finally:
+            self.runs += 1
+            if self.mode == TimerMode.FIXED_DELAY:
+                # the interval counts from the end of this run
+                self._reschedule(time.monotonic_ns())
 
 class TimerGroup:
+    """
+    Tasks kept in a min-heap by deadline, on the monotonic clock.
+
+    Finding what is due and how long until the next deadline only looks at
+    the top of the heap, so a firing costs O(log n) regardless of how many
+    tasks are registered.
+    """
+
     def __init__(self):
-        self.timed_tasks = []
+        self.timed_tasks = []  # listof TimedTask, in the order they were added
+        self._heap = []  # listof (deadline_ns, sequence, TimedTask)
+        self._sequence = itertools.count()
+
+    def add_task(self, interval: float, task: callable, mode: TimerMode = TimerMode.FIXED_RATE) -> TimedTask:
+        timed_task = TimedTask(interval, task, mode, group=self)
+        self.timed_tasks.append(timed_task)
+        self._push(timed_task)
+        return timed_task
+
+    def remove_task(self, timed_task: TimedTask):
+        # removed lazily, when it reaches the top of the heap
+        timed_task.cancel()
+        if timed_task in self.timed_tasks:
+            self.timed_tasks.remove(timed_task)
+
+    def _push(self, timed_task: TimedTask):
+        # a task has one live entry, pushing it again leaves the previous one to be dropped lazily
+        timed_task.heap_sequence = next(self._sequence)
+        heapq.heappush(self._heap, (timed_task.deadline_ns, timed_task.heap_sequence, timed_task))
+
+    def _peek(self) -> TimedTask:
+        while self._heap and (self._heap[0][2].cancelled or self._heap[0][1] != self._heap[0][2].heap_sequence):
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def due_tasks(self) -> list[TimedTask]:
+        """
+        Hands out the tasks whose deadline has passed, for callers that decide themselves
+        when to run them. Their next deadline is scheduled right away, so a task that is
+        dropped before its run() is called just misses this one.
+        """
+        now_ns = time.monotonic_ns()
+        due = []
+        while True:
+            timed_task = self._peek()
+            if timed_task is None or timed_task.deadline_ns > now_ns:
+                return due
+            heapq.heappop(self._heap)
+            timed_task._hand_out(now_ns)
+            due.append(timed_task)
+
+    def time_until_next(self) -> float:
+        """Milliseconds until the next task is due, or None if there are no tasks."""
+        timed_task = self._peek()
+        if timed_task is None:
+            return None
+        return timed_task.time_until_due()
 
-    def add_task(self, interval: float, task: callable):
-        self.timed_tasks.append(TimedTask(interval, task))
+    @property
+    def missed_deadlines(self) -> int:
+        return sum(timed_task.missed for timed_task in self.timed_tasks)
 
     def tick(self):
-        for task in self.timed_tasks:
-            task.update()
\ No newline at end of file
+        for timed_task in self.due_tasks():
+            timed_task.run()